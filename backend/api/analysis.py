@@ -1,12 +1,96 @@
+import math
+import threading
 from flask import Blueprint, request, jsonify
-from services.ml_core import MLCore
+from services.ml_core import MLCore, SCORING_PARAMS
+from services.role_profiles import profile_store, corpus_version
+from services.vector_index import BestFitIndex
+from services.result_cache import result_cache, analysis_key
+from services.task_runner import task, task_runner
 from services import db
 from bson import ObjectId
+from config import COHORT_WRITE_BATCH
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 bp = Blueprint('analysis', __name__, url_prefix='/analysis')
 ml = MLCore()
+_best_fit = None
+_best_fit_lock = threading.Lock()
+
+
+def _load_job_corpus():
+    return db.job_coll.find({}, {'skills': 1})
+
+
+def _aggregate_confidence(results):
+    """Average each skill's final score across the per-job results."""
+    agg = {}
+    counts = {}
+    for r in results:
+        psc = r.get('per_skill_confidence', {})
+        for skill, info in psc.items():
+            agg.setdefault(skill, 0.0)
+            counts.setdefault(skill, 0)
+            agg[skill] += info.get('final_score', 0.0)
+            counts[skill] += 1
+    return {s: (agg[s] / counts[s]) for s in agg}
+
+
+def _best_fit_index():
+    """Best-fit index over the current job corpus, rebuilt when jobs change."""
+    global _best_fit
+    version = corpus_version()
+    index = _best_fit
+    if index is not None and index.version == version:
+        return index
+    # one rebuild per corpus version; concurrent requests wait for it instead of rebuilding too
+    with _best_fit_lock:
+        if _best_fit is None or _best_fit.version != version:
+            ml.ensure_fitted(version, _load_job_corpus)
+            job_docs = list(db.job_coll.find({}, {'role': 1, 'skills': 1, 'cluster_id': 1}))
+            labels = {c['cluster_id']: c.get('role_label') for c in db.job_clusters.find({}, {'cluster_id': 1, 'role_label': 1})
+                      if c.get('cluster_id') is not None}
+            _best_fit = BestFitIndex(ml.vectorizer, job_docs, cluster_labels=labels, version=version)
+        return _best_fit
+
+
+def _cached_analysis(cached, user_oid, role, key):
+    """Response for a memo hit. The user's own earlier analysis is returned as is;
+    for another user only a reference document is stored, not a copy of the results.
+    """
+    analysis_id = cached['analysis_id']
+    if cached.get('user_id') != user_oid:
+        analysis_id = db.analysis_coll.insert_one({
+            'user_id': user_oid,
+            'role': role,
+            'result_ref': cached['analysis_id'],
+            'result_key': key
+        }).inserted_id
+    return {
+        '_id': str(analysis_id),
+        'user_id': str(user_oid),
+        'role': role,
+        'results': cached['results'],
+        'per_skill_confidence': cached['per_skill_confidence'],
+        'role_cluster_used': cached['role_cluster_used'],
+        'result_key': key,
+        'cached': True
+    }
+
+
+def _load_cohort_skills(user_oids):
+    """Resolve skills for many users in two queries (manual skills, then syllabus)."""
+    skills = {}
+    for u in db.users_coll.find({'_id': {'$in': user_oids}}, {'skills': 1}):
+        if u.get('skills'):
+            skills[u['_id']] = u['skills']
+
+    pending = [oid for oid in user_oids if oid not in skills]
+    if pending:
+        for syl in db.syllabus_coll.find({'user_id': {'$in': pending}}, {'user_id': 1, 'normalized_skills': 1}):
+            # keep the first syllabus per user, like find_one in /run
+            skills.setdefault(syl['user_id'], syl.get('normalized_skills', []))
+    return {oid: skills.get(oid, []) for oid in user_oids}
 
 
 @bp.route('/run', methods=['POST'])
@@ -58,62 +142,41 @@ def run_analysis():
         # If still empty, we can still run analysis but it will show 0 readiness
         print(f"Final skills used for analysis: {final_skills}")
 
-        # fetch jobs for role
-        job_docs = list(db.job_coll.find({'role': role}))
+        # serve repeats of the same (skills, role, corpus, params) from the memo
+        version = corpus_version()
+        key = analysis_key(final_skills, role, version, SCORING_PARAMS)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return jsonify(_cached_analysis(cached, ObjectId(user_id), role, key))
+
+        # precomputed role profile; rebuilt only when the role's version changes
+        profile = profile_store.get_profile(role)
 
-        if not job_docs:
+        if not profile['jobs']:
             print(f"No jobs found for role: {role}")
             return {'error': 'no job skill data for role'}, 404
 
-        job_skill_sets = []
-        for j in job_docs:
-            job_skill_sets.append({
-                'role': j['role'],
-                'skills': j['skills'],
-                'weights': j.get('weights', {})
-            })
-
         try:
-            results = ml.compute_similarity(syllabus_skills, job_skill_sets)
+            # refit the shared vectorizer only when jobs were added
+            ml.ensure_fitted(version, _load_job_corpus)
+            results = ml.compute_similarity(final_skills, profile['jobs'], packed=profile['packed'])
         except Exception as e:
             print(f"ML Core crashed: {e}")
             import traceback
             traceback.print_exc()
             return {'error': 'Analysis calculation failed internally'}, 500
 
-        # determine used cluster id (most common among the job_docs if present)
-        cluster_ids = [j.get('cluster_id') for j in job_docs if j.get('cluster_id') is not None]
-        role_cluster_used = None
-        if cluster_ids:
-            from collections import Counter
-            most_common = Counter(cluster_ids).most_common(1)
-            if most_common:
-                role_cluster_used = int(most_common[0][0])
-
-        # aggregate per-skill confidence across job results
-        agg = {}
-        counts = {}
-        for r in results:
-            psc = r.get('per_skill_confidence', {})
-            for skill, info in psc.items():
-                agg.setdefault(skill, 0.0)
-                counts.setdefault(skill, 0)
-                agg[skill] += info.get('final_score', 0.0)
-                counts[skill] += 1
-        
-        per_skill_confidence = {}
-        if agg:
-            per_skill_confidence = {s: (agg[s] / counts[s]) for s in agg}
-
         analysis_doc = {
             'user_id': ObjectId(user_id),
             'role': role,
             'results': results,
-            'per_skill_confidence': per_skill_confidence,
-            'role_cluster_used': role_cluster_used
+            'per_skill_confidence': _aggregate_confidence(results),
+            'role_cluster_used': profile['role_cluster_used'],
+            'result_key': key
         }
     
         res = db.analysis_coll.insert_one(analysis_doc)
+        result_cache.put(key, analysis_doc)
         analysis_doc['_id'] = str(res.inserted_id)
         # Convert ObjectId to str for response
         if 'user_id' in analysis_doc:
@@ -125,3 +188,138 @@ def run_analysis():
         import traceback
         traceback.print_exc()
         return {'error': f"Internal Server Error: {str(e)}"}, 500
+
+
+def cohort_analysis(user_ids, roles):
+    """Score every user against every role in one pass over shared job vectors,
+    bulk-write one analysis document per (user, role) and return a summary.
+    Raises ValueError for an empty or malformed request.
+    """
+    user_ids = list(dict.fromkeys(user_ids or []))
+    roles = list(dict.fromkeys(roles or []))
+    if not user_ids or not roles:
+        raise ValueError('user_ids and target_roles required')
+
+    try:
+        user_oids = [ObjectId(u) for u in user_ids]
+    except Exception:
+        raise ValueError('invalid user_id in user_ids')
+
+    skills_by_user = _load_cohort_skills(user_oids)
+
+    profiles = profile_store.get_profiles(roles)
+    role_job_sets = {role: profiles[role]['jobs'] for role in roles}
+
+    ml.ensure_fitted(corpus_version(), _load_job_corpus)
+    cohort = ml.compute_cohort([skills_by_user[oid] for oid in user_oids], role_job_sets)
+
+    # stream analysis documents to Mongo in unordered batches
+    written = 0
+    batch = []
+    for i, role, results in cohort['results']:
+        if not role_job_sets[role]:
+            continue
+        batch.append({
+            'user_id': user_oids[i],
+            'role': role,
+            'results': results,
+            'per_skill_confidence': _aggregate_confidence(results),
+            'role_cluster_used': profiles[role]['role_cluster_used']
+        })
+        if len(batch) >= COHORT_WRITE_BATCH:
+            written += len(db.analysis_coll.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+    if batch:
+        written += len(db.analysis_coll.insert_many(batch, ordered=False).inserted_ids)
+
+    readiness = cohort['readiness']
+    summary = {}
+    for m, role in enumerate(cohort['roles']):
+        col = [v for v in readiness[:, m].tolist() if not math.isnan(v)]
+        summary[role] = {
+            'jobs': len(role_job_sets[role]),
+            'mean_readiness_pct': sum(col) / len(col) if col else None,
+            'min_readiness_pct': min(col) if col else None,
+            'max_readiness_pct': max(col) if col else None,
+        }
+
+    return {
+        'users': len(user_ids),
+        'roles': cohort['roles'],
+        'analyses_written': written,
+        'missing_roles': [role for role in roles if not role_job_sets[role]],
+        'role_summary': summary,
+        'readiness': {
+            uid: {role: (None if math.isnan(v) else v) for role, v in zip(cohort['roles'], row)}
+            for uid, row in zip(user_ids, readiness.tolist())
+        }
+    }
+
+
+@task('cohort_analysis')
+def _cohort_task(params, progress):
+    return cohort_analysis(params.get('user_ids'), params.get('target_roles'))
+
+
+@bp.route('/cohort', methods=['POST'])
+@jwt_required(optional=True)
+def run_cohort_analysis():
+    """JSON {user_ids: [...], target_roles: [...], background(optional)}
+    Runs `cohort_analysis`. With background=true the work is queued on the
+    task runner and the response is 202 {task_id}; poll /tasks/<task_id>.
+    """
+    payload = request.get_json() or {}
+    if payload.get('background'):
+        if not payload.get('user_ids') or not payload.get('target_roles'):
+            return {'error': 'user_ids and target_roles required'}, 400
+        try:
+            task_id = task_runner.submit('cohort_analysis', {
+                'user_ids': payload['user_ids'], 'target_roles': payload['target_roles'],
+            })
+        except RuntimeError as e:
+            return {'error': str(e)}, 503
+        return {'task_id': task_id, 'status': 'queued'}, 202
+
+    try:
+        return jsonify(cohort_analysis(payload.get('user_ids'), payload.get('target_roles')))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"CRITICAL ERROR in /analysis/cohort: {e}")
+        import traceback
+        traceback.print_exc()
+        return {'error': f"Internal Server Error: {str(e)}"}, 500
+
+
+@bp.route('/best-fit', methods=['POST'])
+@jwt_required(optional=True)
+def best_fit_roles():
+    """JSON {user_id | skills, top_k(optional)}
+    Ranks every role and cluster for the user's skills and returns the nearest postings.
+    """
+    payload = request.get_json() or {}
+    skills = payload.get('skills')
+    try:
+        top_k = int(payload.get('top_k', 5))
+    except (TypeError, ValueError):
+        return {'error': 'top_k must be an integer'}, 400
+    if top_k < 1:
+        return {'error': 'top_k must be positive'}, 400
+
+    try:
+        if skills is None:
+            user_id = payload.get('user_id') or get_jwt_identity()
+            if not user_id:
+                return {'error': 'user_id or skills required'}, 400
+            user_oid = ObjectId(user_id)
+            skills = _load_cohort_skills([user_oid])[user_oid]
+
+        ranking = _best_fit_index().query(skills, top_k=top_k)
+        ranking['skills_used'] = skills
+        return jsonify(ranking)
+
+    except Exception as e:
+        print(f"CRITICAL ERROR in /analysis/best-fit: {e}")
+        import traceback
+        traceback.print_exc()
+        return {'error': f"Internal Server Error: {str(e)}"}, 500
@@ -1,10 +1,12 @@
 from flask import Blueprint, request, jsonify
-from services.llm_client import CerebrasClient
+from services.llm_client import get_llm
 from services import db
+from services.result_cache import resolve_analysis
+from services.sse import wants_stream, sse_response
 from bson import ObjectId
 
 bp = Blueprint('explain', __name__, url_prefix='/explain')
-llm = CerebrasClient()
+llm = get_llm()
 
 
 @bp.route('/score', methods=['POST'])
@@ -15,7 +17,7 @@ def explain_score():
     if not user_id or not analysis_id:
         return {'error': 'user_id and analysis_id required'}, 400
 
-    analysis = db.analysis_coll.find_one({'_id': ObjectId(analysis_id)})
+    analysis = resolve_analysis(db.analysis_coll.find_one({'_id': ObjectId(analysis_id)}))
     if not analysis:
         return {'error': 'analysis not found'}, 404
 
@@ -39,7 +41,7 @@ def explain_score():
 
 @bp.route('/chat', methods=['POST'])
 def chat():
-    """Generic chat endpoint"""
+    """Generic chat endpoint. Streams the reply as server-sent events when asked to (see services.sse)."""
     data = request.get_json()
     message = data.get('message', '')
     lang = data.get('lang', 'en')
@@ -47,5 +49,8 @@ def chat():
     if not message:
         return {'error': 'Message required'}, 400
 
+    if wants_stream(request, data):
+        return sse_response(llm.chat_stream(message, lang=lang), 'reply', "Server Error.")
+
     response_text = llm.chat(message, lang=lang)
     return jsonify({'reply': response_text})
@@ -1,13 +1,13 @@
 from flask import Blueprint, request, send_file, jsonify
 from services import db
-from services.llm_client import CerebrasClient
+from services.llm_client import get_llm
 from services.pdf_service import create_resume_pdf, create_paper_pdf
 from bson import ObjectId
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import io
 
 bp = Blueprint('generator', __name__, url_prefix='/generator')
-llm = CerebrasClient()
+llm = get_llm()
 
 @bp.route('/resume', methods=['POST'])
 @jwt_required(optional=True)
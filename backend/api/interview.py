@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
-from services.llm_client import CerebrasClient
+from services.llm_client import get_llm
+from services.sse import wants_stream, sse_response
 import logging
 
 bp = Blueprint('interview', __name__, url_prefix='/interview')
-llm = CerebrasClient()
+llm = get_llm()
 logger = logging.getLogger(__name__)
 
 @bp.route('/start', methods=['POST'])
@@ -30,7 +31,7 @@ def start_interview():
 
 @bp.route('/chat', methods=['POST'])
 def chat_interview():
-    """Continues the interview conversation."""
+    """Continues the interview conversation. Streams the reply as server-sent events when asked to."""
     data = request.get_json()
     message = data.get('message')
     history = data.get('history', [])
@@ -41,7 +42,11 @@ def chat_interview():
 
     context = "You are a strict but fair technical interviewer. Assess the candidate's last answer and ask the next follow-up question. Keep responses under 3 sentences."
     full_prompt = f"{context}\n\nCandidate: {message}\nInterviewer:"
-    
+
+    if wants_stream(request, data):
+        return sse_response(llm.chat_stream(full_prompt, lang=lang), 'message',
+                            "That's interesting. Let's move to the next topic.")
+
     try:
         response = llm.chat(full_prompt, lang=lang)
         return jsonify({'message': response})
@@ -1,10 +1,13 @@
 from flask import Blueprint, request, jsonify
-from services.llm_client import CerebrasClient
-from services.nlp_pipeline import clean_and_normalize
+from services.llm_client import get_llm
+from services.nlp_pipeline import clean_and_normalize, clean_and_normalize_many
+from services.role_profiles import bump_role_version
+from services.online_clusterer import assign_clusters, refresh_clusters, cluster_status
+from services.skill_demand import skill_demand
 from services import db
 
 bp = Blueprint('jobs', __name__, url_prefix='/jobs')
-llm = CerebrasClient()
+llm = get_llm()
 
 
 @bp.route('/process', methods=['POST'])
@@ -30,16 +33,97 @@ def process_job():
         'role': role,
         'source': source,
         'raw_text': text,
+        # kept so renormalize_skills can redo normalization from the source
+        'extracted_skills': skills,
         'skills': normalized,
         'weights': weights,
         'cluster_id': None,
         'role_label': None,
     }
+    assign_clusters([doc])
     res = db.job_coll.insert_one(doc)
+    bump_role_version(role)
     doc['_id'] = str(res.inserted_id)
     return doc, 201
 
 
+@bp.route('/process-batch', methods=['POST'])
+def process_jobs_batch():
+    """Accept JSON {postings: [{role, text, source(optional), weights(optional)}, ...]} for bulk imports."""
+    data = request.get_json() or {}
+    postings = data.get('postings') or []
+    if not postings or any(not p.get('role') or not p.get('text') for p in postings):
+        return {'error': 'postings with role and text required'}, 400
+
+    extracted = llm.extract_skills_batch(
+        [{'id': str(i), 'text': p['text'], 'role': p['role']} for i, p in enumerate(postings)]
+    )
+
+    raw_skills = []
+    fallbacks = 0
+    for i, p in enumerate(postings):
+        skills = extracted.get(str(i))
+        if skills is None:
+            # fallback: basic splitting by commas and whitespace
+            skills = [s.strip() for s in p['text'].split(',') if s.strip()]
+            fallbacks += 1
+        raw_skills.append(skills)
+
+    # one normalization pass for the whole batch
+    docs = [{
+        'role': p['role'],
+        'source': p.get('source', 'manual'),
+        'raw_text': p['text'],
+        'extracted_skills': raw,
+        'skills': skills,
+        'weights': p.get('weights', {}),
+        'cluster_id': None,
+        'role_label': None,
+    } for p, raw, skills in zip(postings, raw_skills, clean_and_normalize_many(raw_skills))]
+
+    assign_clusters(docs)
+    res = db.job_coll.insert_many(docs)
+    bump_role_version(*{d['role'] for d in docs})
+    return {
+        'inserted': len(res.inserted_ids),
+        'ids': [str(i) for i in res.inserted_ids],
+        'fallbacks': fallbacks,
+    }, 201
+
+
+@bp.route('/clusters/status', methods=['GET'])
+def get_cluster_status():
+    """Drift of the incremental cluster model since the last full `cluster_jobs` run."""
+    return jsonify(cluster_status())
+
+
+@bp.route('/clusters/refresh', methods=['POST'])
+def post_cluster_refresh():
+    """Fold postings assigned since the last refresh into the cluster centroids."""
+    report = refresh_clusters()
+    if report is None:
+        return {'error': 'no cluster model; run a full clustering first'}, 409
+    return jsonify(report)
+
+
+@bp.route('/skill-demand', methods=['GET'])
+def get_skill_demand():
+    """Query params: role, cluster_id, skills (comma-separated), group_by (role|cluster_id), top_n.
+    Skill frequency across postings, counted by an aggregation in Mongo.
+    """
+    skills = [s.strip() for s in request.args.get('skills', '').split(',') if s.strip()]
+    try:
+        cluster_id = request.args.get('cluster_id', type=int)
+        top_n = int(request.args.get('top_n', 20))
+        result = skill_demand(role=request.args.get('role'), cluster_id=cluster_id, skills=skills or None,
+                              group_by=request.args.get('group_by'), top_n=top_n)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    if request.args.get('group_by'):
+        result = [dict(stats, **{request.args['group_by']: key}) for key, stats in result.items()]
+    return jsonify(result)
+
+
 @bp.route('/byrole/<role>', methods=['GET'])
 def get_jobs_by_role(role):
     docs = list(db.job_coll.find({'role': role}))
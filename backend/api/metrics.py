@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify
+from services.result_cache import result_cache
+from services.norm_cache import norm_cache
+from services.llm_cache import llm_cache
+from services.llm_limiter import llm_limiter
+from services.single_flight import single_flight
+from services.circuit_breaker import llm_breaker
+from services.nlp_pipeline import ontology_store
+from services.task_runner import task_runner
+
+bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+
+@bp.route('', methods=['GET'])
+def get_metrics():
+    """Process-local cache and client statistics for sizing and monitoring."""
+    return jsonify({
+        'analysis_cache': result_cache.stats(),
+        'normalization_cache': norm_cache.stats(),
+        'llm_cache': llm_cache.stats(),
+        'llm_calls': llm_limiter.stats(),
+        'llm_single_flight': single_flight.stats(),
+        'llm_breaker': llm_breaker.stats(),
+        'tasks': task_runner.stats(),
+        'ontology_version': ontology_store.current().version,
+    })
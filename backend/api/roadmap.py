@@ -1,12 +1,12 @@
 from flask import Blueprint, request, jsonify
-from services.llm_client import CerebrasClient
+from services.llm_client import get_llm
 from services import db
 from bson import ObjectId
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 bp = Blueprint('roadmap', __name__, url_prefix='/roadmap')
-llm = CerebrasClient()
+llm = get_llm()
 
 
 @bp.route('/generate', methods=['POST'])
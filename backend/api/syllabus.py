@@ -1,14 +1,15 @@
 from flask import Blueprint, request, jsonify
-from services.llm_client import CerebrasClient
+from services.llm_client import get_llm
 from services.fallback_extractor import extract_skills_rule_based
 from services.nlp_pipeline import clean_and_normalize
 from services import db
 from bson import ObjectId
 import logging
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import SYLLABUS_MAX_CHARS
 
 bp = Blueprint('syllabus', __name__, url_prefix='/syllabus')
-llm = CerebrasClient()
+llm = get_llm()
 logger = logging.getLogger(__name__)
 
 
@@ -33,7 +34,7 @@ def process_syllabus():
 
     doc = {
         'user_id': ObjectId(user_id),
-        'raw_text': text[:10000],
+        'raw_text': text[:SYLLABUS_MAX_CHARS],
         'extracted_skills': skills,
         'normalized_skills': normalized,
     }
@@ -0,0 +1,70 @@
+from bson import ObjectId
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from services.task_runner import task_runner, registered_tasks, TaskConflict
+# importing registers the batch jobs with the runner
+import services.background_tasks  # noqa: F401
+
+bp = Blueprint('tasks', __name__, url_prefix='/tasks')
+
+
+def _serialize(doc, with_result=False):
+    out = {
+        'task_id': str(doc['_id']),
+        'name': doc.get('name'),
+        'status': doc.get('status'),
+        'progress': doc.get('progress'),
+        'error': doc.get('error'),
+        'created_at': doc.get('created_at'),
+        'started_at': doc.get('started_at'),
+        'finished_at': doc.get('finished_at'),
+    }
+    if with_result:
+        out['result'] = doc.get('result')
+    return out
+
+
+def _load(task_id):
+    if not ObjectId.is_valid(task_id):
+        return None
+    return task_runner.get(task_id)
+
+
+@bp.route('', methods=['POST'])
+@jwt_required(optional=True)
+def submit_task():
+    """JSON {name, params(optional)}
+    Queues a registered batch job and returns 202 {task_id}.
+    """
+    payload = request.get_json() or {}
+    name = payload.get('name')
+    if name not in registered_tasks():
+        return {'error': 'unknown task', 'available': registered_tasks()}, 400
+    params = payload.get('params') or {}
+    if not isinstance(params, dict):
+        return {'error': 'params must be an object'}, 400
+    try:
+        task_id = task_runner.submit(name, params)
+    except TaskConflict as e:
+        return {'error': str(e)}, 409
+    except RuntimeError as e:
+        return {'error': str(e)}, 503
+    return {'task_id': task_id, 'status': 'queued'}, 202
+
+
+@bp.route('/<task_id>', methods=['GET'])
+def get_task(task_id):
+    doc = _load(task_id)
+    if not doc:
+        return {'error': 'task not found'}, 404
+    return jsonify(_serialize(doc))
+
+
+@bp.route('/<task_id>/result', methods=['GET'])
+def get_task_result(task_id):
+    doc = _load(task_id)
+    if not doc:
+        return {'error': 'task not found'}, 404
+    if doc.get('status') not in ('succeeded', 'failed'):
+        return jsonify(dict(_serialize(doc), error='task has not finished')), 409
+    return jsonify(_serialize(doc, with_result=True))
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from services import db
+from services.result_cache import resolve_analysis
 from bson import ObjectId
 
 bp = Blueprint('users', __name__, url_prefix='/users')
@@ -93,6 +94,8 @@ def get_user_history(user_id):
         history_items = []
         
         for a in analyses:
+            # analyses served from the result cache only reference their payload
+            a = resolve_analysis(a)
             history_items.append({
                 'id': str(a['_id']),
                 'type': 'analysis',
@@ -10,7 +10,9 @@ from api.roadmap import bp as roadmap_bp
 from api.explain import bp as explain_bp
 from api.auth import bp as auth_bp
 from api.generator import bp as generator_bp
-from config import JWT_SECRET_KEY
+from api.metrics import bp as metrics_bp
+from api.tasks import bp as tasks_bp
+from config import JWT_SECRET_KEY, SPACY_PRELOAD
 
 
 def create_app():
@@ -18,6 +20,11 @@ def create_app():
     # Enable CORS - in production you should specify your Vercel URL
     CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
     app.config['JWT_SECRET_KEY'] = JWT_SECRET_KEY
+
+    if SPACY_PRELOAD:
+        # with gunicorn preload_app this runs once in the master, before fork
+        from services.spacy_models import preload
+        preload()
     jwt = JWTManager(app)
 
     # register blueprints
@@ -29,6 +36,8 @@ def create_app():
     app.register_blueprint(roadmap_bp)
     app.register_blueprint(explain_bp)
     app.register_blueprint(generator_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(tasks_bp)
     
     from api.interview import bp as interview_bp
     app.register_blueprint(interview_bp)
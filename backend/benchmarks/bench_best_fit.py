@@ -0,0 +1,61 @@
+"""Benchmark best-fit search: brute-force vs partitioned vector index.
+
+Run from the backend directory:
+    python -m benchmarks.bench_best_fit
+"""
+import random
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from services.vector_index import VectorIndex
+
+N_POSTINGS = 100000
+N_QUERIES = 200
+TOP_K = 10
+
+
+def make_postings(n, n_roles=40, vocab_size=5000, seed=42):
+    rng = random.Random(seed)
+    vocab = [f"skill{i}" for i in range(vocab_size)]
+    # each role draws most of its skills from its own slice of the vocabulary
+    role_pools = [vocab[r * 100:(r + 1) * 100] for r in range(n_roles)]
+    docs = []
+    for _ in range(n):
+        pool = role_pools[rng.randrange(n_roles)]
+        skills = rng.sample(pool, 8) + rng.sample(vocab, 4)
+        docs.append(' '.join(skills))
+    return docs
+
+
+def main():
+    docs = make_postings(N_POSTINGS)
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(docs)
+    queries = vectorizer.transform(random.Random(1).sample(docs, N_QUERIES))
+
+    for mode in ('brute', 'partitioned'):
+        start = time.perf_counter()
+        index = VectorIndex(X, mode=mode)
+        build = time.perf_counter() - start
+
+        latencies = []
+        results = []
+        for i in range(N_QUERIES):
+            start = time.perf_counter()
+            results.append(index.query(queries[i], k=TOP_K))
+            latencies.append(time.perf_counter() - start)
+        if mode == 'brute':
+            exact = results
+            recall = 1.0
+        else:
+            recall = np.mean([
+                len({r for r, _ in got} & {r for r, _ in want}) / TOP_K for got, want in zip(results, exact)
+            ])
+        print(f"{mode:>12}: build {build:.2f}s, p50 {np.percentile(latencies, 50) * 1000:.2f} ms, "
+              f"p99 {np.percentile(latencies, 99) * 1000:.2f} ms, recall@{TOP_K} {recall:.3f}")
+
+
+if __name__ == '__main__':
+    main()
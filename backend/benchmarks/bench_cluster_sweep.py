@@ -0,0 +1,74 @@
+"""Benchmark select_clusters: one worker process vs a pool over the same candidates.
+
+Run from the backend directory:
+    python -m benchmarks.bench_cluster_sweep [n_jobs]
+
+Job documents are synthetic postings drawn from a handful of skill topics and
+served by an in-memory collection; writes are discarded, so the timings are
+the sweep itself (fits plus silhouette scoring).
+"""
+import os
+import random
+import sys
+import time
+
+from services import db
+from services import role_clusterer
+
+TOPICS = [
+    ['python', 'flask', 'django', 'postgresql', 'docker', 'rest'],
+    ['react', 'javascript', 'typescript', 'css', 'html', 'redux'],
+    ['pytorch', 'tensorflow', 'keras', 'nlp', 'computer vision', 'mlops'],
+    ['pandas', 'spark', 'sql', 'airflow', 'bigquery', 'dbt'],
+    ['kotlin', 'swift', 'android', 'ios', 'flutter', 'firebase'],
+    ['terraform', 'kubernetes', 'aws', 'linux', 'ansible', 'prometheus'],
+]
+K_VALUES = [4, 6, 8, 10, 12, 16]
+
+
+class MemoryCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+
+    def find(self, *args, **kwargs):
+        return self.docs
+
+    def update_one(self, *args, **kwargs):
+        return None
+
+    def bulk_write(self, ops, ordered=True):
+        return None
+
+    def aggregate(self, pipeline, **kwargs):
+        # writes are discarded, so there is nothing to count
+        return iter([])
+
+
+def make_jobs(n, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(n):
+        skills = rng.sample(rng.choice(TOPICS), 4) + rng.sample(rng.choice(TOPICS), 1)
+        jobs.append({'_id': i, 'role': 'bench', 'skills': skills,
+                     'raw_text': ' '.join(skills) + f' posting {rng.randrange(n)}'})
+    return jobs
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    db.job_coll = MemoryCollection(make_jobs(n))
+    db.job_clusters = MemoryCollection()
+    db.role_versions_coll = MemoryCollection()
+    role_clusterer.cluster_model_store.save = lambda model: None
+
+    cores = os.cpu_count() or 1
+    print(f'{n} jobs, {len(K_VALUES)} candidates, {cores} cores')
+    for workers in sorted({1, cores}):
+        started = time.perf_counter()
+        report = role_clusterer.select_clusters(k_values=K_VALUES, workers=workers)
+        print(f'workers={workers:<3} {time.perf_counter() - started:7.2f}s  best k={report["best"]["k"]} '
+              f'silhouette={report["best"]["silhouette"]:.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark cluster_jobs persistence: per-job update_one calls vs batched bulk_write.
+
+Run from the backend directory:
+    python -m benchmarks.bench_cluster_writes
+
+The collections are in-process stand-ins that charge a fixed round-trip time
+per call (ROUND_TRIP_MS) plus a small per-operation cost, so the numbers
+reflect round trips rather than KMeans time.
+"""
+import random
+import time
+
+from services import db
+from services import role_clusterer
+
+JOB_COUNTS = (1000, 10000, 50000)
+ROUND_TRIP_MS = 0.5
+PER_OP_US = 2
+
+
+class StandinCollection:
+    """Counts round trips and sleeps like a nearby mongod would."""
+
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.round_trips = 0
+
+    def _charge(self, n_ops):
+        self.round_trips += 1
+        time.sleep(ROUND_TRIP_MS / 1000 + n_ops * PER_OP_US / 1e6)
+
+    def find(self, *args, **kwargs):
+        self._charge(len(self.docs))
+        return self.docs
+
+    def update_one(self, *args, **kwargs):
+        self._charge(1)
+
+    def bulk_write(self, ops, ordered=True):
+        self._charge(len(ops))
+
+    def aggregate(self, pipeline, **kwargs):
+        # writes are not applied, so there is nothing to count
+        self._charge(1)
+        return iter([])
+
+
+def make_jobs(n, seed=42):
+    rng = random.Random(seed)
+    vocab = ['python', 'flask', 'django', 'react', 'vue', 'pytorch', 'tensorflow', 'pandas', 'spark', 'sql',
+             'docker', 'kubernetes', 'javascript', 'typescript', 'nlp', 'keras']
+    jobs = []
+    for i in range(n):
+        skills = rng.sample(vocab, rng.randint(3, 6))
+        jobs.append({'_id': i, 'role': f'role{i % 20}', 'skills': skills, 'raw_text': ' '.join(skills)})
+    return jobs
+
+
+def per_job_writes(jobs, labels, clusters):
+    """The previous persistence: one update_one per job for the id, then one for the label."""
+    for job, lbl in zip(jobs, labels):
+        db.job_coll.update_one({'_id': job['_id']}, {'$set': {'cluster_id': int(lbl)}})
+    for job, lbl in zip(jobs, labels):
+        db.job_coll.update_one({'_id': job['_id']}, {'$set': {'role_label': clusters[int(lbl)]['role_label']}})
+
+
+def main():
+    # keep the live model (CLUSTER_MODEL_PATH) untouched by fits on synthetic postings
+    role_clusterer.cluster_model_store.save = lambda model: None
+    for n in JOB_COUNTS:
+        jobs = make_jobs(n)
+        db.job_coll = StandinCollection(jobs)
+        db.job_clusters = StandinCollection()
+        db.role_versions_coll = StandinCollection()
+
+        start = time.perf_counter()
+        clusters = role_clusterer.cluster_jobs(k=4)
+        bulk_total = time.perf_counter() - start
+        bulk_trips = db.job_coll.round_trips
+
+        # isolate persistence: time the old write pattern against the same labels
+        labels = [i % len(clusters) for i in range(n)]
+        db.job_coll = StandinCollection(jobs)
+        start = time.perf_counter()
+        per_job_writes(jobs, labels, clusters)
+        old_writes = time.perf_counter() - start
+
+        print(f"{n:>6} jobs  bulk cluster_jobs total {bulk_total:7.2f}s ({bulk_trips} job_coll round trips)   "
+              f"old per-job writes alone {old_writes:7.2f}s ({db.job_coll.round_trips} round trips)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the compiled ontology matcher against the sort-and-scan matcher.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ontology_matcher
+"""
+import random
+import time
+
+from services.ontology_matcher import OntologyMatcher
+
+SYNONYM_COUNTS = (100, 10000, 100000)
+WORDS = ["data", "web", "cloud", "api", "rest", "sql", "graph", "stream", "deep", "micro", "service",
+         "learning", "engine", "query", "cache", "react", "native", "vision", "network", "ops"]
+
+
+def scan_match(reverse_map, s):
+    """The previous nlp_pipeline matcher: re-sort on every miss, then scan."""
+    if s in reverse_map:
+        return reverse_map[s]
+    for syn, canon in sorted(reverse_map.items(), key=lambda x: -len(x[0])):
+        if syn in s:
+            return canon
+    return None
+
+
+def make_ontology(n, seed=42):
+    rng = random.Random(seed)
+    reverse_map = {}
+    while len(reverse_map) < n:
+        syn = " ".join(rng.sample(WORDS, rng.randint(1, 3))) + str(rng.randint(0, n))
+        reverse_map[syn] = f"CANON_{len(reverse_map) % max(1, n // 5)}"
+    return reverse_map
+
+
+def make_queries(reverse_map, n=200, seed=7):
+    rng = random.Random(seed)
+    syns = list(reverse_map)
+    queries = []
+    for _ in range(n):
+        if rng.random() < 0.5:
+            queries.append(f"advanced {rng.choice(syns)} development")
+        else:
+            queries.append(" ".join(rng.sample(WORDS, 3)) + " skills")
+    return queries
+
+
+def main():
+    print(f"{'synonyms':>9} {'scan (ms/q)':>12} {'automaton (ms/q)':>17} {'build (ms)':>11} {'speedup':>9}  same")
+    for n in SYNONYM_COUNTS:
+        reverse_map = make_ontology(n)
+        queries = make_queries(reverse_map, n=200 if n <= 10000 else 20)
+
+        start = time.perf_counter()
+        matcher = OntologyMatcher(reverse_map)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [scan_match(reverse_map, q) for q in queries]
+        scan = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        got = [reverse_map.get(q) or matcher.find(q) for q in queries]
+        auto = (time.perf_counter() - start) / len(queries)
+
+        print(f"{n:>9} {scan * 1000:>12.3f} {auto * 1000:>17.4f} {build * 1000:>11.1f} {scan / auto:>8.0f}x  {got == expected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark batched readiness scoring against the reference per-job loop.
+
+Run from the backend directory:
+    python -m benchmarks.bench_scoring
+"""
+import random
+import time
+
+from services.ml_core import MLCore
+
+JOB_COUNTS = (10, 100, 10000)
+
+
+def make_jobs(n_jobs, vocab_size=2000, seed=42):
+    rng = random.Random(seed)
+    vocab = [f"skill{i}" if i % 4 else f"framework{i} core{i % 50}" for i in range(vocab_size)]
+    jobs = []
+    for _ in range(n_jobs):
+        skills = rng.sample(vocab, rng.randint(5, 20))
+        weights = {s: rng.choice([1.0, 1.5, 2.0]) for s in skills if rng.random() < 0.4}
+        jobs.append({'role': 'Benchmark Role', 'skills': skills, 'weights': weights})
+    return jobs, vocab
+
+
+def timed(fn, *args, repeat=3):
+    best = float('inf')
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    print(f"{'jobs':>8} {'loop (ms)':>12} {'batched (ms)':>14} {'speedup':>9}  identical")
+    for n in JOB_COUNTS:
+        jobs, vocab = make_jobs(n)
+        syllabus = random.Random(7).sample(vocab, 40)
+        ml = MLCore().fit_corpus(jobs, version=n)
+
+        loop_t, loop_res = timed(ml._compute_similarity_loop, syllabus, jobs, repeat=1 if n > 1000 else 3)
+        batch_t, batch_res = timed(ml.compute_similarity, syllabus, jobs)
+        print(f"{n:>8} {loop_t * 1000:>12.1f} {batch_t * 1000:>14.1f} {loop_t / batch_t:>8.1f}x  {loop_res == batch_res}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Startup time and memory of the spaCy model loading strategies.
+
+Each scenario runs in a fresh interpreter from the backend directory:
+    python -m benchmarks.bench_spacy_startup
+
+- before: what importing `services` used to do (two spacy.load calls)
+- lazy boot: importing `services` with the shared registry (no model loaded)
+- lazy first use: boot plus the first model use
+- preload + fork: model loaded in a parent, then two forked workers use it;
+  reports the memory each worker holds privately (Linux only)
+"""
+import json
+import subprocess
+import sys
+import textwrap
+
+RSS = textwrap.dedent("""
+    import resource, time
+    def rss_mb():
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+""")
+
+SCENARIOS = {
+    'before (2x spacy.load)': """
+        start = time.perf_counter()
+        import spacy
+        from config import SPACY_MODEL
+        a = spacy.load(SPACY_MODEL)
+        b = spacy.load(SPACY_MODEL)
+        import services
+        elapsed = time.perf_counter() - start
+    """,
+    'lazy boot': """
+        start = time.perf_counter()
+        import services
+        elapsed = time.perf_counter() - start
+    """,
+    'lazy first use': """
+        start = time.perf_counter()
+        import services
+        from services.spacy_models import get_nlp
+        get_nlp()("warm up")
+        elapsed = time.perf_counter() - start
+    """,
+}
+
+FORK = textwrap.dedent("""
+    import gc, os, json
+    from services.spacy_models import preload, get_nlp
+    preload()
+    gc.freeze()
+
+    def private_mb():
+        with open('/proc/self/smaps_rollup') as f:
+            total = 0
+            for line in f:
+                if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                    total += int(line.split()[1])
+        return total / 1024
+
+    readers = []
+    for _ in range(2):
+        r, w = os.pipe()
+        if os.fork() == 0:
+            os.close(r)
+            get_nlp()("a worker handles a request about python and docker")
+            os.write(w, json.dumps(private_mb()).encode())
+            os._exit(0)
+        os.close(w)
+        readers.append(r)
+    sizes = [json.loads(os.read(r, 64)) for r in readers]
+    for _ in readers:
+        os.wait()
+    print(json.dumps({'worker_private_mb': sizes}))
+""")
+
+
+def run(code):
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    for name, body in SCENARIOS.items():
+        code = RSS + textwrap.dedent(body) + "\nimport json\nprint(json.dumps({'seconds': elapsed, 'rss_mb': rss_mb()}))\n"
+        res = run(code)
+        print(f"{name:>24}: {res['seconds'] * 1000:8.0f} ms  RSS {res['rss_mb']:7.1f} MB")
+
+    if sys.platform.startswith('linux'):
+        res = run(FORK)
+        print(f"{'preload + fork':>24}: private memory per worker "
+              + ", ".join(f"{mb:.1f} MB" for mb in res['worker_private_mb']))
+
+
+if __name__ == '__main__':
+    main()
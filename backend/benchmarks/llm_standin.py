@@ -0,0 +1,213 @@
+"""Local stand-in for the Cerebras chat-completions API, for load tests.
+
+Run from the backend directory:
+    python -m benchmarks.llm_standin --port 8765 --latency lognormal:-1.0,0.5 --error-rate 0.02
+
+then start the app with LLM_STANDIN=1 (or CEREBRAS_BASE_URL=http://127.0.0.1:8765).
+
+Answers are generated from the prompt: skill extraction finds ontology
+synonyms and known tech words in the text, batch extraction answers per
+posting id, roadmaps and papers follow the JSON shapes the app asks for,
+anything else gets a short chat reply. Streaming (`stream: true`) is served
+as server-sent events like the real API.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import ONTOLOGY_PATH, LLM_STANDIN_PORT
+from services.fallback_extractor import TECH_WORDS
+
+with open(ONTOLOGY_PATH, 'r', encoding='utf-8') as f:
+    _ONTOLOGY = json.load(f)
+_VOCABULARY = sorted({s.lower() for syns in _ONTOLOGY.values() for s in syns} | {w.lower() for w in TECH_WORDS},
+                     key=len, reverse=True)
+_WORD_RE = {w: re.compile(r'(?<![\w])' + re.escape(w) + r'(?![\w])') for w in _VOCABULARY if w}
+
+
+def parse_latency(spec: str):
+    """'fixed:S', 'uniform:LO,HI' or 'lognormal:MU,SIGMA' (seconds) -> sampler."""
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',') if v]
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f'Unsupported latency spec: {spec}')
+
+
+def find_skills(text: str) -> list:
+    text = text.lower()
+    return [w for w in _VOCABULARY if _WORD_RE[w].search(text)]
+
+
+def _section(prompt: str, marker: str) -> str:
+    i = prompt.find(marker)
+    return prompt[i + len(marker):] if i >= 0 else prompt
+
+
+def answer(prompt: str) -> str:
+    """Rule-generated reply in the shape the app's prompt asks for."""
+    if 'Postings:' in prompt and '### id:' in prompt:
+        out = {}
+        for block in _section(prompt, 'Postings:').split('### id: ')[1:]:
+            head, _, body = block.partition('\n')
+            out[head.split(' (role:')[0].strip()] = find_skills(body)
+        return json.dumps(out)
+    if 'JSON array of strings' in prompt:
+        return json.dumps(find_skills(_section(prompt, 'Text:')))
+    if 'WEEKLY LEARNING ROADMAP' in prompt:
+        missing = re.search(r'Missing Skills: (\[.*?\])', prompt)
+        skills = re.findall(r"'([^']+)'", missing.group(1)) if missing else []
+        role = re.search(r'Target Role: (.*)', prompt)
+        weeks = int((re.search(r'Time Constraint: (\d+) weeks', prompt) or [0, 8])[1])
+        return json.dumps({
+            'overview': {'target_role': role.group(1).strip() if role else 'General Learner',
+                         'current_level': 'beginner', 'estimated_readiness_percent': 40,
+                         'summary': 'Focus on the missing skills one at a time.'},
+            'missing_or_weak_skills': skills,
+            'weekly_roadmap': [
+                {'week': w + 1, 'focus': skills[w % len(skills)] if skills else 'Fundamentals',
+                 'goals': ['Learn the basics'], 'tasks': ['Build a small project'],
+                 'expected_outcome': 'Working knowledge'}
+                for w in range(weeks)
+            ],
+            'final_guidance': 'Keep practising every week.',
+        })
+    if 'technical paper' in prompt:
+        return json.dumps({k: f'{k.capitalize()} of the paper. ' * 5
+                           for k in ('abstract', 'introduction', 'methodology', 'results', 'conclusion')})
+    return 'This is a stand-in reply. Practise a little every day and build small projects.'
+
+
+class StandinConfig:
+    def __init__(self, latency='fixed:0', token_delay=0.0, error_rate=0.0, malformed_rate=0.0,
+                 hang_rate=0.0, hang_seconds=60.0, seed=None):
+        self.latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def draw(self):
+        """(latency, fail, malformed, hang) for one request."""
+        with self.lock:
+            self.requests += 1
+            r = self.rng
+            return (max(0.0, self.latency(r)), r.random() < self.error_rate,
+                    r.random() < self.malformed_rate, r.random() < self.hang_rate)
+
+
+def make_handler(config: StandinConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                req = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                return self._json(400, {'error': {'message': 'invalid JSON body'}})
+            if self.path.rstrip('/') != '/v1/chat/completions':
+                return self._json(404, {'error': {'message': 'not found'}})
+
+            latency, fail, malformed, hang = config.draw()
+            time.sleep(config.hang_seconds if hang else latency)
+            if fail:
+                status = config.rng.choice([429, 500, 503])
+                return self._json(status, {'error': {'message': 'injected failure', 'code': status}})
+
+            prompt = (req.get('messages') or [{}])[-1].get('content', '')
+            content = answer(prompt)
+            if malformed:
+                # cut the reply mid-way, like a truncated generation
+                content = content[:max(1, len(content) // 2)]
+
+            common = {'id': f'chatcmpl-{uuid.uuid4().hex[:12]}', 'created': int(time.time()),
+                      'model': req.get('model', 'standin'), 'system_fingerprint': 'fp_standin'}
+            if req.get('stream'):
+                return self._stream(common, content)
+            self._json(200, dict(common, object='chat.completion', choices=[
+                {'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}},
+            ], usage={'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4,
+                      'total_tokens': (len(prompt) + len(content)) // 4}))
+
+        def _stream(self, common, content):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            pieces = re.findall(r'\S+\s*', content) or ['']
+            for i, piece in enumerate(pieces):
+                chunk = dict(common, object='chat.completion.chunk', choices=[{
+                    'index': 0, 'delta': {'role': 'assistant', 'content': piece} if i == 0 else {'content': piece},
+                    'finish_reason': 'stop' if i == len(pieces) - 1 else None,
+                }])
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+                if config.token_delay:
+                    time.sleep(config.token_delay)
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def serve(config: StandinConfig, host='127.0.0.1', port=LLM_STANDIN_PORT):
+    """Start the stand-in on a background thread; returns the server (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=LLM_STANDIN_PORT)
+    parser.add_argument('--latency', default='fixed:0', help="fixed:S | uniform:LO,HI | lognormal:MU,SIGMA")
+    parser.add_argument('--token-delay', type=float, default=0.0, help='seconds between streamed chunks')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction answered with 429/500/503')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='fraction with truncated content')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='fraction that stall for --hang-seconds')
+    parser.add_argument('--hang-seconds', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = StandinConfig(args.latency, args.token_delay, args.error_rate, args.malformed_rate,
+                           args.hang_rate, args.hang_seconds, args.seed)
+    server = serve(config, args.host, args.port)
+    print(f'LLM stand-in listening on http://{args.host}:{server.server_address[1]}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
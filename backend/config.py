@@ -9,3 +9,85 @@ CEREBRAS_MODEL = os.getenv("CEREBRAS_MODEL", "LLaMA-3.x-70B")
 FLASK_ENV = os.getenv("FLASK_ENV", "development")
 HOURS_PER_WEEK = int(os.getenv("HOURS_PER_WEEK", "10"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-secret-key")
+COHORT_WRITE_BATCH = int(os.getenv("COHORT_WRITE_BATCH", "500"))
+BEST_FIT_BRUTE_MAX = int(os.getenv("BEST_FIT_BRUTE_MAX", "20000"))
+BEST_FIT_PROBES = int(os.getenv("BEST_FIT_PROBES", "8"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "1024"))
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "256"))
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+NLP_MULTIPROCESS_MIN = int(os.getenv("NLP_MULTIPROCESS_MIN", "2000"))
+NORM_CACHE_PATH = os.getenv("NORM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "norm_cache.sqlite3"))
+NORM_CACHE_SIZE = int(os.getenv("NORM_CACHE_SIZE", "50000"))
+NORM_CACHE_DISK_MAX = int(os.getenv("NORM_CACHE_DISK_MAX", "1000000"))
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_PRELOAD = os.getenv("SPACY_PRELOAD", "0") == "1"
+FALLBACK_CHUNK_CHARS = int(os.getenv("FALLBACK_CHUNK_CHARS", "2000"))
+# the rule-based extractor stays serial by default: each extra spaCy process loads its own copy of
+# the model, which only pays off for bulk back-fills; set FALLBACK_N_PROCESS > 1 to parallelize
+# inputs of at least FALLBACK_PARALLEL_MIN_CHARS characters
+FALLBACK_N_PROCESS = int(os.getenv("FALLBACK_N_PROCESS", "1"))
+FALLBACK_PARALLEL_MIN_CHARS = int(os.getenv("FALLBACK_PARALLEL_MIN_CHARS", "50000"))
+SYLLABUS_MAX_CHARS = int(os.getenv("SYLLABUS_MAX_CHARS", "50000"))
+ONTOLOGY_PATH = os.getenv("ONTOLOGY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_ontology.json"))
+ONTOLOGY_ARTIFACT_PATH = os.getenv("ONTOLOGY_ARTIFACT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_ontology.bin"))
+ONTOLOGY_RELOAD_INTERVAL = float(os.getenv("ONTOLOGY_RELOAD_INTERVAL", "5"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "llm_cache.sqlite3"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2000"))
+LLM_CACHE_DISK_MAX = int(os.getenv("LLM_CACHE_DISK_MAX", "100000"))
+# calls above this temperature are treated as non-deterministic and never cached
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))
+# seconds a cached response stays valid, per client method
+LLM_CACHE_TTLS = {
+    "extract_skills": int(os.getenv("LLM_CACHE_TTL_EXTRACT_SKILLS", str(30 * 86400))),
+    "explain_score": int(os.getenv("LLM_CACHE_TTL_EXPLAIN_SCORE", str(7 * 86400))),
+    "generate_roadmap": int(os.getenv("LLM_CACHE_TTL_GENERATE_ROADMAP", str(86400))),
+    "extract_skills_batch": int(os.getenv("LLM_CACHE_TTL_EXTRACT_SKILLS_BATCH", str(30 * 86400))),
+}
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+# "thread" coalesces identical cacheable LLM calls within a process, "process" also across
+# processes on the host (file locks + the shared response cache), "off" disables it
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "thread")
+LLM_SINGLE_FLIGHT_DIR = os.getenv("LLM_SINGLE_FLIGHT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "llm_locks"))
+LLM_SINGLE_FLIGHT_TIMEOUT = float(os.getenv("LLM_SINGLE_FLIGHT_TIMEOUT", "120"))
+# documents longer than this are split and extracted chunk by chunk (map-reduce)
+LLM_EXTRACT_CHUNK_CHARS = int(os.getenv("LLM_EXTRACT_CHUNK_CHARS", "4000"))
+LLM_EXTRACT_PARALLELISM = int(os.getenv("LLM_EXTRACT_PARALLELISM", "8"))
+LLM_EXTRACT_MAX_CHUNKS = int(os.getenv("LLM_EXTRACT_MAX_CHUNKS", "32"))
+# several job postings per extraction prompt for batch ingestion
+LLM_BATCH_MAX_ITEMS = int(os.getenv("LLM_BATCH_MAX_ITEMS", "10"))
+LLM_BATCH_PROMPT_CHARS = int(os.getenv("LLM_BATCH_PROMPT_CHARS", "12000"))
+# consecutive LLM failures that open the circuit, and seconds before a half-open probe
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+# total seconds an LLM-backed operation may take before callers fall back
+LLM_DEADLINES = {
+    "extract_skills": float(os.getenv("LLM_DEADLINE_EXTRACT_SKILLS", "20")),
+    "extract_skills_batch": float(os.getenv("LLM_DEADLINE_EXTRACT_SKILLS_BATCH", "120")),
+    "generate_roadmap": float(os.getenv("LLM_DEADLINE_GENERATE_ROADMAP", "30")),
+    "explain_score": float(os.getenv("LLM_DEADLINE_EXPLAIN_SCORE", "15")),
+    "chat": float(os.getenv("LLM_DEADLINE_CHAT", "30")),
+}
+CEREBRAS_BASE_URL = os.getenv("CEREBRAS_BASE_URL")
+# LLM_STANDIN=1 points the client at the local stand-in server (benchmarks/llm_standin.py)
+LLM_STANDIN = os.getenv("LLM_STANDIN", "0") == "1"
+LLM_STANDIN_PORT = int(os.getenv("LLM_STANDIN_PORT", "8765"))
+CLUSTER_WRITE_BATCH = int(os.getenv("CLUSTER_WRITE_BATCH", "1000"))
+CLUSTER_MODEL_PATH = os.getenv("CLUSTER_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "cluster_model.pkl"))
+CLUSTER_RELOAD_INTERVAL = float(os.getenv("CLUSTER_RELOAD_INTERVAL", "30"))
+# relative growth of the mean distance to centroids (or share of unknown terms) that calls for a full recluster
+CLUSTER_DRIFT_THRESHOLD = float(os.getenv("CLUSTER_DRIFT_THRESHOLD", "0.25"))
+CLUSTER_OOV_THRESHOLD = float(os.getenv("CLUSTER_OOV_THRESHOLD", "0.3"))
+# k-selection sweep (role_clusterer.select_clusters): candidate k values, worker processes, silhouette sample
+CLUSTER_SWEEP_K = [int(k) for k in os.getenv("CLUSTER_SWEEP_K", "4,6,8,10,12,16").split(",") if k.strip()]
+CLUSTER_SWEEP_WORKERS = int(os.getenv("CLUSTER_SWEEP_WORKERS", str(os.cpu_count() or 1)))
+CLUSTER_SWEEP_SAMPLE = int(os.getenv("CLUSTER_SWEEP_SAMPLE", "5000"))
+# most (algorithm, k) fits one sweep may ask for; workers and sample size are capped by the two above
+CLUSTER_SWEEP_MAX_CANDIDATES = int(os.getenv("CLUSTER_SWEEP_MAX_CANDIDATES", "32"))
+# in-process background task runner (services.task_runner)
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))
+TASK_QUEUE_MAX = int(os.getenv("TASK_QUEUE_MAX", "100"))
+# seconds a task lease outlives a holder that stopped renewing it
+TASK_LEASE_TTL = float(os.getenv("TASK_LEASE_TTL", "60"))
@@ -0,0 +1,16 @@
+# Picked up automatically by gunicorn when started from this directory.
+import gc
+import os
+
+# SPACY_PRELOAD=1 imports the app (and loads spaCy) once in the master so
+# forked workers share the model pages copy-on-write instead of each loading it.
+# The master must not talk to Mongo: services.db creates its client with
+# connect=False, so each worker opens its own connections after fork.
+preload_app = os.getenv("SPACY_PRELOAD", "0") == "1"
+
+
+def when_ready(server):
+    if preload_app:
+        # move preloaded objects out of the GC's reach so collections in the
+        # workers do not touch (and un-share) their pages
+        gc.freeze()
@@ -1,4 +1,5 @@
 from services import db
+from services.role_profiles import bump_role_version
 import datetime
 
 # Sample Job Data
@@ -43,10 +44,14 @@ jobs_data = [
 print("--- Seeding Jobs Collection ---")
 
 # Clear existing jobs to avoid duplicates during dev
+old_roles = db.job_coll.distinct('role')
 db.job_coll.delete_many({})
 print("Cleared existing jobs.")
 
 # Insert new jobs
 result = db.job_coll.insert_many(jobs_data)
 print(f"Inserted {len(result.inserted_ids)} job profiles.")
+
+# Invalidate cached role profiles for every role we touched
+bump_role_version(*old_roles, *[j["role"] for j in jobs_data])
 print("Done.")
@@ -0,0 +1,82 @@
+"""Heavy batch jobs runnable through services.task_runner (POST /tasks).
+
+The clustering tasks all rewrite job_clusters and the saved cluster model,
+so they share one lease and run one at a time across every worker.
+"""
+from pymongo import UpdateOne
+
+from services import db
+from services.task_runner import task
+from config import CLUSTER_WRITE_BATCH
+
+
+@task('cluster_jobs', lease='clustering')
+def run_cluster_jobs(params, progress):
+    from services.role_clusterer import cluster_jobs
+    clusters = cluster_jobs(k=int(params.get('k', 4)), algorithm=params.get('algorithm', 'kmeans'),
+                            progress=progress)
+    return {'clusters': list(clusters.values())}
+
+
+@task('select_clusters', lease='clustering')
+def run_select_clusters(params, progress):
+    from services.role_clusterer import select_clusters
+    options = {key: params[key] for key in ('k_values', 'algorithms', 'workers', 'sample_size') if key in params}
+    report = select_clusters(progress=progress, **options)
+    report['clusters'] = list(report['clusters'].values())
+    return report
+
+
+@task('refresh_clusters', lease='clustering')
+def run_refresh_clusters(params, progress):
+    from services.online_clusterer import refresh_clusters
+    return refresh_clusters()
+
+
+@task('renormalize_skills', lease='renormalize_skills')
+def run_renormalize_skills(params, progress):
+    """Re-run clean_and_normalize over stored skills, e.g. after an ontology change.
+
+    Always starts from the raw extracted skills: normalization is not
+    idempotent (a canonical "REST_API" maps to "REST_API_GENERIC"), so the
+    normalized field is never fed back in. Postings stored before ingest
+    kept `extracted_skills` are skipped.
+    """
+    from services.nlp_pipeline import clean_and_normalize
+    from services.role_profiles import bump_role_version
+
+    targets = params.get('collections') or ['syllabus', 'jobs']
+    batch_size = int(params.get('batch_size', CLUSTER_WRITE_BATCH))
+    plans = []
+    if 'syllabus' in targets:
+        plans.append(('syllabus', db.syllabus_coll, 'extracted_skills', 'normalized_skills'))
+    if 'jobs' in targets:
+        plans.append(('jobs', db.job_coll, 'extracted_skills', 'skills'))
+
+    total = sum(coll.count_documents({source: {'$exists': True}}) for _, coll, source, _ in plans)
+    done = 0
+    updated = {}
+    roles = set()
+    for label, coll, source, target in plans:
+        updated[label] = 0
+        ops = []
+        for doc in coll.find({source: {'$exists': True}}, {source: 1, target: 1, 'role': 1}):
+            normalized = clean_and_normalize(doc.get(source) or [])
+            if normalized != doc.get(target):
+                ops.append(UpdateOne({'_id': doc['_id']}, {'$set': {target: normalized}}))
+                if doc.get('role'):
+                    roles.add(doc['role'])
+            done += 1
+            if len(ops) >= batch_size:
+                coll.bulk_write(ops, ordered=False)
+                updated[label] += len(ops)
+                ops = []
+                progress(done, total)
+        if ops:
+            coll.bulk_write(ops, ordered=False)
+            updated[label] += len(ops)
+        progress(done, total)
+
+    if roles:
+        bump_role_version(*roles)
+    return {'scanned': done, 'updated': updated}
@@ -0,0 +1,124 @@
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from config import LLM_BREAKER_FAILURES, LLM_BREAKER_RESET
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend the breaker considers down."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The operation's time budget ran out before the call could be made."""
+
+
+_deadline = contextvars.ContextVar('llm_deadline', default=None)
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """Limit everything inside the block to `seconds`; an enclosing tighter deadline wins.
+
+    The budget lives in a context variable, so it follows asyncio tasks; code
+    handing work to threads must pass it along with contextvars.copy_context().
+    """
+    if seconds is None:
+        yield
+        return
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current deadline (None without one); raises DeadlineExceeded at zero."""
+    until = _deadline.get()
+    if until is None:
+        return None
+    left = until - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded('LLM deadline exceeded')
+    return left
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one backend.
+
+    After `failure_threshold` consecutive failures the circuit opens and every
+    call fails immediately with CircuitOpenError. After `reset_timeout`
+    seconds a single probe is let through (half-open): success closes the
+    circuit, failure opens it for another `reset_timeout`.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_timeout=LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {'opened': 0, 'rejected': 0, 'failures': 0, 'successes': 0}
+
+    def before_call(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._stats['rejected'] += 1
+        raise CircuitOpenError('LLM circuit open; using fallback')
+
+    def record_success(self):
+        with self._lock:
+            self._stats['successes'] += 1
+            self._failures = 0
+            if self._state != self.CLOSED:
+                logger.info('LLM circuit closed')
+            self._state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._stats['failures'] += 1
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self._stats['opened'] += 1
+                logger.warning('LLM circuit opened after %d consecutive failures', self._failures)
+
+    def release_probe(self):
+        """Give up a half-open probe slot without a verdict (e.g. the call never reached the backend)."""
+        with self._lock:
+            self._probing = False
+
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def stats(self):
+        state = self.state()
+        with self._lock:
+            return dict(self._stats, state=state, consecutive_failures=self._failures)
+
+
+llm_breaker = CircuitBreaker()
@@ -1,7 +1,9 @@
 from pymongo import MongoClient
 from config import MONGO_URI
 
-client = MongoClient(MONGO_URI)
+# connect=False: no sockets or monitor threads until the first operation, so the
+# client can be created in a gunicorn master (preload_app) and used after fork
+client = MongoClient(MONGO_URI, connect=False)
 db = client.get_default_database()
 
 users_coll = db["users"]
@@ -10,3 +12,8 @@ job_coll = db["job_skills"]
 job_clusters = db["job_clusters"]
 analysis_coll = db["analysis_results"]
 roadmap_coll = db["roadmap"]
+role_versions_coll = db["role_versions"]
+role_profiles_coll = db["role_profiles"]
+analysis_cache_coll = db["analysis_cache"]
+tasks_coll = db["tasks"]
+task_leases_coll = db["task_leases"]
@@ -1,7 +1,7 @@
 import re
-import spacy
-
-nlp = spacy.load("en_core_web_sm")
+from services.spacy_models import get_nlp
+from services.text_chunker import split_chunks
+from config import FALLBACK_CHUNK_CHARS, FALLBACK_N_PROCESS, FALLBACK_PARALLEL_MIN_CHARS
 
 # Very simple fallback: nouns and tech-like tokens
 TECH_WORDS = set([
@@ -9,24 +9,52 @@ TECH_WORDS = set([
     "tensorflow","pytorch","sklearn","scikit-learn","nlp","rest","graphql","react","nodejs","flask"
 ])
 
+# heuristics: sequences like "experience with X" or "knowledge of Y"
+PATTERNS = [re.compile(r"experience with ([a-zA-Z0-9+#\- ]+)"), re.compile(r"knowledge of ([a-zA-Z0-9+#\- ]+)")]
 
-def extract_skills_rule_based(text: str) -> list:
-    text = text.lower()
+
+def _regex_skills(text: str) -> set:
     # catch tech words explicitly
     found = set(re.findall(r"[a-zA-Z+#]+", text)) & TECH_WORDS
-
-    # noun chunks
-    doc = nlp(text)
-    for chunk in doc.noun_chunks:
-        token = chunk.root.lemma_.lower()
-        if len(token) > 2 and token.isalpha():
-            found.add(token)
-
-    # heuristics: sequences like "experience with X" or "knowledge of Y"
-    patterns = [r"experience with ([a-zA-Z0-9+#\- ]+)", r"knowledge of ([a-zA-Z0-9+#\- ]+)"]
-    for p in patterns:
-        for m in re.findall(p, text):
+    for p in PATTERNS:
+        for m in p.findall(text):
             part = m.strip().split(',')[0]
             found.add(part)
+    return found
+
+
+def extract_skills_rule_based_many(texts: list, n_process: int = None) -> list:
+    """Rule-based extraction for many documents at once (e.g. bulk back-fills).
+
+    Documents are split into section/sentence-bounded chunks and all chunks are
+    parsed in one `nlp.pipe` stream, spread over `n_process` worker processes
+    for large inputs. Results are merged per document and sorted, so they do not
+    depend on chunking or scheduling. Returns one sorted skill list per text.
+    """
+    lowered = [t.lower() for t in texts]
+    found = [set() for _ in lowered]
 
-    return sorted(found)
+    chunks = []
+    for i, text in enumerate(lowered):
+        for chunk in split_chunks(text, FALLBACK_CHUNK_CHARS):
+            chunks.append((chunk, i))
+            found[i] |= _regex_skills(chunk)
+
+    if n_process is None:
+        total = sum(len(t) for t in lowered)
+        n_process = FALLBACK_N_PROCESS if total >= FALLBACK_PARALLEL_MIN_CHARS else 1
+
+    # noun chunks
+    nlp = get_nlp()
+    disable = [p for p in ('ner',) if p in nlp.pipe_names]
+    for doc, i in nlp.pipe(chunks, as_tuples=True, disable=disable, n_process=n_process):
+        for chunk in doc.noun_chunks:
+            token = chunk.root.lemma_.lower()
+            if len(token) > 2 and token.isalpha():
+                found[i].add(token)
+
+    return [sorted(f) for f in found]
+
+
+def extract_skills_rule_based(text: str) -> list:
+    return extract_skills_rule_based_many([text])[0]
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import LLM_CACHE_PATH, LLM_CACHE_SIZE, LLM_CACHE_DISK_MAX
+
+logger = logging.getLogger(__name__)
+
+# how many disk writes between expiry/size sweeps of the SQLite store
+_PRUNE_EVERY = 200
+
+
+def response_key(model, prompt, max_tokens, temperature) -> str:
+    material = json.dumps([model, prompt, max_tokens, temperature])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """Cache of LLM response texts keyed by `response_key`.
+
+    Same layout as the normalization cache: an in-process LRU in front of a
+    SQLite file shared by the workers on the host. Every entry carries its own
+    expiry time. An empty `path` keeps the cache in memory only.
+
+    Any object with `get(key)` and `put(key, text, ttl)` can stand in for it.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_entries=LLM_CACHE_SIZE, disk_max=LLM_CACHE_DISK_MAX):
+        self.path = path
+        self.max_entries = max_entries
+        self.disk_max = disk_max
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def _conn(self):
+        """Per-thread (and per-process, after fork) SQLite connection, or None."""
+        if not self.path:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                'key TEXT PRIMARY KEY, response TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+        except sqlite3.Error as e:
+            logger.warning('LLM cache disk store unavailable (%s); using memory only', e)
+            self.path = None
+            return None
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[0]
+                del self._entries[key]
+                self._stats['expired'] += 1
+
+        row = None
+        conn = self._conn()
+        if conn is not None:
+            try:
+                row = conn.execute(
+                    'SELECT response, expires FROM llm_cache WHERE key = ? AND expires > ?', (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning('LLM cache read failed: %s', e)
+        if row is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        self._remember(key, row[0], row[1])
+        with self._lock:
+            self._stats['disk_hits'] += 1
+        return row[0]
+
+    def put(self, key, response, ttl):
+        expires = time.time() + ttl
+        self._remember(key, response, expires)
+        conn = self._conn()
+        if conn is None:
+            return
+        try:
+            conn.execute('INSERT OR REPLACE INTO llm_cache (key, response, expires) VALUES (?, ?, ?)',
+                         (key, response, expires))
+            self._writes += 1
+            if self._writes >= _PRUNE_EVERY:
+                self._writes = 0
+                self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning('LLM cache write failed: %s', e)
+
+    def _prune(self, conn):
+        """Drop expired rows, then the oldest rows beyond `disk_max`."""
+        conn.execute('DELETE FROM llm_cache WHERE expires <= ?', (time.time(),))
+        excess = conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0] - self.disk_max
+        if excess > 0:
+            conn.execute(
+                'DELETE FROM llm_cache WHERE rowid IN (SELECT rowid FROM llm_cache ORDER BY rowid LIMIT ?)',
+                (excess,),
+            )
+
+    def _remember(self, key, response, expires):
+        with self._lock:
+            self._entries[key] = (response, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['disk_hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                size=len(self._entries),
+                max_size=self.max_entries,
+                disk_path=self.path,
+                hit_rate=(self._stats['hits'] + self._stats['disk_hits']) / lookups if lookups else 0.0,
+            )
+
+
+llm_cache = LLMResponseCache()
@@ -1,92 +1,408 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
 import logging
 import json
-from config import CEREBRAS_API_KEY, CEREBRAS_MODEL
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from config import (CEREBRAS_API_KEY, CEREBRAS_MODEL, LLM_CACHE_MAX_TEMPERATURE, LLM_CACHE_TTLS,
+                    LLM_MAX_CONNECTIONS, LLM_EXTRACT_CHUNK_CHARS, LLM_EXTRACT_PARALLELISM,
+                    LLM_EXTRACT_MAX_CHUNKS, LLM_BATCH_MAX_ITEMS, LLM_BATCH_PROMPT_CHARS,
+                    LLM_MAX_RETRIES, LLM_DEADLINES, CEREBRAS_BASE_URL, LLM_STANDIN, LLM_STANDIN_PORT)
+from services.circuit_breaker import DeadlineExceeded, deadline, llm_breaker, remaining
+from services.llm_cache import llm_cache, response_key
+from services.llm_limiter import llm_limiter
+from services.single_flight import single_flight
+from services.text_chunker import split_chunks
 
 logger = logging.getLogger(__name__)
 
 # Attempt to import the official Cerebras SDK
 try:
-    from cerebras.cloud.sdk import Cerebras
+    import httpx
+    from cerebras.cloud.sdk import (APIConnectionError, APIStatusError, AsyncCerebras, Cerebras,
+                                    DefaultAsyncHttpxClient, DefaultHttpxClient)
 except Exception:
     Cerebras = None
     logger.warning("Cerebras SDK not installed; LLM calls will fail or use fallback.")
 
 
+def _pool_limits():
+    # keep-alive connections reused across requests, sized to the in-flight cap
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+
+def _is_backend_failure(exc) -> bool:
+    """Errors that say the LLM service is unhealthy (not e.g. a rejected request).
+
+    Only the SDK's connection/timeout errors (and raw httpx transport errors,
+    which can surface while a stream is read) and 5xx/429 responses count;
+    anything else, e.g. a bug in our own code, must not trip the breaker.
+    """
+    if Cerebras is None:
+        return False
+    if isinstance(exc, (APIConnectionError, httpx.TransportError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return False
+
+
+# cache validators: raise for replies that parse but should not be remembered,
+# e.g. the "{}" _call_model returns for an empty completion
+def _valid_skill_list(text):
+    skills = json.loads(text)
+    if not isinstance(skills, list) or not skills or not all(isinstance(s, str) for s in skills):
+        raise ValueError("expected a non-empty JSON array of skill strings")
+
+
+def _valid_skill_map(text):
+    parsed = json.loads(text)
+    if not isinstance(parsed, dict) or not parsed or not all(isinstance(v, list) for v in parsed.values()):
+        raise ValueError("expected a JSON object mapping posting ids to skill arrays")
+
+
+def _valid_roadmap(text):
+    roadmap = json.loads(text)
+    if not isinstance(roadmap, dict) or not isinstance(roadmap.get("weekly_roadmap"), list) \
+            or not roadmap["weekly_roadmap"]:
+        raise ValueError("expected a JSON object with a non-empty weekly_roadmap")
+
+
+def _budgeted(method):
+    """Run the decorated client method under its LLM_DEADLINES budget."""
+    def wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def run_async(*args, **kwargs):
+                with deadline(LLM_DEADLINES.get(method)):
+                    return await fn(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with deadline(LLM_DEADLINES.get(method)):
+                return fn(*args, **kwargs)
+        return run
+    return wrap
+
+
+def _submit(pool, fn, *args):
+    # worker threads do not inherit context variables; carry the deadline over
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
 class CerebrasClient:
-    def __init__(self, api_key: str = None, model: str = None):
+    def __init__(self, api_key: str = None, model: str = None, cache=llm_cache, limiter=llm_limiter,
+                 flight=single_flight, breaker=llm_breaker, base_url: str = None):
         self.api_key = api_key or CEREBRAS_API_KEY
+        self.base_url = base_url or CEREBRAS_BASE_URL
+        if LLM_STANDIN and not base_url:
+            self.base_url = f"http://127.0.0.1:{LLM_STANDIN_PORT}"
+        if self.base_url and not self.api_key:
+            # local endpoints ignore the key, but the SDK insists on one
+            self.api_key = "local"
         self.model = model or CEREBRAS_MODEL
+        # response cache (see services.llm_cache); None disables caching
+        self.cache = cache
+        # caps concurrent calls across every user of the limiter (see services.llm_limiter)
+        self.limiter = limiter
+        # coalesces identical cacheable calls that are in flight at once (see services.single_flight)
+        self.flight = flight
+        # fails calls fast while the backend is down (see services.circuit_breaker)
+        self.breaker = breaker
         self.client = None
+        # one async client per event loop; httpx async pools are bound to their loop
+        self._async_clients = weakref.WeakKeyDictionary()
 
         if Cerebras is None:
             logger.debug("Cerebras class not found. Install `cerebras-cloud-sdk` to enable LLM features.")
             return
 
         try:
-            self.client = Cerebras(api_key=self.api_key)
+            self.client = Cerebras(api_key=self.api_key, base_url=self.base_url, max_retries=LLM_MAX_RETRIES,
+                                   http_client=DefaultHttpxClient(limits=_pool_limits()))
         except Exception as e:
             logger.exception("Failed to initialize Cerebras client: %s", e)
             self.client = None
 
-        except Exception as e:
-            logger.exception("Cerebras API call failed: %s", e)
-            raise
-
-    def _call_model(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2) -> dict:
-        """Call the Cerebras chat completions API and return a dict with key `text`."""
+    def _async_client(self):
         if self.client is None:
             raise RuntimeError("Cerebras SDK not available or client initialization failed")
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncCerebras(api_key=self.api_key, base_url=self.base_url, max_retries=LLM_MAX_RETRIES,
+                                   http_client=DefaultAsyncHttpxClient(limits=_pool_limits()))
+            self._async_clients[loop] = client
+        return client
 
-        messages = [
+    @staticmethod
+    def _messages(prompt: str) -> list:
+        return [
             {"role": "system", "content": "You are a helpful assistant. When asked to produce JSON, output only valid JSON."},
             {"role": "user", "content": prompt},
         ]
 
+    def _request_options(self) -> dict:
+        """Per-attempt SDK timeout that keeps all retries inside the current deadline."""
+        left = remaining()
+        return {} if left is None else {"timeout": left / (LLM_MAX_RETRIES + 1)}
+
+    def _settle(self, exc):
+        """Tell the breaker how a guarded call ended."""
+        if exc is None:
+            self.breaker.record_success()
+        elif isinstance(exc, Exception) and not isinstance(exc, DeadlineExceeded) and _is_backend_failure(exc):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release_probe()
+
+    @contextlib.contextmanager
+    def _guarded(self):
+        """Breaker check, in-flight slot and deadline around one backend call; yields SDK options."""
+        self.breaker.before_call()
         try:
-            res = self.client.chat.completions.create(
-                messages=messages,
-                model=self.model,
-                max_completion_tokens=max_tokens,
-                temperature=temperature,
-                stream=False,
-            )
-            
-            # Debug logging
-            logger.info(f"Raw Cerebras response type: {type(res)}")
-            # logger.info(f"Raw Cerebras response: {res}") 
-
-            # SDK returns object; try to extract content
-            content = None
-            try:
-                content = res.choices[0].message.content
-            except Exception as e:
-                logger.warning(f"Standard extraction failed: {e}")
-                # Some SDK versions may provide different shape
-                content = getattr(res, "text", None) or getattr(res, "message", "")
-            
-            logger.info(f"Extracted content: {content}")
+            self.limiter.acquire(timeout=remaining())
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        try:
+            options = self._request_options()
+            yield options
+        except BaseException as e:
+            self._settle(e)
+            raise
+        else:
+            self._settle(None)
+        finally:
+            self.limiter.release()
 
-            if not content:
-                logger.error("Content is empty or None")
-                return {"text": "{}"} # Return empty json object instead of empty string to avoid crash
+    @contextlib.asynccontextmanager
+    async def _aguarded(self):
+        """asyncio version of `_guarded`."""
+        self.breaker.before_call()
+        try:
+            await self.limiter.acquire_async(timeout=remaining())
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        try:
+            options = self._request_options()
+            yield options
+        except BaseException as e:
+            self._settle(e)
+            raise
+        else:
+            self._settle(None)
+        finally:
+            self.limiter.release()
+
+    def _call_model(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2) -> dict:
+        """Call the Cerebras chat completions API and return a dict with key `text`."""
+        if self.client is None:
+            raise RuntimeError("Cerebras SDK not available or client initialization failed")
 
-            return {"text": content}
+        try:
+            with self._guarded() as options:
+                res = self.client.chat.completions.create(
+                    messages=self._messages(prompt),
+                    model=self.model,
+                    max_completion_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=False,
+                    **options,
+                )
+            return self._response_text(res)
         except Exception as e:
             logger.exception("Cerebras API call failed: %s", e)
             raise
 
-    def extract_skills(self, text: str, role: str = None) -> list:
-        """Use Cerebras to extract skills. Returns list[str]."""
+    async def _acall_model(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2) -> dict:
+        """asyncio version of `_call_model`; shares the same in-flight limit."""
+        client = self._async_client()
+        try:
+            async with self._aguarded() as options:
+                res = await client.chat.completions.create(
+                    messages=self._messages(prompt),
+                    model=self.model,
+                    max_completion_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=False,
+                    **options,
+                )
+            return self._response_text(res)
+        except Exception as e:
+            logger.exception("Cerebras API call failed: %s", e)
+            raise
+
+    @staticmethod
+    def _response_text(res) -> dict:
+        # Debug logging
+        logger.info(f"Raw Cerebras response type: {type(res)}")
+        # logger.info(f"Raw Cerebras response: {res}") 
+
+        # SDK returns object; try to extract content
+        content = None
+        try:
+            content = res.choices[0].message.content
+        except Exception as e:
+            logger.warning(f"Standard extraction failed: {e}")
+            # Some SDK versions may provide different shape
+            content = getattr(res, "text", None) or getattr(res, "message", "")
+        
+        logger.info(f"Extracted content: {content}")
+
+        if not content:
+            logger.error("Content is empty or None")
+            return {"text": "{}"} # Return empty json object instead of empty string to avoid crash
+
+        return {"text": content}
+
+    def _stream_model(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2):
+        """Call the chat completions API with `stream=True`; yields text deltas as they arrive."""
+        if self.client is None:
+            raise RuntimeError("Cerebras SDK not available or client initialization failed")
+
+        try:
+            # the slot is held until the stream is exhausted or closed
+            with self._guarded() as options:
+                stream = self.client.chat.completions.create(
+                    messages=self._messages(prompt),
+                    model=self.model,
+                    max_completion_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    **options,
+                )
+                for chunk in stream:
+                    try:
+                        delta = chunk.choices[0].delta
+                        # the SDK leaves the delta a plain dict when a chunk matches another response model
+                        delta = delta.get("content") if isinstance(delta, dict) else delta.content
+                    except (AttributeError, IndexError, TypeError):
+                        delta = None
+                    if delta:
+                        yield delta
+        except Exception as e:
+            logger.exception("Cerebras streaming call failed: %s", e)
+            raise
+
+    def _cache_slot(self, method, prompt, max_tokens, temperature):
+        """(key, ttl) if this call may be cached, else None."""
+        ttl = LLM_CACHE_TTLS.get(method)
+        if self.cache is None or not ttl or temperature > LLM_CACHE_MAX_TEMPERATURE:
+            return None
+        return response_key(self.model, prompt, max_tokens, temperature), ttl
+
+    def _cache_lookup(self, slot):
+        text = self.cache.get(slot[0])
+        return {"text": text} if text is not None else None
+
+    def _cache_store(self, slot, res, validate):
+        text = res.get("text")
+        if not text:
+            return
+        if validate is not None:
+            try:
+                validate(text)
+            except Exception as e:
+                logger.info("Not caching LLM response that failed validation: %s", e)
+                return
+        try:
+            self.cache.put(slot[0], text, slot[1])
+        except Exception as e:
+            logger.warning("Could not store LLM response in cache: %s", e)
+
+    def _call_model_cached(self, method: str, prompt: str, max_tokens: int = 512, temperature: float = 0.2,
+                           validate=None) -> dict:
+        """`_call_model` through the response cache.
+
+        Only calls at or below LLM_CACHE_MAX_TEMPERATURE are cached, for the TTL
+        configured for `method`. `validate(text)` may raise to keep a response
+        (e.g. unparseable JSON) out of the cache.
+        """
+        slot = self._cache_slot(method, prompt, max_tokens, temperature)
+        if slot is None:
+            return self._call_model(prompt, max_tokens=max_tokens, temperature=temperature)
+        cached = self._cache_lookup(slot)
+        if cached is not None:
+            return cached
+
+        def fetch():
+            res = self._call_model(prompt, max_tokens=max_tokens, temperature=temperature)
+            self._cache_store(slot, res, validate)
+            return res
+
+        return self.flight.do(slot[0], fetch, recheck=lambda: self._cache_lookup(slot))
+
+    async def _acall_model_cached(self, method: str, prompt: str, max_tokens: int = 512, temperature: float = 0.2,
+                                  validate=None) -> dict:
+        """asyncio version of `_call_model_cached`."""
+        slot = self._cache_slot(method, prompt, max_tokens, temperature)
+        if slot is None:
+            return await self._acall_model(prompt, max_tokens=max_tokens, temperature=temperature)
+        cached = self._cache_lookup(slot)
+        if cached is not None:
+            return cached
+
+        async def fetch():
+            res = await self._acall_model(prompt, max_tokens=max_tokens, temperature=temperature)
+            self._cache_store(slot, res, validate)
+            return res
+
+        return await self.flight.ado(slot[0], fetch)
+
+    @staticmethod
+    def _extract_prompt(text: str, role: str = None) -> str:
         prompt = (
             "Extract technical skills, tools, frameworks, libraries, and core concepts from the following text. "
             "Return output as a JSON array of strings ONLY (e.g. [\"python\", \"flask\"]).\n\n"
-            f"Text:\n{text[:4000]}"
+            f"Text:\n{text[:LLM_EXTRACT_CHUNK_CHARS]}"
         )
         if role:
             prompt += f"\nTarget role: {role}."
+        return prompt
+
+    @staticmethod
+    def _document_chunks(text: str) -> list:
+        """The pieces `extract_skills` sends to the model: the text itself if it fits one prompt."""
+        if len(text) <= LLM_EXTRACT_CHUNK_CHARS:
+            return [text]
+        chunks = split_chunks(text, LLM_EXTRACT_CHUNK_CHARS)
+        if len(chunks) > LLM_EXTRACT_MAX_CHUNKS:
+            logger.warning("Document split into %d chunks; extracting only the first %d",
+                           len(chunks), LLM_EXTRACT_MAX_CHUNKS)
+            chunks = chunks[:LLM_EXTRACT_MAX_CHUNKS]
+        return chunks or [text]
+
+    @staticmethod
+    def _merge_extractions(results: list, errors: list, n_chunks: int) -> list:
+        """Union of the chunk skill lists, first spelling of each skill kept.
+
+        Callers run the result through clean_and_normalize, which folds
+        synonyms into canonical skills. Fails only if every chunk failed.
+        """
+        if not results:
+            raise errors[0]
+        if errors:
+            logger.warning("Skill extraction failed for %d of %d chunks", len(errors), n_chunks)
+        merged = {}
+        for skills in results:
+            if not isinstance(skills, list):
+                continue
+            for skill in skills:
+                if isinstance(skill, str) and skill.strip():
+                    merged.setdefault(skill.strip().lower(), skill)
+        return list(merged.values())
 
+    def _extract_one(self, text: str, role: str = None) -> list:
+        prompt = self._extract_prompt(text, role)
         try:
-            res = self._call_model(prompt, max_tokens=1024, temperature=0.0)
+            res = self._call_model_cached("extract_skills", prompt, max_tokens=1024, temperature=0.0,
+                                          validate=_valid_skill_list)
             text_out = res.get("text", "[]")
             skills = json.loads(text_out)
             return skills
@@ -97,6 +413,133 @@ class CerebrasClient:
             logger.exception("LLM skill extraction failed: %s", e)
             raise
 
+    @_budgeted("extract_skills")
+    def extract_skills(self, text: str, role: str = None) -> list:
+        """Use Cerebras to extract skills. Returns list[str].
+
+        Documents longer than LLM_EXTRACT_CHUNK_CHARS are split on section and
+        sentence boundaries; the chunks are extracted concurrently (up to
+        LLM_EXTRACT_PARALLELISM at a time) and their lists merged.
+        """
+        chunks = self._document_chunks(text)
+        if len(chunks) == 1:
+            return self._extract_one(chunks[0], role)
+
+        results, errors = [], []
+        with ThreadPoolExecutor(max_workers=min(LLM_EXTRACT_PARALLELISM, len(chunks))) as pool:
+            for future in [_submit(pool, self._extract_one, chunk, role) for chunk in chunks]:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        return self._merge_extractions(results, errors, len(chunks))
+
+    @staticmethod
+    def _batch_prompt(items: list) -> str:
+        postings = "\n\n".join(
+            f"### id: {item['id']}" + (f" (role: {item['role']})" if item.get('role') else "") + f"\n{item['text']}"
+            for item in items
+        )
+        return (
+            "Extract technical skills, tools, frameworks, libraries, and core concepts from each of the following "
+            "job postings. Return output as a JSON object ONLY, mapping every posting id to a JSON array of strings "
+            "(e.g. {\"a\": [\"python\", \"flask\"], \"b\": [\"sql\"]}).\n\n"
+            f"Postings:\n{postings}"
+        )
+
+    @staticmethod
+    def _pack_batches(items: list) -> list:
+        """Group items into prompts of at most LLM_BATCH_MAX_ITEMS and LLM_BATCH_PROMPT_CHARS of posting text."""
+        batches, current, size = [], [], 0
+        for item in items:
+            if current and (len(current) >= LLM_BATCH_MAX_ITEMS or size + len(item['text']) > LLM_BATCH_PROMPT_CHARS):
+                batches.append(current)
+                current, size = [], 0
+            current.append(item)
+            size += len(item['text'])
+        if current:
+            batches.append(current)
+        return batches
+
+    def _extract_batch(self, items: list) -> dict:
+        """One prompt for several postings; returns {id: skills} for the ids answered correctly."""
+        try:
+            res = self._call_model_cached("extract_skills_batch", self._batch_prompt(items),
+                                          max_tokens=min(4096, 512 * len(items)), temperature=0.0,
+                                          validate=_valid_skill_map)
+            parsed = json.loads(res.get("text", "{}"))
+        except Exception as e:
+            logger.warning("Batched skill extraction failed for %d postings: %s", len(items), e)
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
+        out = {}
+        for item in items:
+            skills = parsed.get(str(item['id']))
+            if isinstance(skills, list) and all(isinstance(skill, str) for skill in skills):
+                out[item['id']] = skills
+        return out
+
+    @_budgeted("extract_skills_batch")
+    def extract_skills_batch(self, items: list) -> dict:
+        """Extract skills for many postings with few round trips.
+
+        `items` are dicts with `id`, `text` and optional `role`. Postings that fit
+        one chunk are packed several to a prompt that answers with an id-keyed
+        JSON object; batches run concurrently like document chunks. Postings
+        missing or malformed in a batch answer, and long postings, go through
+        `extract_skills` one by one. Returns {id: skills or None}, None where
+        even the single call failed.
+        """
+        short = [item for item in items if len(item['text']) <= LLM_EXTRACT_CHUNK_CHARS]
+        batches = self._pack_batches(short)
+
+        results = {}
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(LLM_EXTRACT_PARALLELISM, len(batches))) as pool:
+                for future in [_submit(pool, self._extract_batch, batch) for batch in batches]:
+                    results.update(future.result())
+
+        pending = [item for item in items if item['id'] not in results]
+        if pending:
+            if short:
+                logger.info("Falling back to single extraction for %d of %d postings", len(pending), len(items))
+
+            def single(item):
+                try:
+                    return self.extract_skills(item['text'], role=item.get('role'))
+                except Exception:
+                    return None
+
+            with ThreadPoolExecutor(max_workers=min(LLM_EXTRACT_PARALLELISM, len(pending))) as pool:
+                for item, future in [(item, _submit(pool, single, item)) for item in pending]:
+                    results[item['id']] = future.result()
+        return results
+
+    async def _aextract_one(self, text: str, role: str = None) -> list:
+        res = await self._acall_model_cached("extract_skills", self._extract_prompt(text, role), max_tokens=1024,
+                                             temperature=0.0, validate=_valid_skill_list)
+        return json.loads(res.get("text", "[]"))
+
+    @_budgeted("extract_skills")
+    async def aextract_skills(self, text: str, role: str = None) -> list:
+        """asyncio version of `extract_skills`."""
+        chunks = self._document_chunks(text)
+        if len(chunks) == 1:
+            return await self._aextract_one(chunks[0], role)
+
+        gate = asyncio.Semaphore(LLM_EXTRACT_PARALLELISM)
+
+        async def extract(chunk):
+            async with gate:
+                return await self._aextract_one(chunk, role)
+
+        outcomes = await asyncio.gather(*[extract(c) for c in chunks], return_exceptions=True)
+        results = [o for o in outcomes if not isinstance(o, BaseException)]
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        return self._merge_extractions(results, errors, len(chunks))
+
+    @_budgeted("generate_roadmap")
     def generate_roadmap(self, missing_skills: list, target_role: str, hours_per_week: int = 10, weeks: int = 8, lang: str = 'en') -> dict:
         lang_name = {"en": "English", "hi": "Hindi", "te": "Telugu"}.get(lang, "English")
         prompt = (
@@ -140,7 +583,8 @@ class CerebrasClient:
             f"Time Constraint: {weeks} weeks, {hours_per_week} hours/week."
         )
         try:
-            res = self._call_model(prompt, max_tokens=2048, temperature=0.2)
+            res = self._call_model_cached("generate_roadmap", prompt, max_tokens=2048, temperature=0.2,
+                                          validate=_valid_roadmap)
             roadmap = json.loads(res.get("text", "{}"))
             return roadmap
         except json.JSONDecodeError:
@@ -150,6 +594,7 @@ class CerebrasClient:
             logger.exception("LLM roadmap generation failed: %s", e)
             raise
 
+    @_budgeted("explain_score")
     def explain_score(self, readiness_pct: float, gaps: dict, lang: str = 'en') -> str:
         lang_name = {"en": "English", "hi": "Hindi", "te": "Telugu"}.get(lang, "English")
         prompt = (
@@ -157,24 +602,57 @@ class CerebrasClient:
             f"IMPORTANT: Respond ONLY in {lang_name}. Keep it actionable and friendly."
         )
         try:
-            res = self._call_model(prompt, max_tokens=512, temperature=0.3)
+            res = self._call_model_cached("explain_score", prompt, max_tokens=512, temperature=0.3)
             return res.get("text", "")
         except Exception as e:
             logger.exception("LLM explain failed: %s", e)
             raise
 
-    def chat(self, message: str, lang: str = 'en') -> str:
-        """General chat interaction with the AI Mentor."""
+    @staticmethod
+    def _chat_prompt(message: str, lang: str) -> str:
         lang_name = {"en": "English", "hi": "Hindi", "te": "Telugu"}.get(lang, "English")
         system_prompt = (
             "You are EduMentor, a helpful and encouraging academic AI assistant for undergraduate students. "
             f"IMPORTANT: You MUST speak ONLY in {lang_name}. "
             "Help them with programming concepts, career advice, and study tips."
         )
-        prompt = f"{system_prompt}\n\nUser Question: {message}"
+        return f"{system_prompt}\n\nUser Question: {message}"
+
+    @_budgeted("chat")
+    def chat(self, message: str, lang: str = 'en') -> str:
+        """General chat interaction with the AI Mentor."""
+        prompt = self._chat_prompt(message, lang)
         try:
             res = self._call_model(prompt, max_tokens=1024, temperature=0.7)
             return res.get("text", "I'm having trouble thinking right now.")
         except Exception as e:
             logger.exception("LLM chat failed: %s", e)
             return "Server Error."
+
+    @_budgeted("chat")
+    async def achat(self, message: str, lang: str = 'en') -> str:
+        """asyncio version of `chat`."""
+        try:
+            res = await self._acall_model(self._chat_prompt(message, lang), max_tokens=1024, temperature=0.7)
+            return res.get("text", "I'm having trouble thinking right now.")
+        except Exception as e:
+            logger.exception("LLM chat failed: %s", e)
+            return "Server Error."
+
+    def chat_stream(self, message: str, lang: str = 'en'):
+        """Like `chat`, but yields the reply in pieces as the model produces them."""
+        return self._stream_model(self._chat_prompt(message, lang), max_tokens=1024, temperature=0.7)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_llm() -> CerebrasClient:
+    """The process-wide client: one connection pool, cache and in-flight limit for every blueprint."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = CerebrasClient()
+    return _shared
@@ -0,0 +1,143 @@
+import asyncio
+import collections
+import threading
+import time
+
+from config import LLM_MAX_IN_FLIGHT, LLM_QUEUE_TIMEOUT
+
+
+class _Waiter:
+    __slots__ = ('wake', 'granted')
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class InFlightLimiter:
+    """Process-wide cap on concurrent LLM calls, shared by sync and asyncio callers.
+
+    Callers beyond `limit` queue (first come, first served) for up to
+    `timeout` seconds and then get a RuntimeError, which the client methods
+    already treat as an LLM failure. A released slot is handed straight to
+    the next waiter: a thread is woken through an Event, a coroutine through
+    a future on its own event loop, so async callers wait without holding a
+    worker thread.
+    """
+
+    def __init__(self, limit=LLM_MAX_IN_FLIGHT, timeout=LLM_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.timeout = timeout
+        self._free = limit
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+        self._stats = {'in_flight': 0, 'waiting': 0, 'peak_waiting': 0, 'completed': 0,
+                       'rejected': 0, 'wait_seconds': 0.0}
+
+    # the helpers below run with self._lock held
+
+    def _take(self):
+        if self._free and not self._waiters:
+            self._free -= 1
+            self._stats['in_flight'] += 1
+            return True
+        return False
+
+    def _enqueue(self, wake):
+        waiter = _Waiter(wake)
+        self._waiters.append(waiter)
+        self._stats['waiting'] += 1
+        self._stats['peak_waiting'] = max(self._stats['peak_waiting'], self._stats['waiting'])
+        return waiter
+
+    def _hand_off(self):
+        """Pass a freed slot to the oldest waiter, or return it to the pool."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            try:
+                waiter.wake()
+            except RuntimeError:  # its event loop has closed; nobody is waiting any more
+                continue
+            waiter.granted = True
+            return
+        self._free += 1
+
+    def _dequeued(self, waiter, waited, cancelled=False):
+        with self._lock:
+            self._stats['waiting'] -= 1
+            self._stats['wait_seconds'] += waited
+            if waiter.granted:
+                if cancelled:
+                    # handed over just as the caller gave up: pass it on
+                    self._hand_off()
+                else:
+                    self._stats['in_flight'] += 1
+                return
+            self._waiters.remove(waiter)
+            if not cancelled:
+                self._stats['rejected'] += 1
+        if not cancelled:
+            raise RuntimeError("Too many concurrent LLM calls; timed out waiting for a slot")
+
+    def _wait_limit(self, timeout):
+        return self.timeout if timeout is None else min(self.timeout, timeout)
+
+    def acquire(self, timeout=None):
+        """Take a slot, waiting at most `timeout` (capped by the limiter's own timeout)."""
+        event = threading.Event()
+        with self._lock:
+            if self._take():
+                return
+            waiter = self._enqueue(event.set)
+        start = time.monotonic()
+        event.wait(self._wait_limit(timeout))
+        self._dequeued(waiter, time.monotonic() - start)
+
+    async def acquire_async(self, timeout=None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._take():
+                return
+            waiter = self._enqueue(lambda: loop.call_soon_threadsafe(_resolve, future))
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self._wait_limit(timeout))
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._dequeued(waiter, time.monotonic() - start, cancelled=True)
+            raise
+        self._dequeued(waiter, time.monotonic() - start)
+
+    def release(self):
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['completed'] += 1
+            self._hand_off()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, limit=self.limit)
+
+
+llm_limiter = InFlightLimiter()
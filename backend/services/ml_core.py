@@ -1,22 +1,254 @@
+import logging
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+logger = logging.getLogger(__name__)
+
+# Scoring parameters shared by the batched and reference implementations
+SIMILARITY_WEIGHT = 0.6
+EXPOSURE_WEIGHT = 0.4
+STRONG_THRESHOLD = 0.75
+MEDIUM_THRESHOLD = 0.45
+MISSING_THRESHOLD = 0.5
+
+SCORING_PARAMS = {
+    'similarity_weight': SIMILARITY_WEIGHT,
+    'exposure_weight': EXPOSURE_WEIGHT,
+    'strong_threshold': STRONG_THRESHOLD,
+    'medium_threshold': MEDIUM_THRESHOLD,
+    'missing_threshold': MISSING_THRESHOLD,
+}
+
 
 def _to_corpus(skill_list):
     # join skills into a single document string
     return " ".join(skill_list)
 
 
+def pack_jobs(jobs):
+    """Pack job skills into a CSR weight matrix (jobs x distinct skills).
+
+    Repeated skills inside a job are kept as separate entries, in job order, so the
+    mat-vec accumulates exactly like the per-skill loop does. Returns
+    (weights, total_weight, skill_index).
+    """
+    skill_index = {}
+    indptr = [0]
+    indices = []
+    data = []
+    total_weight = []
+    for job in jobs:
+        skills = job['skills']
+        job_weights = job.get('weights') or {}
+        for s in skills:
+            indices.append(skill_index.setdefault(s, len(skill_index)))
+            data.append(job_weights.get(s, 1.0))
+        indptr.append(len(indices))
+        total_weight.append(sum(job_weights.values()) if job_weights else len(skills) or 1)
+
+    weights = csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+        shape=(len(jobs), len(skill_index)),
+    )
+    return weights, np.asarray(total_weight, dtype=np.float64), skill_index
+
+
 class MLCore:
     def __init__(self):
         self.vectorizer = TfidfVectorizer()
+        # version stamp of the job corpus the vectorizer was fitted on
+        # (None means "not fitted yet")
+        self.corpus_version = None
+        self._fit_lock = threading.Lock()
+
+    def is_fitted_for(self, version) -> bool:
+        return self.corpus_version is not None and self.corpus_version == version
+
+    def fit_corpus(self, job_skill_sets, version=None):
+        """Fit the shared TF-IDF vectorizer once over the whole job corpus.
+
+        `job_skill_sets` is an iterable of job dicts (or raw job documents) with a
+        `skills` list. The fitted vocabulary/IDF is reused by every subsequent
+        `compute_similarity` call until the corpus version changes.
+        """
+        docs = [_to_corpus(j.get('skills') or []) for j in job_skill_sets]
+        docs = [d for d in docs if d.strip()]
+        vectorizer = TfidfVectorizer(min_df=1)
+        try:
+            vectorizer.fit(docs or ["general"])
+        except ValueError:
+            # empty vocabulary (e.g. only single-character tokens)
+            vectorizer.fit(["general"])
+
+        with self._fit_lock:
+            self.vectorizer = vectorizer
+            self.corpus_version = version
+        logger.info('Fitted job-corpus TF-IDF on %d documents (version=%s)', len(docs), version)
+        return self
+
+    def ensure_fitted(self, version, load_corpus):
+        """Refit only when the corpus version differs from the fitted one.
+
+        `load_corpus` is a zero-argument callable returning the job documents; it is
+        only invoked on a version change so warm requests never re-read the corpus.
+        """
+        if not self.is_fitted_for(version):
+            self.fit_corpus(load_corpus(), version=version)
+        return self
+
+    def _score_matrix(self, user_skill_sets, job_skill_sets, packed=None):
+        """Score N skill sets against all jobs with shared job/skill vectors.
+
+        `packed` is an optional precomputed `pack_jobs` result for the jobs that
+        have skills (e.g. from a role profile). Returns a dict of matrices (users x
+        distinct skills and users x jobs) that `_job_results` turns into the
+        per-job result dicts of `compute_similarity`.
+        """
+        if self.corpus_version is None:
+            self.fit_corpus(job_skill_sets)
+        vectorizer = self.vectorizer
+
+        jobs = [j for j in job_skill_sets if j.get('skills')]
+        weights, total_weight, skill_index = packed or pack_jobs(jobs)
+        unique_skills = list(skill_index)
+
+        # If a syllabus is empty, avoid vectorizer errors
+        user_docs = [_to_corpus(skills) for skills in user_skill_sets]
+        user_vecs = vectorizer.transform([doc if doc.strip() else "general" for doc in user_docs])
+
+        # per user and distinct skill: similarity, exposure, final score, label
+        similarity = np.zeros((len(user_docs), len(unique_skills)))
+        exposure = np.zeros((len(user_docs), len(unique_skills)))
+        overall = np.zeros((len(user_docs), len(jobs)))
+        if jobs:
+            similarity = cosine_similarity(user_vecs, vectorizer.transform(unique_skills))
+            for i, skills in enumerate(user_skill_sets):
+                cols = [skill_index[s] for s in set(skills) if s in skill_index]
+                exposure[i, cols] = 1.0
+            job_docs = vectorizer.transform([_to_corpus(j['skills']) for j in jobs])
+            overall = cosine_similarity(user_vecs, job_docs)
+        final = SIMILARITY_WEIGHT * similarity + EXPOSURE_WEIGHT * exposure
+
+        # per user and job: weighted readiness
+        readiness = (np.asarray(weights @ final.T).T / total_weight) * 100.0
+
+        return {
+            'jobs': jobs,
+            'skills': unique_skills,
+            'similarity': similarity,
+            'exposure': exposure,
+            'final': final,
+            'readiness': readiness,
+            'overall': overall,
+        }
+
+    @staticmethod
+    def _skill_confidence(scores, i):
+        """Per-skill confidence dicts for user `i`, built once and shared across jobs."""
+        final = scores['final'][i]
+        labels = np.where(final >= STRONG_THRESHOLD, 'Strong',
+                          np.where(final >= MEDIUM_THRESHOLD, 'Medium', 'Weak'))
+        return {
+            s: {
+                'similarity_score': sim,
+                'exposure_score': exp,
+                'final_score': fin,
+                'label': lbl
+            }
+            for s, sim, exp, fin, lbl in zip(scores['skills'], scores['similarity'][i].tolist(),
+                                             scores['exposure'][i].tolist(), final.tolist(), labels.tolist())
+        }
 
-    def compute_similarity(self, syllabus_skills, job_skill_sets):
+    @staticmethod
+    def _job_results(scores, i, job_indices, skill_confidence):
+        readiness = scores['readiness'][i]
+        overall = scores['overall'][i]
+        results = []
+        for j in job_indices:
+            job = scores['jobs'][j]
+            per_skill_confidence = {s: skill_confidence[s] for s in job['skills']}
+            results.append({
+                'role': job.get('role'),
+                'similarity': float(overall[j]),
+                'readiness_pct': float(readiness[j]),
+                'missing_skills': [s for s, v in per_skill_confidence.items() if v['final_score'] < MISSING_THRESHOLD],
+                'weak_skills': [s for s, v in per_skill_confidence.items()
+                                if MEDIUM_THRESHOLD <= v['final_score'] < STRONG_THRESHOLD],
+                'per_skill_scores': {s: v['final_score'] for s, v in per_skill_confidence.items()},
+                'per_skill_confidence': per_skill_confidence
+            })
+        return results
+
+    def compute_similarity(self, syllabus_skills, job_skill_sets, packed=None):
+        """
+        Enhanced similarity computation with per-skill similarity and confidence.
+        final_skill_score = 0.6 * similarity_score + 0.4 * exposure_score
+        exposure_score is 1.0 if present in syllabus_skills else 0.0
+        Returns a list of per-job result dicts including per_skill_confidence.
+
+        All jobs are scored together: skills are packed into one CSR weight
+        matrix (jobs x distinct skills) so readiness for every job is a single
+        sparse mat-vec. Numbers are identical to `_compute_similarity_loop`.
+        `packed` may carry a precomputed `pack_jobs` result for these jobs.
+        """
+        try:
+            scores = self._score_matrix([syllabus_skills], job_skill_sets, packed=packed)
+            if not scores['jobs']:
+                return []
+            skill_confidence = self._skill_confidence(scores, 0)
+            return self._job_results(scores, 0, range(len(scores['jobs'])), skill_confidence)
+        except Exception as e:
+            print(f"ML Core Error: {e}")
+            return []
+
+    def compute_cohort(self, user_skill_sets, role_job_sets):
+        """Score N users against M roles in one pass over shared job vectors.
+
+        `role_job_sets` maps role -> list of job dicts. Returns a dict with
+        `roles`, a N x M `readiness` matrix (mean readiness_pct over the role's
+        jobs, NaN when a role has no scorable jobs) and `results`, a generator of
+        (user_index, role, per-job results) built lazily so callers can stream them.
         """
+        roles = list(role_job_sets)
+        all_jobs = []
+        role_columns = {role: [] for role in roles}
+        for role in roles:
+            for job in role_job_sets[role]:
+                if job.get('skills'):
+                    # column index of this job among the scorable jobs
+                    role_columns[role].append(len(all_jobs))
+                    all_jobs.append(job)
+        scores = self._score_matrix(user_skill_sets, all_jobs)
+
+        readiness = np.full((len(user_skill_sets), len(roles)), np.nan)
+        for m, role in enumerate(roles):
+            if role_columns[role]:
+                readiness[:, m] = scores['readiness'][:, role_columns[role]].mean(axis=1)
+
+        def iter_results():
+            for i in range(len(user_skill_sets)):
+                skill_confidence = self._skill_confidence(scores, i)
+                for role in roles:
+                    yield i, role, self._job_results(scores, i, role_columns[role], skill_confidence)
+
+        return {'roles': roles, 'readiness': readiness, 'results': iter_results()}
+
+    def _compute_similarity_loop(self, syllabus_skills, job_skill_sets):
+        """
+        Reference job-by-job implementation of `compute_similarity`, kept for
+        equivalence tests and benchmarks.
+
         Enhanced similarity computation with per-skill similarity and confidence.
         final_skill_score = 0.6 * similarity_score + 0.4 * exposure_score
         exposure_score is 1.0 if present in syllabus_skills else 0.0
         Returns a list of per-job result dicts including per_skill_confidence.
+
+        Uses the corpus-wide vectorizer fitted by `fit_corpus`; if none has been
+        fitted yet, it is fitted on `job_skill_sets` alone.
         """
         try:
             syllabus_doc = _to_corpus(syllabus_skills)
@@ -24,26 +256,29 @@ class MLCore:
             if not syllabus_doc.strip():
                  syllabus_doc = "general"
 
+            if self.corpus_version is None:
+                self.fit_corpus(job_skill_sets)
+            vectorizer = self.vectorizer
+
+            syllabus_vec = vectorizer.transform([syllabus_doc])
+
+            # transform every distinct skill once for the whole request
+            unique_skills = list(dict.fromkeys(
+                s for job in job_skill_sets for s in job.get('skills', [])
+            ))
+            skill_sim = {}
+            if unique_skills:
+                sims = cosine_similarity(syllabus_vec, vectorizer.transform(unique_skills)).flatten()
+                skill_sim = {s: float(sim) for s, sim in zip(unique_skills, sims)}
+
             results = []
             for job in job_skill_sets:
                 try:
-                    # build per-job vectorization to get per-skill similarity to syllabus
                     skills = job.get('skills', [])
                     if not skills:
                         continue
 
-                    corpus = [syllabus_doc] + skills
-                    # Min_df=1 ensures we don't drop terms if they appear once
-                    tfidf = TfidfVectorizer(min_df=1).fit_transform(corpus)
-                    
-                    # If we don't have enough rows (vocab empty or other issue), skip
-                    if tfidf.shape[0] < 2:
-                         continue
-
-                    # syllabus vector is index 0; skills are 1..n
-                    sim_vecs = cosine_similarity(tfidf[0:1], tfidf[1:]).flatten()
-
-                    per_skill_similarity = {s: float(sim) for s, sim in zip(skills, sim_vecs)}
+                    per_skill_similarity = {s: skill_sim.get(s, 0.0) for s in skills}
 
                     per_skill_confidence = {}
                     total_weight = sum(job.get('weights', {}).values()) if job.get('weights') else len(skills) or 1
@@ -52,12 +287,12 @@ class MLCore:
                     for s in skills:
                         similarity_score = per_skill_similarity.get(s, 0.0)
                         exposure_score = 1.0 if s in syllabus_skills else 0.0
-                        final_score = 0.6 * similarity_score + 0.4 * exposure_score
+                        final_score = SIMILARITY_WEIGHT * similarity_score + EXPOSURE_WEIGHT * exposure_score
 
                         # label
-                        if final_score >= 0.75:
+                        if final_score >= STRONG_THRESHOLD:
                             label = 'Strong'
-                        elif final_score >= 0.45:
+                        elif final_score >= MEDIUM_THRESHOLD:
                             label = 'Medium'
                         else:
                             label = 'Weak'
@@ -74,16 +309,14 @@ class MLCore:
 
                     readiness = (match_weight / total_weight) * 100.0
 
-                    missing = [s for s, v in per_skill_confidence.items() if v['final_score'] < 0.5]
-                    weak = [s for s, v in per_skill_confidence.items() if 0.45 <= v['final_score'] < 0.75]
+                    missing = [s for s, v in per_skill_confidence.items() if v['final_score'] < MISSING_THRESHOLD]
+                    weak = [s for s, v in per_skill_confidence.items() if MEDIUM_THRESHOLD <= v['final_score'] < STRONG_THRESHOLD]
 
                     # overall document similarity: syllabus vs job skills doc
                     job_doc = _to_corpus(skills)
                     overall_sim = 0.0
                     try:
-                        ov_tfidf = TfidfVectorizer(min_df=1).fit_transform([syllabus_doc, job_doc])
-                        if ov_tfidf.shape[0] >= 2:
-                            overall_sim = float(cosine_similarity(ov_tfidf[0:1], ov_tfidf[1:]).flatten()[0])
+                        overall_sim = float(cosine_similarity(syllabus_vec, vectorizer.transform([job_doc])).flatten()[0])
                     except Exception:
                          overall_sim = 0.0
 
@@ -1,54 +1,84 @@
-import spacy
 from collections import defaultdict
 
-nlp = spacy.load("en_core_web_sm")
-
-import os
-import json
-
-# Load ontology from data file
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-ONTOLOGY_PATH = os.path.join(BASE_DIR, 'data', 'skill_ontology.json')
-try:
-    with open(ONTOLOGY_PATH, 'r', encoding='utf-8') as f:
-        ONTOLOGY = json.load(f)
-except Exception:
-    ONTOLOGY = {}
-
-# create a reverse map for quick lookup: synonym -> canonical
-REVERSE_ONTO = {}
-for canonical, syns in ONTOLOGY.items():
-    for s in syns:
-        REVERSE_ONTO[s.lower()] = canonical
-
-
-def _match_ontology(skill_text: str) -> str:
-    s = skill_text.lower()
-    # exact match
-    if s in REVERSE_ONTO:
-        return REVERSE_ONTO[s]
-    # substring matching (longer phrases first)
-    for syn, canon in sorted(REVERSE_ONTO.items(), key=lambda x: -len(x[0])):
-        if syn in s:
-            return canon
-    return None
-
-
-def clean_and_normalize(skills: list) -> list:
-    """Lowercase, lemmatize, and map using the ontology JSON file."""
-    normalized = []
-    for s in skills:
-        s0 = s.lower().strip()
-        doc = nlp(s0)
-        lemmas = " ".join([tok.lemma_ for tok in doc if not tok.is_stop])
-        mapped = _match_ontology(lemmas) or _match_ontology(s0) or lemmas
-        normalized.append(mapped)
-
-    # dedupe while preserving order
-    seen = set()
-    out = []
-    for x in normalized:
-        if x not in seen and x:
-            seen.add(x)
-            out.append(x)
-    return out
+from services.ontology_artifact import OntologyStore
+from services.norm_cache import norm_cache
+from services.spacy_models import get_nlp, model_version
+from config import NLP_BATCH_SIZE, NLP_N_PROCESS, NLP_MULTIPROCESS_MIN, SPACY_MODEL
+
+# components clean_and_normalize never reads (it only needs lemmas and is_stop)
+_UNUSED_PIPES = ('parser', 'ner', 'senter')
+
+# compiled ontology (reverse map + matcher), hot-swapped when the artifact changes
+ontology_store = OntologyStore()
+_MODEL_VERSION = model_version(SPACY_MODEL)
+
+
+def norm_version(snapshot) -> str:
+    """What produced a normalization (ontology + spaCy model); part of every cache key."""
+    return f"{snapshot.version}:{SPACY_MODEL}-{_MODEL_VERSION}"
+
+
+def _match_ontology(skill_text: str, snapshot=None) -> str:
+    return (snapshot or ontology_store.current()).match(skill_text)
+
+
+def _lemmatize(strings: list, n_process: int = 1) -> dict:
+    """Lemmatize strings in batches with nlp.pipe; returns {string: lemmas}.
+
+    Only lemmas and stop-word flags are read, so the parser and NER are
+    disabled; the tagger/lemmatizer do not depend on them, so output is
+    unchanged.
+    """
+    unique = list(dict.fromkeys(strings))
+    nlp = get_nlp()
+    disable = [p for p in _UNUSED_PIPES if p in nlp.pipe_names]
+    docs = nlp.pipe(unique, disable=disable, batch_size=NLP_BATCH_SIZE, n_process=n_process)
+    return {s: " ".join([tok.lemma_ for tok in doc if not tok.is_stop]) for s, doc in zip(unique, docs)}
+
+
+def clean_and_normalize(skills: list, n_process: int = None) -> list:
+    """Lowercase, lemmatize, and map using the ontology JSON file.
+
+    `n_process` > 1 spreads lemmatization over worker processes; by default
+    this only happens for lists of at least NLP_MULTIPROCESS_MIN skills.
+    """
+    return clean_and_normalize_many([skills], n_process=n_process)[0]
+
+
+def clean_and_normalize_many(skill_lists: list, n_process: int = None) -> list:
+    """`clean_and_normalize` for several skill lists (e.g. a batch of postings).
+
+    Strings from all lists go through one cache lookup and one `nlp.pipe`
+    pass; returns one normalized, deduplicated list per input list.
+    """
+    lowered_lists = [[s.lower().strip() for s in skills] for skills in skill_lists]
+    unique = list(dict.fromkeys(s0 for lowered in lowered_lists for s0 in lowered))
+    # one ontology snapshot for the whole call, even if a reload happens meanwhile
+    ontology = ontology_store.current()
+    version = norm_version(ontology)
+
+    # per-string results shared across requests and workers
+    mapped = norm_cache.get_many(unique, version)
+    pending = [s0 for s0 in unique if s0 not in mapped]
+    if pending:
+        if n_process is None:
+            n_process = NLP_N_PROCESS if len(pending) >= NLP_MULTIPROCESS_MIN else 1
+        lemmatized = _lemmatize(pending, n_process=n_process)
+        fresh = {}
+        for s0 in pending:
+            lemmas = lemmatized[s0]
+            fresh[s0] = _match_ontology(lemmas, ontology) or _match_ontology(s0, ontology) or lemmas
+        norm_cache.put_many(fresh, version)
+        mapped.update(fresh)
+
+    results = []
+    for lowered in lowered_lists:
+        # dedupe while preserving order
+        seen = set()
+        out = []
+        for x in (mapped[s0] for s0 in lowered):
+            if x not in seen and x:
+                seen.add(x)
+                out.append(x)
+        results.append(out)
+    return results
@@ -0,0 +1,154 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from config import NORM_CACHE_PATH, NORM_CACHE_SIZE, NORM_CACHE_DISK_MAX
+
+logger = logging.getLogger(__name__)
+
+# how many disk writes between size checks of the SQLite store
+_PRUNE_EVERY = 1000
+
+
+class NormalizationCache:
+    """Cache of clean_and_normalize results per skill string.
+
+    An in-process LRU sits in front of a SQLite file shared by all workers on
+    the host (WAL mode, so readers never block the writer) that survives
+    restarts. Entries are keyed by (version, raw string), where the version
+    identifies the ontology and spaCy model that produced them. An empty
+    `path` keeps the cache in memory only.
+    """
+
+    def __init__(self, path=NORM_CACHE_PATH, max_entries=NORM_CACHE_SIZE, disk_max=NORM_CACHE_DISK_MAX):
+        self.path = path
+        self.max_entries = max_entries
+        self.disk_max = disk_max
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+
+    def _conn(self):
+        """Per-thread (and per-process, after fork) SQLite connection, or None."""
+        if not self.path:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS norm_cache ('
+                'version TEXT NOT NULL, raw TEXT NOT NULL, normalized TEXT NOT NULL, '
+                'PRIMARY KEY (version, raw))'
+            )
+        except sqlite3.Error as e:
+            logger.warning('Normalization cache disk store unavailable (%s); using memory only', e)
+            self.path = None
+            return None
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get_many(self, strings, version):
+        """Return {string: normalized} for the strings found in either tier."""
+        found = {}
+        pending = []
+        with self._lock:
+            for s in strings:
+                value = self._entries.get((version, s))
+                if value is not None:
+                    self._entries.move_to_end((version, s))
+                    found[s] = value
+                else:
+                    pending.append(s)
+            self._stats['hits'] += len(found)
+
+        disk = {}
+        conn = self._conn()
+        if pending and conn is not None:
+            try:
+                # stay well below SQLite's bound-parameter limit
+                for i in range(0, len(pending), 500):
+                    chunk = pending[i:i + 500]
+                    rows = conn.execute(
+                        'SELECT raw, normalized FROM norm_cache WHERE version = ? AND raw IN (%s)'
+                        % ','.join('?' * len(chunk)),
+                        [version, *chunk],
+                    ).fetchall()
+                    disk.update(rows)
+            except sqlite3.Error as e:
+                logger.warning('Normalization cache read failed: %s', e)
+            if disk:
+                self._remember(version, disk)
+                found.update(disk)
+
+        with self._lock:
+            self._stats['disk_hits'] += len(disk)
+            self._stats['misses'] += len(pending) - len(disk)
+        return found
+
+    def put_many(self, mapping, version):
+        if not mapping:
+            return
+        self._remember(version, mapping)
+        conn = self._conn()
+        if conn is None:
+            return
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO norm_cache (version, raw, normalized) VALUES (?, ?, ?)',
+                [(version, raw, value) for raw, value in mapping.items()],
+            )
+            self._writes += len(mapping)
+            if self._writes >= _PRUNE_EVERY:
+                self._writes = 0
+                self._prune(conn, version)
+        except sqlite3.Error as e:
+            logger.warning('Normalization cache write failed: %s', e)
+
+    def _prune(self, conn, version):
+        """Drop entries of other versions, then the oldest rows beyond `disk_max`."""
+        removed = conn.execute('DELETE FROM norm_cache WHERE version != ?', (version,)).rowcount
+        excess = conn.execute('SELECT COUNT(*) FROM norm_cache').fetchone()[0] - self.disk_max
+        if excess > 0:
+            removed += conn.execute(
+                'DELETE FROM norm_cache WHERE rowid IN (SELECT rowid FROM norm_cache ORDER BY rowid LIMIT ?)',
+                (excess,),
+            ).rowcount
+        with self._lock:
+            self._stats['disk_evictions'] += max(removed, 0)
+
+    def _remember(self, version, mapping):
+        with self._lock:
+            for raw, value in mapping.items():
+                self._entries[(version, raw)] = value
+                self._entries.move_to_end((version, raw))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['disk_hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                size=len(self._entries),
+                max_size=self.max_entries,
+                disk_path=self.path,
+                hit_rate=(self._stats['hits'] + self._stats['disk_hits']) / lookups if lookups else 0.0,
+            )
+
+
+norm_cache = NormalizationCache()
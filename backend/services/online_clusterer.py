@@ -0,0 +1,320 @@
+"""Incremental job clustering between full `cluster_jobs` runs.
+
+`cluster_jobs` fits TF-IDF + KMeans over every posting and saves the result
+as an OnlineClusterModel. Ingestion assigns new postings to the nearest
+centroid with that model (cost independent of corpus size) and marks them
+`cluster_fitted: False`; `refresh_clusters` (run periodically, e.g. from cron:
+    python -m services.online_clusterer refresh
+) folds those postings into the centroids MiniBatchKMeans-style and reports
+drift, which says when a full recluster is due.
+"""
+import contextlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from pymongo import UpdateOne, UpdateMany
+from sklearn.preprocessing import normalize
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX: the model lock only covers this process
+    fcntl = None
+
+from services import db
+from config import (CLUSTER_MODEL_PATH, CLUSTER_RELOAD_INTERVAL, CLUSTER_DRIFT_THRESHOLD, CLUSTER_OOV_THRESHOLD,
+                    CLUSTER_WRITE_BATCH)
+
+logger = logging.getLogger(__name__)
+
+
+def job_text(job) -> str:
+    """The text a posting is clustered on (same as `cluster_jobs`)."""
+    return job.get('raw_text') or ' '.join(job.get('skills', []))
+
+
+class OnlineClusterModel:
+    """Fitted vectorizer plus centroids that can be updated with `partial_fit`.
+
+    Centroid c with n members moves towards each new member x by (x - c) / n,
+    the per-center learning rate MiniBatchKMeans uses. Labels are re-inferred
+    from per-cluster skill counts after every update.
+    """
+
+    def __init__(self, vectorizer, centroids, counts, skill_counts, baseline_distance):
+        self.vectorizer = vectorizer
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+        self.skill_counts = skill_counts
+        self.baseline_distance = baseline_distance
+        self.version = 1
+        self.fitted_at = time.time()
+        # postings folded in since the full fit
+        self.drift_n = 0
+        self.drift_distance = 0.0
+        self.drift_tokens = 0
+        self.drift_oov = 0
+        self.labels = {}
+        self._relabel()
+
+    @classmethod
+    def from_fit(cls, vectorizer, X, labels, centers, jobs=None, skill_counts=None):
+        """Model of a full fit; skill counts per cluster are given, or counted from `jobs`."""
+        k = len(centers)
+        counts = np.bincount(labels, minlength=k)
+        if skill_counts is None:
+            skill_counts = [Counter() for _ in range(k)]
+            for job, lbl in zip(jobs, labels):
+                skill_counts[int(lbl)].update(job.get('skills', []))
+        model = cls(vectorizer, centers, counts, skill_counts, 0.0)
+        _, distances = model.predict(X)
+        model.baseline_distance = float(distances.mean()) if len(distances) else 0.0
+        return model
+
+    def _relabel(self):
+        # role_clusterer imports this module, so import lazily
+        from services.role_clusterer import infer_role_label
+        self.labels = {
+            cid: infer_role_label([s for s, _ in counter.most_common(10)])
+            for cid, counter in enumerate(self.skill_counts)
+        }
+
+    def transform(self, texts):
+        return self.vectorizer.transform(texts)
+
+    def predict(self, X):
+        """Nearest centroid per row and its Euclidean distance (rows are L2-normalized TF-IDF)."""
+        if X.shape[0] == 0:
+            return np.array([], dtype=np.int64), np.array([])
+        # |x - c|^2 = |x|^2 - 2 x.c + |c|^2
+        x_sq = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+        dots = np.asarray(X @ self.centroids.T)
+        sq = x_sq[:, None] - 2 * dots + (self.centroids ** 2).sum(axis=1)[None, :]
+        clusters = sq.argmin(axis=1)
+        return clusters, np.sqrt(np.maximum(sq[np.arange(len(clusters)), clusters], 0.0))
+
+    def _oov(self, texts):
+        analyzer = self.vectorizer.build_analyzer()
+        vocabulary = self.vectorizer.vocabulary_
+        tokens = oov = 0
+        for text in texts:
+            for term in analyzer(text):
+                tokens += 1
+                oov += term not in vocabulary
+        return tokens, oov
+
+    def partial_fit(self, texts, skill_lists):
+        """Fold postings into the centroids; returns their cluster assignments."""
+        X = normalize(self.transform(texts))
+        clusters, distances = self.predict(X)
+        for row, cid in enumerate(clusters):
+            self.counts[cid] += 1
+            x = X[row].toarray().ravel()
+            self.centroids[cid] += (x - self.centroids[cid]) / self.counts[cid]
+            self.skill_counts[cid].update(skill_lists[row])
+
+        tokens, oov = self._oov(texts)
+        self.drift_n += len(clusters)
+        self.drift_distance += float(distances.sum())
+        self.drift_tokens += tokens
+        self.drift_oov += oov
+        self.version += 1
+        self._relabel()
+        return clusters
+
+    def drift(self) -> dict:
+        """How far postings folded in since the full fit sit from the model."""
+        mean = self.drift_distance / self.drift_n if self.drift_n else None
+        growth = (mean - self.baseline_distance) / self.baseline_distance \
+            if mean is not None and self.baseline_distance else 0.0
+        oov_rate = self.drift_oov / self.drift_tokens if self.drift_tokens else 0.0
+        return {
+            'postings_since_fit': self.drift_n,
+            'baseline_distance': self.baseline_distance,
+            'recent_distance': mean,
+            'distance_growth': growth,
+            'oov_rate': oov_rate,
+            'recluster_recommended': growth > CLUSTER_DRIFT_THRESHOLD or oov_rate > CLUSTER_OOV_THRESHOLD,
+        }
+
+
+class ClusterModelStore:
+    """The saved model file, reloaded when another process replaces it."""
+
+    def __init__(self, path=CLUSTER_MODEL_PATH, reload_interval=CLUSTER_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._model = None
+        self._stamp = None
+        self._checked = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Exclusive lock across processes and threads for a read-modify-write of the model file.
+
+        Without file locks (not on POSIX) it only excludes other threads of this process.
+        """
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(f'{self.path}.lock', 'a+b') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self):
+        """A private copy of the model as saved on disk now, or None; the shared model is untouched."""
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def current(self):
+        """The latest saved model, or None before the first `cluster_jobs` run."""
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.reload_interval:
+            return self._model
+        self._checked = now
+        stamp = self._file_stamp()
+        if stamp is not None and stamp != self._stamp:
+            with self._lock:
+                try:
+                    with open(self.path, 'rb') as f:
+                        self._model = pickle.load(f)
+                    self._stamp = stamp
+                except Exception as e:
+                    logger.warning('Could not load cluster model %s: %s', self.path, e)
+        return self._model
+
+    def save(self, model):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.cluster-model-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with self._lock:
+            self._model = model
+            self._stamp = self._file_stamp()
+            self._checked = time.monotonic()
+
+
+cluster_model_store = ClusterModelStore()
+
+
+def assign_clusters(docs):
+    """Set cluster_id / role_label on new job documents from the saved model (in place).
+
+    Postings are marked `cluster_fitted: False` so the next `refresh_clusters`
+    folds them into the centroids. Without a model they keep None.
+    """
+    model = cluster_model_store.current()
+    for doc in docs:
+        doc['cluster_fitted'] = False
+    if model is None or not docs:
+        return docs
+    clusters, _ = model.predict(normalize(model.transform([job_text(d) for d in docs])))
+    for doc, cid in zip(docs, clusters):
+        doc['cluster_id'] = int(cid)
+        doc['role_label'] = model.labels.get(int(cid))
+    return docs
+
+
+def refresh_clusters(batch_size=CLUSTER_WRITE_BATCH):
+    """Fold unfitted postings into the saved model, save it and return its drift report.
+
+    Runs under the model store's lock on a fresh copy of the saved model, so
+    concurrent refreshes (or a full `cluster_jobs`) never fold the same
+    postings twice or overwrite each other's centroids, and readers keep the
+    previous model until the new one is swapped in by `save`.
+    """
+    from services.role_profiles import bump_role_version
+
+    with cluster_model_store.locked():
+        model = cluster_model_store.load()
+        if model is None:
+            return None
+        previous_labels = dict(model.labels)
+        pending = list(db.job_coll.find({'cluster_fitted': False}, {'raw_text': 1, 'skills': 1, 'role': 1,
+                                                                     'cluster_id': 1}))
+        assigned = []
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            clusters = model.partial_fit([job_text(j) for j in batch], [j.get('skills', []) for j in batch])
+            assigned.extend(int(cid) for cid in clusters)
+
+        if pending:
+            cluster_model_store.save(model)
+            # only marked once the model holding them is saved; postings assigned by an
+            # older model (e.g. before k changed) move to the cluster they were folded into
+            for start in range(0, len(pending), batch_size):
+                db.job_coll.bulk_write([
+                    UpdateOne({'_id': j['_id']}, {'$set': {'cluster_id': cid, 'role_label': model.labels[cid],
+                                                           'cluster_fitted': True}})
+                    for j, cid in zip(pending[start:start + batch_size], assigned[start:start + batch_size])
+                ], ordered=False)
+            db.job_clusters.bulk_write([
+                UpdateOne({'cluster_id': cid}, {'$set': {'role_label': label, 'num_jobs': int(model.counts[cid]),
+                                                         'top_skills': [s for s, _ in
+                                                                        model.skill_counts[cid].most_common(10)]}},
+                          upsert=True)
+                for cid, label in model.labels.items()
+            ], ordered=False)
+
+            roles = {j.get('role') for j, cid in zip(pending, assigned) if j.get('cluster_id') != cid}
+            relabeled = [cid for cid, label in model.labels.items() if previous_labels.get(cid) != label]
+            if relabeled:
+                roles.update(db.job_coll.distinct('role', {'cluster_id': {'$in': relabeled}}))
+                db.job_coll.bulk_write([
+                    UpdateMany({'cluster_id': cid}, {'$set': {'role_label': model.labels[cid]}})
+                    for cid in relabeled
+                ], ordered=False)
+            roles.discard(None)
+            if roles:
+                bump_role_version(*roles)
+
+    report = model.drift()
+    logger.info('Cluster refresh folded %d postings; drift %s', len(pending), report)
+    return report
+
+
+def cluster_status():
+    model = cluster_model_store.current()
+    if model is None:
+        return {'fitted': False}
+    return dict(model.drift(), fitted=True, version=model.version, fitted_at=model.fitted_at,
+                clusters=len(model.counts))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] != ['refresh']:
+        print('usage: python -m services.online_clusterer refresh')
+        sys.exit(2)
+    logging.basicConfig(level=logging.INFO)
+    print(refresh_clusters())
@@ -0,0 +1,204 @@
+"""Precompiled ontology artifact and the hot-reloading store that serves it.
+
+Build (e.g. in the Docker image or after editing data/skill_ontology.json):
+    python -m services.ontology_artifact build
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+
+from services.ontology_matcher import OntologyMatcher
+from config import ONTOLOGY_PATH, ONTOLOGY_ARTIFACT_PATH, ONTOLOGY_RELOAD_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EDUONTO\x01'
+
+
+class OntologySnapshot:
+    """One immutable compiled ontology: reverse map, matcher and canonical ids."""
+
+    def __init__(self, version, reverse, matcher, canonical_ids):
+        self.version = version
+        self.reverse = reverse
+        self.matcher = matcher
+        self.canonical_ids = canonical_ids
+
+    def match(self, skill_text: str):
+        s = skill_text.lower()
+        # exact match
+        if s in self.reverse:
+            return self.reverse[s]
+        # substring matching (longest synonym wins)
+        return self.matcher.find(s)
+
+
+def ontology_version(ontology: dict) -> str:
+    return hashlib.sha256(json.dumps(ontology, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def load_source(path=ONTOLOGY_PATH) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def compile_ontology(ontology: dict) -> OntologySnapshot:
+    # create a reverse map for quick lookup: synonym -> canonical
+    reverse = {}
+    for canonical, syns in ontology.items():
+        for s in syns:
+            reverse[s.lower()] = canonical
+    canonical_ids = {canonical: i for i, canonical in enumerate(sorted(ontology))}
+    return OntologySnapshot(ontology_version(ontology), reverse, OntologyMatcher(reverse), canonical_ids)
+
+
+def build_artifact(source=ONTOLOGY_PATH, dest=ONTOLOGY_ARTIFACT_PATH) -> OntologySnapshot:
+    """Compile `source` and write it to `dest` atomically (write temp file, then rename)."""
+    # unlike load_source, a missing or broken source must fail the build
+    with open(source, 'r', encoding='utf-8') as f:
+        snapshot = compile_ontology(json.load(f))
+    payload = {
+        'version': snapshot.version,
+        'reverse': snapshot.reverse,
+        'matcher': snapshot.matcher.to_tables(),
+        'canonical_ids': snapshot.canonical_ids,
+    }
+    directory = os.path.dirname(os.path.abspath(dest))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.ontology-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    logger.info('Wrote ontology artifact %s (version %s)', dest, snapshot.version)
+    return snapshot
+
+
+def load_artifact(path=ONTOLOGY_ARTIFACT_PATH) -> OntologySnapshot:
+    """Map the artifact into memory and unpickle it straight from the mapping."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                raise ValueError(f'{path} is not an ontology artifact')
+            payload = pickle.loads(memoryview(mm)[len(MAGIC):])
+    return OntologySnapshot(payload['version'], payload['reverse'],
+                            OntologyMatcher.from_tables(payload['matcher']), payload['canonical_ids'])
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class OntologyStore:
+    """Serves the current OntologySnapshot and swaps in a new one when the artifact changes.
+
+    Callers take one snapshot per request (`current()`) and use it throughout, so
+    a swap never changes the ontology under an in-flight request. The artifact
+    and the JSON source are stat'ed at most every `reload_interval` seconds.
+    Without an artifact, or when the source no longer matches the artifact's
+    version (edited but not rebuilt), the JSON source is compiled in-process.
+    """
+
+    def __init__(self, artifact_path=ONTOLOGY_ARTIFACT_PATH, source_path=ONTOLOGY_PATH,
+                 reload_interval=ONTOLOGY_RELOAD_INTERVAL):
+        self.artifact_path = artifact_path
+        self.source_path = source_path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._source_stamp = None
+        self._checked = time.monotonic()
+        self._snapshot = self._load_initial()
+
+    def _load_initial(self):
+        snapshot = None
+        stamp = _file_stamp(self.artifact_path)
+        if stamp is not None:
+            try:
+                snapshot = load_artifact(self.artifact_path)
+                self._stamp = stamp
+            except Exception as e:
+                logger.warning('Could not load ontology artifact %s: %s', self.artifact_path, e)
+        fresh = self._compile_if_stale(snapshot)
+        if fresh is not None:
+            return fresh
+        return snapshot if snapshot is not None else compile_ontology({})
+
+    def _compile_if_stale(self, snapshot):
+        """Compile the JSON source if it differs from `snapshot` (or there is none); else None.
+
+        An unreadable source never replaces a loaded snapshot.
+        """
+        self._source_stamp = _file_stamp(self.source_path)
+        if self._source_stamp is None:
+            return None
+        try:
+            with open(self.source_path, 'r', encoding='utf-8') as f:
+                ontology = json.load(f)
+        except Exception as e:
+            logger.warning('Could not read ontology source %s: %s', self.source_path, e)
+            return None
+        if snapshot is not None and snapshot.version == ontology_version(ontology):
+            return None
+        if snapshot is not None:
+            logger.warning('Ontology artifact %s is older than %s; serving the source compiled in-process '
+                           'until it is rebuilt (python -m services.ontology_artifact build)',
+                           self.artifact_path, self.source_path)
+        return compile_ontology(ontology)
+
+    def current(self) -> OntologySnapshot:
+        now = time.monotonic()
+        if now - self._checked >= self.reload_interval:
+            self._checked = now
+            self._maybe_reload()
+        return self._snapshot
+
+    def _maybe_reload(self):
+        stamp = _file_stamp(self.artifact_path)
+        artifact_changed = stamp is not None and stamp != self._stamp
+        if not artifact_changed and _file_stamp(self.source_path) == self._source_stamp:
+            return
+        with self._lock:
+            snapshot = self._snapshot
+            if artifact_changed and stamp != self._stamp:
+                try:
+                    snapshot = load_artifact(self.artifact_path)
+                    self._stamp = stamp
+                except Exception as e:
+                    logger.warning('Ignoring unreadable ontology artifact %s: %s', self.artifact_path, e)
+            fresh = self._compile_if_stale(snapshot)
+            if fresh is not None:
+                snapshot = fresh
+            if snapshot.version != self._snapshot.version:
+                # a single reference assignment: readers see the old or the new snapshot
+                self._snapshot = snapshot
+                logger.info('Ontology reloaded: version %s', snapshot.version)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] != ['build']:
+        print('usage: python -m services.ontology_artifact build [source.json] [dest.bin]')
+        sys.exit(2)
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[2:]
+    snap = build_artifact(*(args[:2] or []))
+    print(f'ontology artifact version {snap.version}: {len(snap.reverse)} synonyms, '
+          f'{len(snap.canonical_ids)} canonical skills')
@@ -0,0 +1,89 @@
+from collections import deque
+
+
+class OntologyMatcher:
+    """Aho-Corasick automaton over ontology synonyms.
+
+    `find(text)` returns the canonical of the longest synonym occurring anywhere in
+    `text`; ties go to the synonym that comes first in the reverse map. That is
+    the same answer as scanning synonyms sorted by descending length, but in one
+    pass over the text instead of one substring test per synonym.
+
+    The automaton is kept in plain lists and dicts so it can be pickled.
+    """
+
+    def __init__(self, reverse_map: dict):
+        # node 0 is the root; goto[n] maps a character to the next node
+        self.goto = [{}]
+        self.fail = [0]
+        # best[n] = (length, -priority, canonical) of the best synonym ending at n
+        self.best = [None]
+        self.empty = None
+
+        for priority, (syn, canonical) in enumerate(reverse_map.items()):
+            if not syn:
+                # '' is a substring of everything; it only wins when nothing else matches
+                if self.empty is None:
+                    self.empty = canonical
+                continue
+            node = 0
+            for ch in syn:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                node = nxt
+            candidate = (len(syn), -priority, canonical)
+            if self.best[node] is None or candidate[:2] > self.best[node][:2]:
+                self.best[node] = candidate
+
+        self._link()
+
+    def _link(self):
+        # breadth-first so fail targets are final before their dependants
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+
+                inherited = self.best[self.fail[child]]
+                own = self.best[child]
+                if inherited is not None and (own is None or inherited[:2] > own[:2]):
+                    self.best[child] = inherited
+                queue.append(child)
+
+    def find(self, text: str):
+        goto, fail, best = self.goto, self.fail, self.best
+        node = 0
+        found = None
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = best[node]
+            if hit is not None and (found is None or hit[:2] > found[:2]):
+                found = hit
+        if found is not None:
+            return found[2]
+        return self.empty
+
+    def to_tables(self) -> dict:
+        return {'goto': self.goto, 'fail': self.fail, 'best': self.best, 'empty': self.empty}
+
+    @classmethod
+    def from_tables(cls, tables: dict):
+        """Rebuild a matcher from `to_tables()` output without recompiling."""
+        matcher = cls.__new__(cls)
+        matcher.goto = tables['goto']
+        matcher.fail = tables['fail']
+        matcher.best = [tuple(b) if b is not None else None for b in tables['best']]
+        matcher.empty = tables['empty']
+        return matcher
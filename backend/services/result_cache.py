@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from services import db
+from config import ANALYSIS_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# fields of an analysis document that depend only on the cache key
+PAYLOAD_FIELDS = ('results', 'per_skill_confidence', 'role_cluster_used')
+
+
+def analysis_key(skills, role, corpus_version, params) -> str:
+    """Content address of an analysis: hash of skills, role, corpus version and scoring params.
+
+    Skills are sorted but not deduplicated, since repeated skills change the
+    syllabus TF-IDF vector.
+    """
+    material = json.dumps({
+        'skills': sorted(skills),
+        'role': role,
+        'corpus_version': corpus_version,
+        'params': params,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def resolve_analysis(doc):
+    """Fill in the payload of an analysis document stored as a reference."""
+    if doc and doc.get('result_ref') is not None and 'results' not in doc:
+        original = db.analysis_coll.find_one({'_id': doc['result_ref']}, {f: 1 for f in PAYLOAD_FIELDS})
+        if original:
+            for f in PAYLOAD_FIELDS:
+                doc[f] = original.get(f)
+    return doc
+
+
+class AnalysisResultCache:
+    """Two-tier memo of analysis results keyed by `analysis_key`.
+
+    Tier 1 is an in-process LRU of payloads; tier 2 is the `analysis_cache`
+    collection, which maps a key to the analysis_results document that holds
+    the payload, so results are never stored twice.
+    """
+
+    def __init__(self, max_entries=ANALYSIS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'db_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key):
+        """Return {'analysis_id', 'user_id', <payload fields>} or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry
+
+        ref = db.analysis_cache_coll.find_one({'_id': key})
+        original = db.analysis_coll.find_one({'_id': ref['analysis_id']}) if ref else None
+        if original is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        entry = {'analysis_id': original['_id'], 'user_id': original.get('user_id')}
+        entry.update({f: original.get(f) for f in PAYLOAD_FIELDS})
+        with self._lock:
+            self._stats['db_hits'] += 1
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, analysis_doc):
+        """Record a freshly stored analysis document under `key`."""
+        entry = {'analysis_id': analysis_doc['_id'], 'user_id': analysis_doc.get('user_id')}
+        entry.update({f: analysis_doc.get(f) for f in PAYLOAD_FIELDS})
+        try:
+            db.analysis_cache_coll.update_one({'_id': key}, {'$set': {'analysis_id': analysis_doc['_id']}}, upsert=True)
+        except Exception as e:
+            logger.warning('Could not persist analysis cache entry: %s', e)
+        self._remember(key, entry)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['db_hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                size=len(self._entries),
+                max_size=self.max_entries,
+                hit_rate=(self._stats['hits'] + self._stats['db_hits']) / lookups if lookups else 0.0,
+            )
+
+
+result_cache = AnalysisResultCache()
@@ -1,9 +1,26 @@
 import logging
+import operator
 import os
-from collections import Counter, defaultdict
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+from pymongo import UpdateOne, UpdateMany, DeleteMany
 from services import db
+from services.role_profiles import bump_role_version
+from services.online_clusterer import OnlineClusterModel, cluster_model_store
+from services.skill_demand import cluster_skill_counts
+from config import (CLUSTER_WRITE_BATCH, CLUSTER_SWEEP_K, CLUSTER_SWEEP_WORKERS, CLUSTER_SWEEP_SAMPLE,
+                    CLUSTER_SWEEP_MAX_CANDIDATES)
 
 logger = logging.getLogger(__name__)
 
@@ -28,55 +45,278 @@ def infer_role_label(top_skills):
     return 'Other'
 
 
-def cluster_jobs(k: int = 4, algorithm: str = 'kmeans') -> dict:
+def _write_batches(coll, ops, batch_size, progress=None):
+    """Send `ops` through unordered bulk_write calls of `batch_size`; returns the matched count."""
+    matched = 0
+    for start in range(0, len(ops), batch_size):
+        res = coll.bulk_write(ops[start:start + batch_size], ordered=False)
+        matched += getattr(res, 'matched_count', 0) or 0
+        done = min(start + batch_size, len(ops))
+        logger.info('Cluster assignments written: %d/%d', done, len(ops))
+        if progress is not None:
+            progress(done, len(ops))
+    return matched
+
+
+def _make_model(algorithm, k):
+    if algorithm == 'kmeans':
+        return KMeans(n_clusters=k, random_state=42)
+    if algorithm == 'minibatch':
+        return MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=4096)
+    raise ValueError('Unsupported clustering algorithm')
+
+
+def _load_corpus():
+    """Job documents (text fields only) plus the TF-IDF vectorizer and matrix fitted on them."""
+    jobs = list(db.job_coll.find({}, {'raw_text': 1, 'skills': 1, 'role': 1}))
+    if not jobs:
+        return jobs, None, None
+    texts = [j.get('raw_text') or ' '.join(j.get('skills', [])) for j in jobs]
+    vectorizer = TfidfVectorizer(max_df=0.9, min_df=1, ngram_range=(1, 2))
+    return jobs, vectorizer, vectorizer.fit_transform(texts)
+
+
+def cluster_jobs(k: int = 4, algorithm: str = 'kmeans', batch_size: int = CLUSTER_WRITE_BATCH,
+                 progress=None) -> dict:
     """Cluster jobs using TF-IDF and assign cluster ids and inferred role labels.
 
-    Returns a mapping of cluster_id -> metadata
+    Each job gets one update carrying both `cluster_id` and `role_label`, sent
+    in unordered bulk writes of `batch_size`; `progress(done, total)` is called
+    after every batch. Returns a mapping of cluster_id -> metadata
     """
-    jobs = list(db.job_coll.find())
+    jobs, vectorizer, X = _load_corpus()
     if not jobs:
         logger.info('No job documents found to cluster')
         return {}
 
-    texts = [j.get('raw_text') or ' '.join(j.get('skills', [])) for j in jobs]
+    model = _make_model(algorithm, k)
+    labels = model.fit_predict(X)
+    return _save_clusters(jobs, vectorizer, X, labels, model.cluster_centers_, batch_size, progress)
 
-    vectorizer = TfidfVectorizer(max_df=0.9, min_df=1, ngram_range=(1, 2))
-    X = vectorizer.fit_transform(texts)
 
-    if algorithm == 'kmeans':
-        model = KMeans(n_clusters=k, random_state=42)
-        labels = model.fit_predict(X)
-    else:
-        raise ValueError('Unsupported clustering algorithm')
+def _save_clusters(jobs, vectorizer, X, labels, centers, batch_size, progress=None, selection=None):
+    """Persist one fit: job assignments, cluster metadata, the online model and role versions.
 
-    # Update job docs with cluster assignments
-    for job, lbl in zip(jobs, labels):
-        db.job_coll.update_one({'_id': job['_id']}, {'$set': {'cluster_id': int(lbl)}})
+    Assignments are written first so the per-cluster skill counts can be
+    aggregated in Mongo; role labels follow in one bulk of per-cluster updates.
+    Both only touch postings tagged with this run's `cluster_run` token, not
+    postings that ingestion assigned with the previous model meanwhile.
+    """
+    run = uuid.uuid4().hex
+    job_ops = [
+        UpdateOne({'_id': job['_id']}, {'$set': {'cluster_id': int(lbl), 'cluster_fitted': True, 'cluster_run': run}})
+        for job, lbl in zip(jobs, labels)
+    ]
+    _write_batches(db.job_coll, job_ops, batch_size, progress)
 
-    # Aggregate per-cluster metadata and infer labels
+    # Aggregate per-cluster metadata server-side and infer labels
+    counts = cluster_skill_counts(range(len(centers)), match={'cluster_run': run})
     clusters = {}
-    for cluster_id in range(max(labels) + 1):
-        cluster_jobs = [jobs[i] for i, l in enumerate(labels) if l == cluster_id]
-        skill_counter = Counter()
-        for cj in cluster_jobs:
-            skill_counter.update(cj.get('skills', []))
-
+    for cluster_id, (num_jobs, skill_counter) in counts.items():
         top_skills = [s for s, _ in skill_counter.most_common(10)]
-        role_label = infer_role_label(top_skills)
-
         clusters[cluster_id] = {
             'cluster_id': int(cluster_id),
-            'role_label': role_label,
+            'role_label': infer_role_label(top_skills),
             'top_skills': top_skills,
-            'num_jobs': len(cluster_jobs)
+            'num_jobs': num_jobs
         }
+        if selection is not None:
+            clusters[cluster_id]['selection'] = selection
+
+    db.job_coll.bulk_write(
+        [UpdateMany({'cluster_id': cid, 'cluster_run': run}, {'$set': {'role_label': meta['role_label']}})
+         for cid, meta in clusters.items()],
+        ordered=False,
+    )
 
-        # Update job docs with role_label
-        for cj in cluster_jobs:
-            db.job_coll.update_one({'_id': cj['_id']}, {'$set': {'role_label': role_label}})
+    # Upsert cluster metadata; drop clusters left over from a fit with a larger k
+    db.job_clusters.bulk_write(
+        [UpdateOne({'cluster_id': cid}, {'$set': meta}, upsert=True) for cid, meta in clusters.items()]
+        + [DeleteMany({'cluster_id': {'$gte': len(clusters)}})],
+        ordered=False,
+    )
 
-        # Upsert cluster metadata
-        db.job_clusters.update_one({'cluster_id': cluster_id}, {'$set': clusters[cluster_id]}, upsert=True)
+    # new postings are assigned against this model until the next full run; the
+    # lock keeps a concurrent refresh_clusters from saving over it
+    model = OnlineClusterModel.from_fit(
+        vectorizer, X, labels, centers, skill_counts=[counts[cid][1] for cid in range(len(centers))],
+    )
+    with cluster_model_store.locked():
+        cluster_model_store.save(model)
+
+    # cached role profiles carry the jobs' cluster ids
+    bump_role_version(*{j.get('role') for j in jobs if j.get('role')})
 
     logger.info('Clustering complete: %d clusters created', len(clusters))
     return clusters
+
+
+# per-process state of sweep workers: the shared TF-IDF matrix and silhouette sample
+_sweep = {}
+
+
+def _share_array(arr, blocks):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    blocks.append(shm)
+    return shm.name, arr.shape, arr.dtype.str
+
+
+def _attach_array(spec, blocks):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    blocks.append(shm)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_sweep_worker(data, indices, indptr, shape, sample):
+    """Map the parent's CSR arrays; the matrix is never copied into the worker.
+
+    The arrays stay writable because sklearn's Cython kernels reject read-only
+    buffers, but nothing in a fit writes to them.
+    """
+    blocks = []
+    arrays = [_attach_array(spec, blocks) for spec in (data, indices, indptr)]
+    _sweep['blocks'] = blocks
+    _sweep['X'] = csr_matrix(tuple(arrays), shape=shape, copy=False)
+    _sweep['sample'] = sample
+    # one process per candidate already uses every core; avoid BLAS/OpenMP oversubscription
+    _sweep['limits'] = threadpool_limits(limits=1)
+
+
+def _fit_candidate(candidate):
+    """Fit one (algorithm, k) on the shared matrix and score it on the sample."""
+    algorithm, k = candidate
+    X, sample = _sweep['X'], _sweep['sample']
+    started = time.perf_counter()
+    model = _make_model(algorithm, k)
+    labels = model.fit_predict(X)
+    sample_labels = labels[sample]
+    n_labels = len(np.unique(sample_labels))
+    silhouette = (float(silhouette_score(X[sample], sample_labels, metric='cosine'))
+                  if 1 < n_labels < len(sample) else None)
+    return {
+        'algorithm': algorithm,
+        'k': int(k),
+        'silhouette': silhouette,
+        'inertia': float(model.inertia_),
+        'seconds': round(time.perf_counter() - started, 3),
+        'labels': labels,
+        'centers': model.cluster_centers_,
+    }
+
+
+def _sweep_context():
+    """Start sweep workers from a forkserver, never by forking the caller.
+
+    The caller is usually a task-runner thread in a web worker with live
+    PyMongo and httpx threads, which fork() would copy mid-operation. The
+    server imports this module once, so each worker forks from a small,
+    single-threaded process instead of re-importing the app.
+    """
+    ctx = multiprocessing.get_context('forkserver')
+    ctx.set_forkserver_preload([__name__])
+    return ctx
+
+
+def _run_sweep(X, candidates, sample, workers):
+    if workers <= 1 or len(candidates) == 1:
+        _sweep.update(X=X, sample=sample)
+        try:
+            return [_fit_candidate(c) for c in candidates]
+        finally:
+            _sweep.clear()
+
+    X = csr_matrix(X)
+    blocks = []
+    try:
+        specs = [_share_array(a, blocks) for a in (X.data, X.indices, X.indptr)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(candidates)), mp_context=_sweep_context(),
+                                 initializer=_init_sweep_worker, initargs=(*specs, X.shape, sample)) as pool:
+            return list(pool.map(_fit_candidate, candidates))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def _sweep_options(k_values, algorithms, workers, sample_size):
+    """Check sweep parameters, which may come straight from a POST /tasks body.
+
+    k values must be integers of at least 2 and there may be at most
+    CLUSTER_SWEEP_MAX_CANDIDATES (algorithm, k) pairs; the worker count and
+    silhouette sample are clamped to CLUSTER_SWEEP_WORKERS and
+    CLUSTER_SWEEP_SAMPLE.
+    """
+    if isinstance(algorithms, str) or isinstance(k_values, (str, bytes)):
+        raise ValueError('k_values and algorithms must be lists')
+    try:
+        k_values = list(dict.fromkeys(operator.index(k) for k in k_values))
+        workers = operator.index(workers)
+        sample_size = operator.index(sample_size)
+        algorithms = list(dict.fromkeys(algorithms))
+    except TypeError:
+        raise ValueError('k_values, workers and sample_size must be integers') from None
+    if any(k < 2 for k in k_values):
+        raise ValueError('every k must be at least 2')
+    if len(k_values) * len(algorithms) > CLUSTER_SWEEP_MAX_CANDIDATES:
+        raise ValueError(f'at most {CLUSTER_SWEEP_MAX_CANDIDATES} (algorithm, k) candidates per sweep')
+    if sample_size < 2:
+        raise ValueError('sample_size must be at least 2')
+    return k_values, algorithms, max(1, min(workers, CLUSTER_SWEEP_WORKERS)), min(sample_size, CLUSTER_SWEEP_SAMPLE)
+
+
+def select_clusters(k_values=CLUSTER_SWEEP_K, algorithms=('kmeans',), workers: int = CLUSTER_SWEEP_WORKERS,
+                    sample_size: int = CLUSTER_SWEEP_SAMPLE, batch_size: int = CLUSTER_WRITE_BATCH,
+                    progress=None) -> dict:
+    """Pick k (and algorithm) by silhouette, then persist the winner like `cluster_jobs`.
+
+    Every (algorithm, k) candidate is fitted in its own process of a pool of
+    `workers`, all reading one TF-IDF matrix placed in shared memory. Each fit
+    is scored on the same random sample of at most `sample_size` postings:
+    cosine silhouette (higher is better, decides the winner) and inertia
+    (reported only; it always falls as k grows). The winning fit's metrics and
+    the full candidate table are stored on every `job_clusters` document under
+    `selection`.
+
+    Raises ValueError for parameters `_sweep_options` rejects.
+    """
+    k_values, algorithms, workers, sample_size = _sweep_options(k_values, algorithms, workers, sample_size)
+    jobs, vectorizer, X = _load_corpus()
+    if not jobs:
+        logger.info('No job documents found to cluster')
+        return {'best': None, 'candidates': [], 'clusters': {}}
+
+    n = X.shape[0]
+    candidates = [(a, k) for a in algorithms for k in k_values if k < n]
+    if not candidates:
+        raise ValueError(f'No candidate k between 2 and {n - 1} jobs')
+    for a in algorithms:
+        _make_model(a, 2)  # reject unknown algorithms before starting workers
+
+    rng = np.random.default_rng(42)
+    sample = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+
+    started = time.perf_counter()
+    fits = _run_sweep(X, candidates, sample, workers)
+    elapsed = time.perf_counter() - started
+
+    scored = [f for f in fits if f['silhouette'] is not None]
+    best = max(scored, key=lambda f: (f['silhouette'], -f['k'])) if scored else min(fits, key=lambda f: f['k'])
+    table = [{key: f[key] for key in ('algorithm', 'k', 'silhouette', 'inertia', 'seconds')} for f in fits]
+    logger.info('Cluster sweep of %d candidates took %.2fs on %d workers; best %s k=%d',
+                len(fits), elapsed, workers, best['algorithm'], best['k'])
+
+    selection = {
+        'algorithm': best['algorithm'],
+        'k': best['k'],
+        'silhouette': best['silhouette'],
+        'inertia': best['inertia'],
+        'sample_size': int(len(sample)),
+        'candidates': table,
+        'selected_at': datetime.now(timezone.utc),
+    }
+    clusters = _save_clusters(jobs, vectorizer, X, best['labels'], best['centers'], batch_size, progress,
+                              selection=selection)
+    return {'best': {key: selection[key] for key in ('algorithm', 'k', 'silhouette', 'inertia')},
+            'candidates': table, 'seconds': round(elapsed, 3), 'clusters': clusters}
@@ -0,0 +1,151 @@
+import logging
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from services import db
+from services.ml_core import pack_jobs
+
+logger = logging.getLogger(__name__)
+
+# role_versions key holding the version of the whole job corpus
+CORPUS_KEY = '__corpus__'
+
+
+def bump_role_version(*roles):
+    """Invalidate the profiles of `roles` (and the corpus-wide version).
+
+    Must be called by every writer of job_skills after it inserts or deletes jobs.
+    """
+    for role in set(roles) | {CORPUS_KEY}:
+        db.role_versions_coll.update_one({'_id': role}, {'$inc': {'version': 1}}, upsert=True)
+
+
+def get_versions(roles):
+    """Current version counter per role (0 if the role was never bumped)."""
+    versions = {role: 0 for role in roles}
+    for doc in db.role_versions_coll.find({'_id': {'$in': list(roles)}}):
+        versions[doc['_id']] = doc.get('version', 0)
+    return versions
+
+
+def corpus_version():
+    return get_versions([CORPUS_KEY])[CORPUS_KEY]
+
+
+def build_profile(role, version, job_docs):
+    """Precompute everything analysis needs for a role from its job documents."""
+    jobs = [{'role': j['role'], 'skills': j.get('skills', []), 'weights': j.get('weights', {})} for j in job_docs]
+    weights, total_weight, skill_index = pack_jobs([j for j in jobs if j['skills']])
+
+    cluster_ids = [j.get('cluster_id') for j in job_docs]
+    present = [c for c in cluster_ids if c is not None]
+
+    return {
+        'role': role,
+        'version': version,
+        'jobs': jobs,
+        'cluster_ids': cluster_ids,
+        'role_cluster_used': int(Counter(present).most_common(1)[0][0]) if present else None,
+        'packed': (weights, total_weight, skill_index),
+    }
+
+
+def _to_document(profile):
+    weights, total_weight, skill_index = profile['packed']
+    doc = {k: v for k, v in profile.items() if k != 'packed'}
+    doc['_id'] = profile['role']
+    doc['skill_vocabulary'] = list(skill_index)
+    doc['weight_indptr'] = weights.indptr.tolist()
+    doc['weight_indices'] = weights.indices.tolist()
+    doc['weight_data'] = weights.data.tolist()
+    doc['total_weight'] = total_weight.tolist()
+    return doc
+
+
+def _from_document(doc):
+    vocabulary = doc.get('skill_vocabulary', [])
+    total_weight = np.asarray(doc.get('total_weight', []), dtype=np.float64)
+    weights = csr_matrix(
+        (np.asarray(doc.get('weight_data', []), dtype=np.float64),
+         np.asarray(doc.get('weight_indices', []), dtype=np.int32),
+         np.asarray(doc.get('weight_indptr', [0]), dtype=np.int32)),
+        shape=(len(total_weight), len(vocabulary)),
+    )
+    return {
+        'role': doc['role'],
+        'version': doc['version'],
+        'jobs': doc.get('jobs', []),
+        'cluster_ids': doc.get('cluster_ids', []),
+        'role_cluster_used': doc.get('role_cluster_used'),
+        'packed': (weights, total_weight, {s: i for i, s in enumerate(vocabulary)}),
+    }
+
+
+class RoleProfileStore:
+    """Per-role job profiles kept in memory and persisted to `role_profiles`.
+
+    A profile is valid while its version matches the role's counter in
+    `role_versions`; a warm lookup therefore costs one small query on that
+    collection and no scan of job_skills.
+    """
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def get_profiles(self, roles):
+        roles = list(dict.fromkeys(roles))
+        versions = get_versions(roles)
+
+        out = {}
+        stale = []
+        for role in roles:
+            profile = self._profiles.get(role)
+            if profile is not None and profile['version'] == versions[role]:
+                out[role] = profile
+            else:
+                stale.append(role)
+
+        if stale:
+            # second tier: persisted profiles built by another worker
+            for doc in db.role_profiles_coll.find({'_id': {'$in': stale}}):
+                if doc.get('version') == versions[doc['_id']]:
+                    out[doc['_id']] = _from_document(doc)
+
+            missing = [role for role in stale if role not in out]
+            if missing:
+                job_docs = {role: [] for role in missing}
+                for j in db.job_coll.find({'role': {'$in': missing}},
+                                          {'role': 1, 'skills': 1, 'weights': 1, 'cluster_id': 1}):
+                    job_docs[j['role']].append(j)
+                for role in missing:
+                    out[role] = build_profile(role, versions[role], job_docs[role])
+                    self._persist(out[role])
+
+            with self._lock:
+                for role in stale:
+                    self._profiles[role] = out[role]
+
+        return out
+
+    def get_profile(self, role):
+        return self.get_profiles([role])[role]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+    @staticmethod
+    def _persist(profile):
+        try:
+            db.role_profiles_coll.replace_one({'_id': profile['role']}, _to_document(profile), upsert=True)
+        except Exception as e:
+            # e.g. a very large role exceeding the document size limit; the
+            # in-memory profile still serves this worker
+            logger.warning('Could not persist role profile for %s: %s', profile['role'], e)
+
+
+profile_store = RoleProfileStore()
@@ -0,0 +1,165 @@
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+
+from config import LLM_SINGLE_FLIGHT, LLM_SINGLE_FLIGHT_DIR, LLM_SINGLE_FLIGHT_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX: cross-process mode degrades to thread mode
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# how often a waiting process re-tries the file lock
+_POLL_SECONDS = 0.05
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result.
+
+    `do(key, fn)` runs `fn` in the first caller (the leader); callers arriving
+    with the same key while it runs wait and receive the same result or
+    exception. In "process" mode the leader also takes a per-key file lock, so
+    a leader in another process waits for it and then calls `recheck()`
+    (normally a lookup in the shared response cache) before doing the work
+    itself.
+    """
+
+    def __init__(self, mode=LLM_SINGLE_FLIGHT, lock_dir=LLM_SINGLE_FLIGHT_DIR, timeout=LLM_SINGLE_FLIGHT_TIMEOUT):
+        if mode not in ('off', 'thread', 'process'):
+            raise ValueError('Unsupported single-flight mode')
+        if mode == 'process' and fcntl is None:
+            logger.warning('File locks unavailable; single-flight limited to this process')
+            mode = 'thread'
+        self.mode = mode
+        self.lock_dir = lock_dir
+        self.timeout = timeout
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'coalesced': 0, 'cross_process_hits': 0}
+
+    def _join(self, table, key, factory):
+        """Return (call, is_leader) for `key` in `table`."""
+        with self._lock:
+            call = table.get(key)
+            if call is not None:
+                self._stats['coalesced'] += 1
+                return call, False
+            call = table[key] = factory()
+            self._stats['leaders'] += 1
+            return call, True
+
+    def do(self, key, fn, recheck=None):
+        if self.mode == 'off':
+            return fn()
+        call, leader = self._join(self._calls, key, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, recheck)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, coro_fn):
+        """asyncio version of `do`, coalescing callers on the same event loop."""
+        if self.mode == 'off':
+            return await coro_fn()
+        loop = asyncio.get_running_loop()
+        future, leader = self._join(self._async_calls, (id(loop), key), loop.create_future)
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await coro_fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # mark retrieved so a leader-only failure does not log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                del self._async_calls[(id(loop), key)]
+
+    def _run(self, key, fn, recheck):
+        if self.mode != 'process' or recheck is None:
+            return fn()
+        with self._file_lock(key) as waited:
+            if waited:
+                result = recheck()
+                if result is not None:
+                    with self._lock:
+                        self._stats['cross_process_hits'] += 1
+                    return result
+            return fn()
+
+    @contextlib.contextmanager
+    def _file_lock(self, key):
+        """Hold an exclusive lock on the key's lock file; yields whether we had to wait.
+
+        After `timeout` seconds the caller proceeds without the lock rather than
+        failing the request.
+        """
+        path = os.path.join(self.lock_dir, f'{key}.lock')
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            f = open(path, 'a+b')
+        except OSError as e:
+            logger.warning('Single-flight lock unavailable (%s)', e)
+            yield False
+            return
+        try:
+            waited = False
+            locked = False
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    locked = True
+                    break
+                except OSError:
+                    waited = True
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(_POLL_SECONDS)
+            yield waited
+        finally:
+            if locked:
+                # remove the file so lock files do not pile up; a process that
+                # raced us onto a fresh file at worst repeats the call
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+                fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, mode=self.mode, in_flight=len(self._calls) + len(self._async_calls))
+
+
+single_flight = SingleFlight()
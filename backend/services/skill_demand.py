@@ -0,0 +1,96 @@
+from collections import Counter
+
+from services import db
+
+# value of the group key when skills are counted over all matched postings
+ALL = None
+
+
+def skill_frequency_pipelines(group_by=None, match=None, skills=None, top_n=10):
+    """Aggregations counting postings, and skill occurrences, per value of `group_by`.
+
+    Returns (jobs pipeline, skills pipeline). They run separately rather than
+    in one `$facet`, whose single output document is capped at 16MB. With
+    `top_n` each group's skills are sorted and cut in Mongo into one document
+    per group; with `top_n=None` (every skill) one document per group and
+    skill is streamed back instead. `skills` restricts the counted skills,
+    not the postings. A skill listed twice on one posting counts twice.
+    """
+    group = f'${group_by}' if group_by else ALL
+    head = [{'$match': match}] if match else []
+    jobs_stages = head + [{'$group': {'_id': group, 'jobs': {'$sum': 1}}}]
+
+    skill_stages = head + [
+        {'$project': {'_id': 0, 'group': group if group_by else {'$literal': ALL}, 'skills': 1}},
+        {'$unwind': '$skills'},
+    ]
+    if skills:
+        skill_stages.append({'$match': {'skills': {'$in': list(skills)}}})
+    skill_stages += [
+        {'$group': {'_id': {'group': '$group', 'skill': '$skills'}, 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id.skill': 1}},
+    ]
+    if top_n is None:
+        skill_stages.append({'$project': {'_id': 0, 'group': '$_id.group', 'skill': '$_id.skill', 'count': 1}})
+    else:
+        skill_stages += [
+            {'$group': {'_id': '$_id.group', 'skills': {'$push': {'skill': '$_id.skill', 'count': '$count'}}}},
+            {'$project': {'skills': {'$slice': ['$skills', top_n]}}},
+        ]
+    return jobs_stages, skill_stages
+
+
+def skill_frequency(group_by=None, match=None, skills=None, top_n=10, coll=None):
+    """Run `skill_frequency_pipelines` on job_skills.
+
+    Returns {group: {'jobs': n, 'skills': [{'skill', 'count', 'share'}, ...]}},
+    where share is the fraction of the group's postings listing the skill;
+    without `group_by` the only key is None.
+    """
+    coll = db.job_coll if coll is None else coll
+    jobs_stages, skill_stages = skill_frequency_pipelines(group_by, match, skills, top_n)
+    out = {row['_id']: {'jobs': row['jobs'], 'skills': []}
+           for row in coll.aggregate(jobs_stages, allowDiskUse=True)}
+    for row in coll.aggregate(skill_stages, allowDiskUse=True):
+        if 'skills' in row:
+            key, found = row['_id'], row['skills']
+        else:
+            key, found = row['group'], [{'skill': row['skill'], 'count': row['count']}]
+        entry = out.setdefault(key, {'jobs': 0, 'skills': []})
+        entry['skills'] += [
+            dict(s, share=s['count'] / entry['jobs'] if entry['jobs'] else 0.0) for s in found
+        ]
+    return out
+
+
+def cluster_skill_counts(cluster_ids, top_n=None, match=None):
+    """{cluster_id: (num_jobs, Counter of skills)} for the given clusters, counted in Mongo.
+
+    `match` narrows the postings further, e.g. to one clustering run.
+    """
+    cluster_ids = [int(c) for c in cluster_ids]
+    stats = skill_frequency('cluster_id', dict(match or {}, cluster_id={'$in': cluster_ids}), top_n=top_n)
+    return {
+        cid: (stats.get(cid, {}).get('jobs', 0),
+              Counter({s['skill']: s['count'] for s in stats.get(cid, {}).get('skills', [])}))
+        for cid in cluster_ids
+    }
+
+
+def skill_demand(role=None, cluster_id=None, skills=None, group_by=None, top_n=20):
+    """Most demanded skills among postings, optionally filtered by role or cluster.
+
+    With `group_by` ('role' or 'cluster_id') the result is per group, as
+    returned by `skill_frequency`; otherwise it is the single overall entry.
+    """
+    if group_by not in (None, 'role', 'cluster_id'):
+        raise ValueError('group_by must be role or cluster_id')
+    match = {}
+    if role is not None:
+        match['role'] = role
+    if cluster_id is not None:
+        match['cluster_id'] = int(cluster_id)
+    stats = skill_frequency(group_by, match or None, skills, top_n)
+    if group_by:
+        return stats
+    return stats.get(ALL, {'jobs': 0, 'skills': []})
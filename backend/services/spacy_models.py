@@ -0,0 +1,48 @@
+import logging
+import threading
+
+from config import SPACY_MODEL
+
+logger = logging.getLogger(__name__)
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_nlp(name: str = SPACY_MODEL):
+    """Return the process-wide spaCy pipeline `name`, loading it on first use.
+
+    Every module shares the same instance, so a worker holds one copy of each
+    model and pays the load only when a request first needs it.
+    """
+    nlp = _models.get(name)
+    if nlp is None:
+        with _lock:
+            nlp = _models.get(name)
+            if nlp is None:
+                import spacy  # imported lazily: importing spaCy alone costs ~1s
+
+                logger.info('Loading spaCy model %s', name)
+                nlp = spacy.load(name)
+                _models[name] = nlp
+    return nlp
+
+
+def model_version(name: str = SPACY_MODEL) -> str:
+    """Installed version of a model package, read without loading the model."""
+    try:
+        from importlib.metadata import version
+        return version(name)
+    except Exception:
+        return 'unknown'
+
+
+def preload(*names):
+    """Load models eagerly, e.g. in the gunicorn master before workers fork so
+    they share the model's memory pages copy-on-write."""
+    for name in names or (SPACY_MODEL,):
+        get_nlp(name)
+
+
+def loaded_models():
+    return sorted(_models)
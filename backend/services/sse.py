@@ -0,0 +1,51 @@
+import json
+import logging
+
+from flask import Response
+
+logger = logging.getLogger(__name__)
+
+
+def wants_stream(req, data=None) -> bool:
+    """True when the client asked for a streamed reply (?stream=1, "stream": true or Accept: text/event-stream)."""
+    if req.args.get('stream') in ('1', 'true'):
+        return True
+    if data and data.get('stream') is True:
+        return True
+    return 'text/event-stream' in req.headers.get('Accept', '')
+
+
+def _event(payload, event=None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(payload)}\n\n"
+
+
+def sse_response(chunks, field, fallback):
+    """Stream text chunks as server-sent events.
+
+    Each chunk is sent as `data: {"delta": ...}`; the stream ends with a `done`
+    event whose data is the same object the JSON endpoint returns
+    ({field: full text}). If the model fails before producing anything the
+    fallback text is sent as the reply; a failure mid-stream ends with an
+    `error` event after the partial text.
+    """
+    def generate():
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield _event({'delta': chunk})
+        except Exception as e:
+            logger.error(f"Streaming reply failed: {e}")
+            if parts:
+                yield _event({'error': 'stream interrupted'}, event='error')
+                return
+            parts.append(fallback)
+            yield _event({'delta': fallback})
+        yield _event({field: ''.join(parts)}, event='done')
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # stop nginx-style proxies from buffering the stream
+        'X-Accel-Buffering': 'no',
+    })
@@ -0,0 +1,235 @@
+import contextlib
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from datetime import timedelta
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from services import db
+from config import TASK_WORKERS, TASK_QUEUE_MAX, TASK_LEASE_TTL
+
+logger = logging.getLogger(__name__)
+
+# seconds between progress writes of one task
+_PROGRESS_EVERY = 1.0
+
+_registry = {}
+# task name -> name of the lease it must hold while running
+_leases = {}
+
+
+class TaskConflict(RuntimeError):
+    """Another task holding the same lease is running."""
+
+
+def task(name, lease=None):
+    """Register `fn(params, progress)` as a background task called `name`.
+
+    `params` is the JSON object given at submission; `progress(done, total)`
+    may be called to report advancement. The return value is stored as the
+    task result, so it must be BSON-serializable (string keys).
+
+    Tasks registered with the same `lease` never run at the same time, in
+    this process or any other: the lease is a `task_leases` document kept
+    alive by a heartbeat and expiring TASK_LEASE_TTL seconds after its
+    holder dies.
+    """
+    def register(fn):
+        _registry[name] = fn
+        if lease:
+            _leases[name] = lease
+        return fn
+    return register
+
+
+def registered_tasks():
+    return sorted(_registry)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _take_lease(lease, task_id) -> bool:
+    holder = {'task_id': task_id, 'worker': _worker_id(), 'expires_at': _now() + timedelta(seconds=TASK_LEASE_TTL)}
+    try:
+        db.task_leases_coll.insert_one(dict(holder, _id=lease))
+        return True
+    except DuplicateKeyError:
+        # only an expired lease (holder died without releasing) may be taken over
+        return db.task_leases_coll.find_one_and_update(
+            {'_id': lease, 'expires_at': {'$lt': _now()}}, {'$set': holder}) is not None
+
+
+def _lease_busy(lease) -> bool:
+    doc = db.task_leases_coll.find_one({'_id': lease})
+    return doc is not None and _as_utc(doc['expires_at']) >= _now()
+
+
+def _as_utc(value):
+    # pymongo returns naive UTC datetimes unless the client is tz_aware
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@contextlib.contextmanager
+def _holding(lease, task_id):
+    """Hold `lease` for the body, renewing it every third of its TTL; raise TaskConflict if taken."""
+    if not _take_lease(lease, task_id):
+        raise TaskConflict(f'Another task holding the {lease!r} lease is running')
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(TASK_LEASE_TTL / 3):
+            db.task_leases_coll.update_one({'_id': lease, 'task_id': task_id}, {'$set': {
+                'expires_at': _now() + timedelta(seconds=TASK_LEASE_TTL)}})
+
+    beat = threading.Thread(target=heartbeat, name=f'lease-{lease}', daemon=True)
+    beat.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        beat.join()
+        db.task_leases_coll.delete_one({'_id': lease, 'task_id': task_id})
+
+
+class TaskRunner:
+    """Runs registered tasks on a small thread pool inside this process.
+
+    Task state lives in the `tasks` collection, so any worker can answer
+    status and result queries, but a task runs in the process that accepted
+    it. At most `max_workers` tasks run at once and at most `max_queued`
+    may be waiting or running here; more submissions are refused.
+    """
+
+    def __init__(self, max_workers=TASK_WORKERS, max_queued=TASK_QUEUE_MAX):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self._stats = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'rejected': 0}
+
+    def _executor(self):
+        # created on first use, so a pool made before a fork is never reused by the child
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='task')
+            self._pool_pid = os.getpid()
+            self._recover()
+        return self._pool
+
+    def submit(self, name, params=None) -> str:
+        """Queue task `name`; returns its id.
+
+        Raises KeyError for an unknown task, TaskConflict while a task holding
+        the same lease runs, and RuntimeError when the queue is full.
+        """
+        if name not in _registry:
+            raise KeyError(f'Unknown task: {name}')
+        if name in _leases and _lease_busy(_leases[name]):
+            raise TaskConflict(f'Another task holding the {_leases[name]!r} lease is running')
+        with self._lock:
+            if self._active >= self.max_queued:
+                self._stats['rejected'] += 1
+                raise RuntimeError('Task queue is full; try again later')
+            self._active += 1
+            self._stats['submitted'] += 1
+
+        doc = {
+            '_id': ObjectId(),
+            'name': name,
+            'params': params or {},
+            'status': 'queued',
+            'progress': None,
+            'result': None,
+            'error': None,
+            'worker': _worker_id(),
+            'created_at': _now(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        try:
+            db.tasks_coll.insert_one(doc)
+            self._executor().submit(self._run, doc['_id'], name, doc['params'])
+        except Exception:
+            with self._lock:
+                self._active -= 1
+            raise
+        return str(doc['_id'])
+
+    def _run(self, task_id, name, params):
+        db.tasks_coll.update_one({'_id': task_id}, {'$set': {'status': 'running', 'started_at': _now()}})
+        last = [0.0]
+
+        def progress(done, total=None):
+            now = time.monotonic()
+            if now - last[0] >= _PROGRESS_EVERY or (total is not None and done >= total):
+                last[0] = now
+                db.tasks_coll.update_one({'_id': task_id}, {'$set': {'progress': {'done': done, 'total': total}}})
+
+        try:
+            with _holding(_leases[name], task_id) if name in _leases else contextlib.nullcontext():
+                result = _registry[name](params, progress)
+            db.tasks_coll.update_one({'_id': task_id}, {'$set': {
+                'status': 'succeeded', 'result': result, 'finished_at': _now(),
+            }})
+            outcome = 'succeeded'
+        except Exception as e:
+            logger.exception('Background task %s (%s) failed', name, task_id)
+            db.tasks_coll.update_one({'_id': task_id}, {'$set': {
+                'status': 'failed', 'error': str(e), 'finished_at': _now(),
+            }})
+            outcome = 'failed'
+        finally:
+            with self._lock:
+                self._active -= 1
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _recover(self):
+        """Fail tasks left queued/running by processes on this host that no longer exist."""
+        host = socket.gethostname()
+        try:
+            for doc in db.tasks_coll.find({'status': {'$in': ['queued', 'running']},
+                                           'worker': {'$regex': f'^{re.escape(host)}:'}}, {'worker': 1}):
+                pid = int(doc['worker'].rsplit(':', 1)[1])
+                if pid != os.getpid() and not _alive(pid):
+                    db.tasks_coll.update_one({'_id': doc['_id'], 'status': {'$in': ['queued', 'running']}}, {'$set': {
+                        'status': 'failed', 'error': 'worker exited before the task finished', 'finished_at': _now(),
+                    }})
+        except Exception as e:
+            logger.warning('Could not recover orphaned tasks: %s', e)
+
+    @staticmethod
+    def get(task_id):
+        return db.tasks_coll.find_one({'_id': ObjectId(task_id)})
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, active=self._active, max_workers=self.max_workers, max_queued=self.max_queued)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+task_runner = TaskRunner()
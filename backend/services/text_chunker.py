@@ -0,0 +1,37 @@
+import re
+
+# blank lines separate sections/headings; sentences end in . ! ? or a newline
+_SECTION_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def split_chunks(text: str, max_chars: int) -> list:
+    """Split `text` into chunks of at most `max_chars` on section or sentence boundaries.
+
+    Chunks never cut through a sentence, so patterns that cannot cross sentence
+    punctuation or newlines match exactly as on the whole text. A single
+    sentence longer than `max_chars` becomes its own oversized chunk. Pieces
+    inside a chunk are joined with newlines.
+    """
+    pieces = []
+    for section in _SECTION_BREAK.split(text):
+        if len(section) <= max_chars:
+            pieces.append(section)
+        else:
+            pieces.extend(_SENTENCE_BREAK.split(section))
+
+    chunks = []
+    current = []
+    size = 0
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        if current and size + 1 + len(piece) > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + (1 if size else 0)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
@@ -0,0 +1,151 @@
+import logging
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import normalize
+
+from config import BEST_FIT_BRUTE_MAX, BEST_FIT_PROBES
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_rows(vectors):
+    vectors = csr_matrix(vectors, dtype=np.float64)
+    return normalize(vectors) if vectors.shape[0] else vectors
+
+
+def _top_k(scores, k):
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind='stable')]
+
+
+class VectorIndex:
+    """Cosine nearest-neighbour index over sparse row vectors.
+
+    Rows are L2-normalized so cosine similarity is a dot product. Small indexes
+    are searched brute-force with one sparse mat-vec. Above `brute_max` rows the
+    vectors are partitioned with spherical k-means (IVF) and a query only scores
+    the `n_probe` partitions whose centroids are closest, which is approximate.
+    """
+
+    def __init__(self, vectors, mode='auto', n_partitions=None, n_probe=None, brute_max=None):
+        vectors = _normalize_rows(vectors)
+        n = vectors.shape[0]
+        brute_max = BEST_FIT_BRUTE_MAX if brute_max is None else brute_max
+        if mode == 'auto':
+            mode = 'brute' if n <= brute_max else 'partitioned'
+        if mode not in ('brute', 'partitioned'):
+            raise ValueError('Unsupported index mode')
+        self.mode = mode
+        self.size = n
+
+        if mode == 'brute':
+            self._vectors = vectors
+            self._row_ids = np.arange(n)
+            return
+
+        n_partitions = n_partitions or max(1, int(np.sqrt(n)))
+        n_partitions = min(n_partitions, n)
+        self.n_probe = min(n_probe or BEST_FIT_PROBES, n_partitions)
+
+        km = MiniBatchKMeans(n_clusters=n_partitions, random_state=42, n_init=3, batch_size=4096)
+        assignment = km.fit_predict(vectors)
+        self._centroids = normalize(km.cluster_centers_)
+
+        # rows grouped by partition: one small CSR block and its original row ids each
+        self._partitions = []
+        for p in range(n_partitions):
+            rows = np.flatnonzero(assignment == p)
+            self._partitions.append((rows, vectors[rows]))
+        logger.info('Built partitioned vector index: %d rows, %d partitions', n, n_partitions)
+
+    def query(self, vector, k=10):
+        """Return [(row, score), ...] for the k most similar rows, best first."""
+        if self.size == 0:
+            return []
+        q = np.asarray(vector.toarray() if hasattr(vector, 'toarray') else vector, dtype=np.float64).ravel()
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+
+        if self.mode == 'brute':
+            scores = self._vectors @ q
+            rows = _top_k(scores, k)
+            return [(int(self._row_ids[r]), float(scores[r])) for r in rows]
+
+        # queries are sparse: only the centroid columns of the query terms matter
+        terms = np.flatnonzero(q)
+        probes = _top_k(self._centroids[:, terms] @ q[terms], self.n_probe)
+        candidates = []
+        candidate_scores = []
+        for p in probes:
+            rows, block = self._partitions[p]
+            if len(rows):
+                candidates.append(rows)
+                candidate_scores.append(block @ q)
+        if not candidates:
+            return []
+        candidates = np.concatenate(candidates)
+        candidate_scores = np.concatenate(candidate_scores)
+        best = _top_k(candidate_scores, k)
+        return [(int(candidates[b]), float(candidate_scores[b])) for b in best]
+
+
+def _group_vectors(vectors, groups):
+    """Normalized mean vector per distinct group value (groups aligned with rows)."""
+    keys = list(dict.fromkeys(groups))
+    position = {g: i for i, g in enumerate(keys)}
+    indicator = csr_matrix(
+        (np.ones(len(groups)), ([position[g] for g in groups], np.arange(len(groups)))),
+        shape=(len(keys), len(groups)),
+    )
+    return keys, _normalize_rows(indicator @ vectors)
+
+
+class BestFitIndex:
+    """Prebuilt indexes for ranking roles, clusters and postings against a skill set."""
+
+    def __init__(self, vectorizer, job_docs, cluster_labels=None, version=None):
+        self.vectorizer = vectorizer
+        self.version = version
+        cluster_labels = cluster_labels or {}
+
+        self.jobs = [j for j in job_docs if j.get('skills')]
+        if self.jobs:
+            X = vectorizer.transform([' '.join(j['skills']) for j in self.jobs])
+        else:
+            X = csr_matrix((0, len(vectorizer.vocabulary_)))
+
+        self.job_index = VectorIndex(X)
+
+        self.roles, role_vectors = _group_vectors(X, [j.get('role') for j in self.jobs])
+        self.role_index = VectorIndex(role_vectors, mode='brute')
+
+        clustered = [i for i, j in enumerate(self.jobs) if j.get('cluster_id') is not None]
+        self.clusters, cluster_vectors = _group_vectors(X[clustered], [self.jobs[i]['cluster_id'] for i in clustered])
+        self.cluster_labels = cluster_labels
+        self.cluster_index = VectorIndex(cluster_vectors, mode='brute')
+
+    def query(self, skills, top_k=5):
+        """Rank every role and cluster, plus the `top_k` nearest postings."""
+        q = self.vectorizer.transform([' '.join(skills) or 'general'])
+        return {
+            'roles': [
+                {'role': self.roles[r], 'score': score}
+                for r, score in self.role_index.query(q, k=self.role_index.size)
+            ],
+            'clusters': [
+                {'cluster_id': int(self.clusters[c]), 'role_label': self.cluster_labels.get(self.clusters[c]),
+                 'score': score}
+                for c, score in self.cluster_index.query(q, k=self.cluster_index.size)
+            ],
+            'nearest_jobs': [
+                {'job_id': str(self.jobs[j].get('_id')), 'role': self.jobs[j].get('role'), 'score': score}
+                for j, score in self.job_index.query(q, k=top_k)
+            ],
+        }
@@ -0,0 +1,59 @@
+import pytest
+
+from services.background_tasks import run_renormalize_skills
+from services.nlp_pipeline import clean_and_normalize
+from services.norm_cache import NormalizationCache
+
+
+class FakeColl:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+
+    def _matches(self, d, q):
+        for k, v in q.items():
+            if isinstance(v, dict) and '$exists' in v:
+                if (k in d) != v['$exists']:
+                    return False
+            elif d.get(k) != v:
+                return False
+        return True
+
+    def count_documents(self, q):
+        return sum(1 for d in self.docs if self._matches(d, q))
+
+    def find(self, q, projection=None):
+        return [dict(d) for d in self.docs if self._matches(d, q)]
+
+    def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            for d in self.docs:
+                if self._matches(d, op._filter):
+                    d.update(op._doc['$set'])
+
+
+@pytest.fixture(autouse=True)
+def fresh_norm_cache(monkeypatch):
+    monkeypatch.setattr('services.nlp_pipeline.norm_cache', NormalizationCache(path=''))
+
+
+def test_renormalizing_twice_leaves_stored_skills_unchanged(monkeypatch):
+    raw = ["RESTful services", "scikit-learn", "PostgreSQL"]
+    jobs = FakeColl([
+        {'_id': 1, 'role': 'Backend', 'extracted_skills': raw, 'skills': clean_and_normalize(raw)},
+        # stored before raw skills were kept: nothing to re-normalize from
+        {'_id': 2, 'role': 'Data', 'skills': ['REST_API', 'SCIKIT_LEARN']},
+    ])
+    syllabus = FakeColl([{'_id': 3, 'extracted_skills': raw, 'normalized_skills': []}])
+    monkeypatch.setattr('services.db.job_coll', jobs)
+    monkeypatch.setattr('services.db.syllabus_coll', syllabus)
+    monkeypatch.setattr('services.role_profiles.bump_role_version', lambda *roles: None)
+
+    first = run_renormalize_skills({}, lambda done, total: None)
+    snapshot = [dict(d) for d in jobs.docs + syllabus.docs]
+    second = run_renormalize_skills({}, lambda done, total: None)
+
+    assert first['updated'] == {'syllabus': 1, 'jobs': 0}
+    assert second['updated'] == {'syllabus': 0, 'jobs': 0}
+    assert jobs.docs + syllabus.docs == snapshot
+    assert jobs.docs[0]['skills'] == clean_and_normalize(raw)
+    assert jobs.docs[1]['skills'] == ['REST_API', 'SCIKIT_LEARN']
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+import api.analysis as analysis
+
+
+class FakeColl:
+    def find(self, q, projection=None):
+        return []
+
+
+def _client():
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test'
+    JWTManager(app)
+    app.register_blueprint(analysis.bp)
+    return app.test_client()
+
+
+def test_non_integer_top_k_is_a_bad_request():
+    client = _client()
+    for top_k in ('five', None, [3], 0):
+        res = client.post('/analysis/best-fit', json={'skills': ['python'], 'top_k': top_k})
+        assert res.status_code == 400
+
+
+def test_concurrent_requests_build_the_index_once(monkeypatch):
+    builds = []
+
+    class SlowIndex:
+        def __init__(self, vectorizer, job_docs, cluster_labels=None, version=None):
+            builds.append(version)
+            time.sleep(0.1)
+            self.version = version
+
+    monkeypatch.setattr(analysis, 'BestFitIndex', SlowIndex)
+    monkeypatch.setattr(analysis, '_best_fit', None)
+    monkeypatch.setattr(analysis, 'corpus_version', lambda: 'v1')
+    monkeypatch.setattr(analysis.ml, 'ensure_fitted', lambda version, load: None)
+    monkeypatch.setattr('services.db.job_coll', FakeColl())
+    monkeypatch.setattr('services.db.job_clusters', FakeColl())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(analysis._best_fit_index())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert builds == ['v1']
+    assert len({id(r) for r in results}) == 1
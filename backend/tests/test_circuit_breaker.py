@@ -0,0 +1,113 @@
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from cerebras.cloud.sdk import APIConnectionError, APIStatusError
+
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, DeadlineExceeded, deadline, remaining
+from services.llm_client import CerebrasClient, _is_backend_failure
+from services.llm_limiter import InFlightLimiter
+
+
+def test_opens_after_failures_and_probes_half_open():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state() == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state() == 'half_open'
+    breaker.before_call()
+    # only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state() == 'open'
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state() == 'closed'
+    assert breaker.stats()['opened'] == 2
+
+
+def test_nested_deadlines_keep_the_tighter_budget():
+    assert remaining() is None
+    with deadline(10):
+        with deadline(0.5):
+            assert remaining() <= 0.5
+        assert remaining() > 5
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            remaining()
+
+
+class FlakyCompletions:
+    def __init__(self):
+        self.calls = []
+        self.fail = True
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs.get('timeout'))
+        if self.fail:
+            raise APIConnectionError(request=httpx.Request('POST', 'http://llm.test'))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='["python"]'))])
+
+
+def test_client_fails_fast_while_open_and_bounds_each_call():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    client = CerebrasClient(api_key="test", model="test", cache=None, limiter=InFlightLimiter(limit=4),
+                            breaker=breaker)
+    completions = FlakyCompletions()
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    for _ in range(2):
+        with pytest.raises(APIConnectionError):
+            client.extract_skills("python course")
+    with pytest.raises(CircuitOpenError):
+        client.extract_skills("python course")
+    assert len(completions.calls) == 2
+    # every request carried a timeout within the extract_skills deadline
+    assert all(t is not None and t <= 20 for t in completions.calls)
+
+    time.sleep(0.06)
+    completions.fail = False
+    assert client.extract_skills("python course") == ["python"]
+    assert breaker.stats()['state'] == 'closed'
+
+
+def _status_error(status):
+    request = httpx.Request('POST', 'http://llm.test')
+    return APIStatusError('status', response=httpx.Response(status, request=request), body=None)
+
+
+def test_only_backend_errors_count_as_failures():
+    request = httpx.Request('POST', 'http://llm.test')
+    assert _is_backend_failure(APIConnectionError(request=request))
+    assert _is_backend_failure(httpx.ReadTimeout('read timed out', request=request))
+    assert _is_backend_failure(_status_error(503))
+    assert _is_backend_failure(_status_error(429))
+    assert not _is_backend_failure(_status_error(400))
+    # local bugs have no status code but say nothing about the backend
+    assert not _is_backend_failure(TypeError('bad argument'))
+    assert not _is_backend_failure(KeyError('choices'))
+
+
+def test_local_errors_do_not_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = CerebrasClient(api_key="test", model="test", cache=None, limiter=InFlightLimiter(limit=4),
+                            breaker=breaker)
+
+    def broken(**kwargs):
+        raise TypeError('unexpected keyword argument')
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=broken)))
+    for _ in range(3):
+        with pytest.raises(TypeError):
+            client.extract_skills("python course")
+    assert breaker.state() == 'closed'
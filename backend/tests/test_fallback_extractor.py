@@ -0,0 +1,44 @@
+import re
+
+import pytest
+
+from services.fallback_extractor import TECH_WORDS, extract_skills_rule_based, extract_skills_rule_based_many
+from services.spacy_models import get_nlp
+
+pytestmark = pytest.mark.skipif('parser' not in get_nlp().pipe_names,
+                                reason='noun chunks need a spaCy model with a dependency parser')
+
+
+DOCS = [
+    ("Course outline\n\nUnit 1. Experience with python and flask is expected. "
+     "Students gain knowledge of sql, docker.\n\n"
+     + "".join(f"Week {i}. The lecture covers convolutional networks in pytorch and graph databases. " for i in range(40))),
+    "Data engineer. Knowledge of kubernetes, aws. Builds ETL pipelines and maintains the warehouse.",
+    "Frontend role: react, graphql, nodejs. Experience with design systems and accessibility audits.",
+]
+
+
+def _serial_reference(text):
+    # the original whole-document extractor, without chunking or nlp.pipe
+    text = text.lower()
+    found = set(re.findall(r"[a-zA-Z+#]+", text)) & TECH_WORDS
+    for chunk in get_nlp()(text).noun_chunks:
+        token = chunk.root.lemma_.lower()
+        if len(token) > 2 and token.isalpha():
+            found.add(token)
+    for p in [r"experience with ([a-zA-Z0-9+#\- ]+)", r"knowledge of ([a-zA-Z0-9+#\- ]+)"]:
+        for m in re.findall(p, text):
+            found.add(m.strip().split(',')[0])
+    return sorted(found)
+
+
+def test_many_matches_serial_extractor():
+    expected = [_serial_reference(t) for t in DOCS]
+    assert len(DOCS[0]) > 2000  # long enough to be split into several chunks
+
+    assert extract_skills_rule_based_many(DOCS, n_process=1) == expected
+    assert [extract_skills_rule_based(t) for t in DOCS] == expected
+
+
+def test_parallel_path_matches_serial_path():
+    assert extract_skills_rule_based_many(DOCS, n_process=2) == extract_skills_rule_based_many(DOCS, n_process=1)
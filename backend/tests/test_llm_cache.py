@@ -0,0 +1,28 @@
+from services.llm_cache import LLMResponseCache, response_key
+
+
+def test_disk_tier_is_shared_and_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / 'llm.sqlite3')
+    key = response_key('m', 'prompt', 512, 0.0)
+    assert key != response_key('m', 'prompt', 512, 0.2)
+
+    first = LLMResponseCache(path=path)
+    first.put(key, '["python"]', ttl=60)
+    second = LLMResponseCache(path=path)
+    assert second.get(key) == '["python"]'
+    assert second.stats()['disk_hits'] == 1
+
+    import services.llm_cache as llm_cache
+    real_time = llm_cache.time.time
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: real_time() + 120)
+    assert second.get(key) is None
+    assert LLMResponseCache(path=path).get(key) is None
+
+
+def test_lru_eviction():
+    cache = LLMResponseCache(path='', max_entries=2)
+    for k in 'abc':
+        cache.put(k, k.upper(), ttl=60)
+    assert cache.get('a') is None
+    assert cache.get('c') == 'C'
+    assert cache.stats()['evictions'] == 1
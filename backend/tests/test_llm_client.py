@@ -1,8 +1,11 @@
+import json
+
+from services.llm_cache import LLMResponseCache
 from services.llm_client import CerebrasClient
 
 
 def test_extract_skills_parses_json(monkeypatch):
-    client = CerebrasClient(api_key="test", model="test")
+    client = CerebrasClient(api_key="test", model="test", cache=LLMResponseCache(path=''))
 
     def fake_call(prompt, max_tokens=512, temperature=0.0):
         return {"text": '["python", "flask", "mongodb"]'}
@@ -15,15 +18,120 @@ def test_extract_skills_parses_json(monkeypatch):
 
 
 def test_generate_roadmap_parses_json(monkeypatch):
-    client = CerebrasClient(api_key="test", model="test")
+    client = CerebrasClient(api_key="test", model="test", cache=LLMResponseCache(path=''))
 
-    roadmap_json = '{"weeks": [{"week":1, "topics":["python"]}]}'
+    roadmap_json = ('{"overview": {"target_role": "Backend Developer"}, '
+                    '"weekly_roadmap": [{"week": 1, "focus": "python", "goals": [], "tasks": []}]}')
+    prompts = []
 
     def fake_call(prompt, max_tokens=1024, temperature=0.2):
+        prompts.append(prompt)
         return {"text": roadmap_json}
 
     monkeypatch.setattr(client, "_call_model", fake_call)
 
-    roadmap = client.generate_roadmap(["python"], hours_per_week=5, weeks=4)
+    roadmap = client.generate_roadmap(["python"], "Backend Developer", hours_per_week=5, weeks=4)
     assert isinstance(roadmap, dict)
-    assert "weeks" in roadmap
+    assert [w["week"] for w in roadmap["weekly_roadmap"]] == [1]
+    assert "Target Role: Backend Developer" in prompts[0]
+
+
+def test_responses_are_cached_by_policy(monkeypatch):
+    client = CerebrasClient(api_key="test", model="test", cache=LLMResponseCache(path=''))
+    calls = []
+
+    def fake_call(prompt, max_tokens=512, temperature=0.0):
+        calls.append(prompt)
+        return {"text": '["python"]' if "Extract" in prompt else "reply"}
+
+    monkeypatch.setattr(client, "_call_model", fake_call)
+
+    assert client.extract_skills("same syllabus") == ["python"]
+    assert client.extract_skills("same syllabus") == ["python"]
+    assert len(calls) == 1
+    client.explain_score(50.0, {"python": 0.2})
+    client.explain_score(50.0, {"python": 0.2})
+    assert len(calls) == 2
+    # chat runs at a high temperature and is never cached
+    client.chat("hi")
+    client.chat("hi")
+    assert len(calls) == 4
+    assert client.cache.stats()['hits'] == 2
+
+
+def test_empty_or_malformed_replies_are_not_cached(monkeypatch):
+    client = CerebrasClient(api_key="test", model="test", cache=LLMResponseCache(path=''))
+    replies = iter(['{}', '[]', '["python"]'])
+    monkeypatch.setattr(client, "_call_model", lambda prompt, max_tokens=512, temperature=0.0: {"text": next(replies)})
+
+    assert client.extract_skills("syllabus") == {}
+    assert client.extract_skills("syllabus") == []
+    assert client.extract_skills("syllabus") == ["python"]
+    assert client.extract_skills("syllabus") == ["python"]
+    assert client.cache.stats()['hits'] == 1
+
+
+def test_long_documents_are_extracted_in_chunks(monkeypatch):
+    import threading
+    import time
+
+    client = CerebrasClient(api_key="test", model="test", cache=None)
+    sections = [f"Unit {i}\nTopics: skill{i}, python." + " filler" * 100 for i in range(12)]
+    text = "\n\n".join(sections)
+    assert len(text) > 4000
+
+    seen = []
+    active = []
+    lock = threading.Lock()
+
+    def fake_call(prompt, max_tokens=512, temperature=0.0):
+        with lock:
+            active.append(1)
+            seen.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+        found = [f"skill{i}" for i in range(12) if f"skill{i}," in prompt]
+        return {"text": json.dumps(found + ["Python"])}
+
+    monkeypatch.setattr(client, "_call_model", fake_call)
+
+    skills = client.extract_skills(text)
+    assert sorted(s for s in skills if s != "Python") == sorted(f"skill{i}" for i in range(12))
+    assert skills.count("Python") == 1
+    # chunks ran concurrently
+    assert max(seen) > 1
+
+
+def test_batch_extraction_splits_by_id_and_falls_back(monkeypatch):
+    client = CerebrasClient(api_key="test", model="test", cache=None)
+    prompts = []
+
+    def fake_call(prompt, max_tokens=512, temperature=0.0):
+        prompts.append(prompt)
+        if "### id:" in prompt:
+            # posting "2" is left out of the answer, posting "1" is malformed
+            return {"text": json.dumps({"0": ["python"], "1": "sql", "3": ["docker"]})}
+        return {"text": '["single"]'}
+
+    monkeypatch.setattr(client, "_call_model", fake_call)
+
+    items = [{"id": str(i), "text": f"posting {i}", "role": "Backend"} for i in range(4)]
+    out = client.extract_skills_batch(items)
+
+    assert out == {"0": ["python"], "1": ["single"], "2": ["single"], "3": ["docker"]}
+    # one batched prompt plus one single call per failed item
+    assert len(prompts) == 3
+    assert all(f"### id: {i}" in prompts[0] for i in range(4))
+
+
+def test_batch_extraction_survives_unparseable_batch(monkeypatch):
+    client = CerebrasClient(api_key="test", model="test", cache=None)
+
+    def fake_call(prompt, max_tokens=512, temperature=0.0):
+        if "### id:" in prompt:
+            return {"text": "not json"}
+        raise RuntimeError("api down")
+
+    monkeypatch.setattr(client, "_call_model", fake_call)
+    assert client.extract_skills_batch([{"id": "a", "text": "x"}, {"id": "b", "text": "y"}]) == {"a": None, "b": None}
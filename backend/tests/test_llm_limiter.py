@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.llm_limiter import InFlightLimiter
+
+
+def test_limits_concurrency_and_reports_queue_depth():
+    limiter = InFlightLimiter(limit=2, timeout=5)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with limiter:
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = limiter.stats()
+    assert max(peak) == 2
+    assert stats['completed'] == 6 and stats['in_flight'] == 0 and stats['waiting'] == 0
+    assert stats['peak_waiting'] >= 1
+
+
+def test_async_callers_share_the_limit_and_time_out():
+    limiter = InFlightLimiter(limit=1, timeout=0.05)
+
+    async def main():
+        async with limiter:
+            with pytest.raises(RuntimeError):
+                await limiter.acquire_async()
+        async with limiter:
+            pass
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert (stats['completed'], stats['rejected'], stats['in_flight']) == (2, 1, 0)
+
+
+def test_cancelled_async_waiter_does_not_leak_its_permit():
+    limiter = InFlightLimiter(limit=1, timeout=5)
+    limiter.acquire()
+
+    async def main():
+        waiter = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # the cancelled waiter left the queue, so the freed slot goes back to the pool
+        limiter.release()
+
+    asyncio.run(main())
+    limiter.acquire(timeout=0.5)
+    limiter.release()
+    stats = limiter.stats()
+    assert (stats['in_flight'], stats['waiting']) == (0, 0)
+
+
+def test_async_waiters_time_out_together_without_worker_threads():
+    limiter = InFlightLimiter(limit=1, timeout=0.2)
+    limiter.acquire()
+
+    async def wait():
+        start = time.monotonic()
+        with pytest.raises(RuntimeError):
+            await limiter.acquire_async()
+        return time.monotonic() - start
+
+    async def main():
+        return await asyncio.gather(*[wait() for _ in range(40)])
+
+    threads = threading.active_count()
+    waited = asyncio.run(main())
+    # every waiter's clock starts at once, not in waves the size of a thread pool
+    assert max(waited) < 0.5
+    assert threading.active_count() == threads
+    limiter.release()
+    stats = limiter.stats()
+    assert (stats['rejected'], stats['waiting'], stats['in_flight']) == (40, 0, 0)
+
+
+def test_slot_released_by_a_thread_is_handed_to_an_async_waiter():
+    limiter = InFlightLimiter(limit=1, timeout=5)
+    limiter.acquire()
+    order = []
+
+    async def main():
+        first = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(limiter.acquire_async())
+        threading.Timer(0.05, limiter.release).start()
+        await first
+        order.append('first')
+        limiter.release()
+        await second
+        order.append('second')
+        limiter.release()
+
+    asyncio.run(main())
+    assert order == ['first', 'second']
+    stats = limiter.stats()
+    assert (stats['completed'], stats['in_flight'], stats['waiting']) == (3, 0, 0)
+
+
+def test_async_client_uses_limiter_and_cache():
+    from types import SimpleNamespace
+
+    from services.llm_cache import LLMResponseCache
+    from services.llm_client import CerebrasClient
+
+    class FakeAsyncCompletions:
+        calls = 0
+
+        async def create(self, **kwargs):
+            FakeAsyncCompletions.calls += 1
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='["python"]'))])
+
+    limiter = InFlightLimiter(limit=2)
+    client = CerebrasClient(api_key="test", model="test", cache=LLMResponseCache(path=''), limiter=limiter)
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=FakeAsyncCompletions()))
+    client._async_client = lambda: fake
+
+    async def main():
+        first = await asyncio.gather(*[client.aextract_skills(f"text {i}") for i in range(5)])
+        again = await client.aextract_skills("text 0")
+        return first, again
+
+    first, again = asyncio.run(main())
+    assert first == [["python"]] * 5 and again == ["python"]
+    assert FakeAsyncCompletions.calls == 5
+    assert limiter.stats()['completed'] == 5
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from benchmarks.llm_standin import StandinConfig, serve
+from services.circuit_breaker import CircuitBreaker
+from services.llm_client import CerebrasClient
+from services.llm_limiter import InFlightLimiter
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(**options):
+        server = serve(StandinConfig(seed=1, **options), port=0)
+        servers.append(server)
+        client = CerebrasClient(model="standin", cache=None, limiter=InFlightLimiter(limit=4),
+                                breaker=CircuitBreaker(), base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        client.client = client.client.with_options(max_retries=0)
+        return client
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_client_round_trips_through_standin(standin):
+    client = standin()
+    skills = client.extract_skills("Intro to Python and Flask with SQL databases")
+    assert {"python", "flask", "sql"} <= {s.lower() for s in skills}
+
+    batch = client.extract_skills_batch([{"id": "a", "text": "docker and kubernetes"}, {"id": "b", "text": "react"}])
+    assert "docker" in [s.lower() for s in batch["a"]] and "react" in [s.lower() for s in batch["b"]]
+
+    roadmap = client.generate_roadmap(["docker", "sql"], "Backend Developer", weeks=3)
+    assert len(roadmap["weekly_roadmap"]) == 3
+
+    streamed = "".join(client.chat_stream("hello"))
+    assert streamed == client.chat("hello")
+
+
+def test_standin_injects_failures(standin):
+    client = standin(malformed_rate=1.0)
+    with pytest.raises(json.JSONDecodeError):
+        client.extract_skills("python and flask")
+
+    client = standin(error_rate=1.0)
+    assert client.chat("hello") == "Server Error."
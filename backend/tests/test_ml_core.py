@@ -13,3 +13,59 @@ def test_compute_similarity_simple():
     assert isinstance(res, list)
     assert res[0]['role'] == 'Backend'
     assert 'readiness_pct' in res[0]
+
+
+def test_ensure_fitted_refits_only_on_version_change():
+    ml = MLCore()
+    corpus = [{'skills': ['python', 'flask']}, {'skills': ['react', 'javascript']}]
+    loads = []
+
+    def load():
+        loads.append(1)
+        return corpus
+
+    ml.ensure_fitted(1, load)
+    ml.ensure_fitted(1, load)
+    assert len(loads) == 1
+    assert 'react' in ml.vectorizer.vocabulary_
+
+    ml.ensure_fitted(2, load)
+    assert len(loads) == 2
+    assert ml.corpus_version == 2
+
+
+def test_batched_scoring_matches_reference_loop():
+    ml = MLCore()
+    syllabus = ['python', 'flask', 'rest api', 'docker']
+    jobs = [
+        {'role': 'Backend', 'skills': ['python', 'sql', 'docker', 'python'], 'weights': {'python': 2, 'sql': 1.5}},
+        {'role': 'Backend', 'skills': ['flask', 'rest api', 'kubernetes'], 'weights': {}},
+        {'role': 'Backend', 'skills': [], 'weights': {}},
+        {'role': 'Data', 'skills': ['pandas', 'python', 'sql'], 'weights': {'pandas': 2.0, 'spark': 1.0}},
+    ]
+    ml.fit_corpus(jobs, version=1)
+    assert ml.compute_similarity(syllabus, jobs) == ml._compute_similarity_loop(syllabus, jobs)
+
+
+def test_compute_cohort_matches_per_user_analysis():
+    ml = MLCore()
+    role_jobs = {
+        'Backend': [
+            {'role': 'Backend', 'skills': ['python', 'sql', 'docker'], 'weights': {'python': 2.0}},
+            {'role': 'Backend', 'skills': ['flask', 'rest api'], 'weights': {}},
+        ],
+        'Frontend': [{'role': 'Frontend', 'skills': ['react', 'javascript', 'css'], 'weights': {}}],
+        'Empty': [],
+    }
+    ml.fit_corpus([j for jobs in role_jobs.values() for j in jobs], version=1)
+    users = [['python', 'flask'], ['react', 'css', 'html'], []]
+
+    cohort = ml.compute_cohort(users, role_jobs)
+    assert cohort['readiness'].shape == (3, 3)
+
+    for i, role, results in cohort['results']:
+        expected = ml.compute_similarity(users[i], role_jobs[role])
+        assert results == expected
+        if expected:
+            mean = sum(r['readiness_pct'] for r in expected) / len(expected)
+            assert abs(cohort['readiness'][i, cohort['roles'].index(role)] - mean) < 1e-9
@@ -0,0 +1,24 @@
+from services.norm_cache import NormalizationCache
+
+
+def test_disk_tier_is_shared_and_versioned(tmp_path):
+    path = str(tmp_path / 'norm.sqlite3')
+    first = NormalizationCache(path=path, max_entries=2)
+    first.put_many({'postgresql': 'SQL', 'rest api': 'REST_API', 'flask': 'flask'}, 'v1')
+    assert first.stats()['evictions'] == 1
+
+    # a second worker (fresh memory) reads what the first one wrote
+    second = NormalizationCache(path=path)
+    assert second.get_many(['postgresql', 'flask', 'docker'], 'v1') == {'postgresql': 'SQL', 'flask': 'flask'}
+    assert second.get_many(['postgresql'], 'v1') == {'postgresql': 'SQL'}
+    # a new ontology version never sees old entries
+    assert second.get_many(['postgresql'], 'v2') == {}
+
+    stats = second.stats()
+    assert (stats['hits'], stats['disk_hits'], stats['misses']) == (1, 2, 2)
+
+
+def test_memory_only_without_path():
+    cache = NormalizationCache(path='')
+    cache.put_many({'python': 'python'}, 'v1')
+    assert cache.get_many(['python'], 'v1') == {'python': 'python'}
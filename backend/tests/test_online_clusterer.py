@@ -0,0 +1,177 @@
+from collections import Counter
+
+import threading
+
+import pytest
+
+from services.online_clusterer import ClusterModelStore, assign_clusters, cluster_status, refresh_clusters
+from services.role_clusterer import cluster_jobs
+
+JOBS = [
+    {'_id': 1, 'role': 'Backend', 'raw_text': 'python flask postgresql rest api', 'skills': ['python', 'flask', 'sql']},
+    {'_id': 2, 'role': 'Backend', 'raw_text': 'django python docker postgresql', 'skills': ['django', 'docker']},
+    {'_id': 3, 'role': 'ML', 'raw_text': 'pytorch tensorflow deep learning nlp', 'skills': ['pytorch', 'nlp']},
+    {'_id': 4, 'role': 'ML', 'raw_text': 'keras tensorflow computer vision', 'skills': ['keras', 'tensorflow']},
+    {'_id': 5, 'role': 'Frontend', 'raw_text': 'react javascript typescript css', 'skills': ['react', 'javascript']},
+    {'_id': 6, 'role': 'Frontend', 'raw_text': 'vue javascript frontend css', 'skills': ['vue', 'frontend']},
+]
+
+
+class FakeColl:
+    def __init__(self, docs=()):
+        self.docs = {d['_id']: dict(d) for d in docs}
+
+    def find(self, query=None, projection=None):
+        docs = list(self.docs.values())
+        if query:
+            docs = [d for d in docs if all(d.get(k) == v for k, v in query.items())]
+        return [dict(d) for d in docs] if projection else docs
+
+    def update_one(self, q, u, upsert=False):
+        return None
+
+    def distinct(self, field, query=None):
+        return list({d.get(field) for d in self.docs.values()
+                     if all(d.get(k) in v['$in'] for k, v in (query or {}).items())})
+
+    def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            for doc in self.find(op._filter):
+                doc.update(op._doc['$set'])
+
+    def cluster_skill_counts(self, cluster_ids, top_n=None, match=None):
+        # what services.skill_demand aggregates in Mongo
+        counts = {cid: (0, Counter()) for cid in cluster_ids}
+        for d in self.find(match):
+            if d.get('cluster_id') in counts:
+                n, counter = counts[d['cluster_id']]
+                counter.update(d.get('skills', []))
+                counts[d['cluster_id']] = (n + 1, counter)
+        return counts
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ClusterModelStore(path=str(tmp_path / 'model.pkl'), reload_interval=0)
+    monkeypatch.setattr('services.online_clusterer.cluster_model_store', store)
+    monkeypatch.setattr('services.role_clusterer.cluster_model_store', store)
+    jobs = FakeColl(JOBS)
+    monkeypatch.setattr('services.db.job_coll', jobs)
+    monkeypatch.setattr('services.role_clusterer.cluster_skill_counts', jobs.cluster_skill_counts)
+    monkeypatch.setattr('services.db.job_clusters', FakeColl())
+    monkeypatch.setattr('services.db.role_versions_coll', FakeColl())
+    return store, jobs
+
+
+def test_new_postings_get_the_full_fit_cluster(store):
+    _, jobs = store
+    assert assign_clusters([{'raw_text': 'x'}]) == [{'raw_text': 'x', 'cluster_fitted': False}]
+
+    cluster_jobs(k=3)
+    fitted = {d['_id']: d['cluster_id'] for d in jobs.find()}
+
+    docs = assign_clusters([
+        {'raw_text': 'tensorflow pytorch nlp', 'skills': ['pytorch']},
+        {'raw_text': 'react typescript css', 'skills': ['react']},
+    ])
+    assert docs[0]['cluster_id'] == fitted[3]
+    assert docs[1]['cluster_id'] == fitted[5]
+    assert docs[1]['role_label'] == 'Frontend Engineer'
+    assert all(d['cluster_fitted'] is False for d in docs)
+
+
+def test_refresh_folds_pending_postings_and_reports_drift(store):
+    model_store, jobs = store
+    cluster_jobs(k=3)
+    before = model_store.current().counts.sum()
+
+    new = assign_clusters([
+        {'_id': 7, 'raw_text': 'rust embedded firmware rtos', 'skills': ['rust']},
+        {'_id': 8, 'raw_text': 'rust webassembly tokio', 'skills': ['rust']},
+    ])
+    for d in new:
+        jobs.docs[d['_id']] = d
+
+    report = refresh_clusters()
+    assert report['postings_since_fit'] == 2
+    # unseen vocabulary shows up as drift
+    assert report['oov_rate'] > 0.5 and report['recluster_recommended']
+    assert model_store.current().counts.sum() == before + 2
+    assert all(d['cluster_fitted'] for d in jobs.find())
+    assert cluster_status()['version'] == 2
+    # nothing left to fold
+    assert refresh_clusters()['postings_since_fit'] == 2
+
+
+def test_concurrent_refreshes_fold_each_posting_once(store):
+    model_store, jobs = store
+    cluster_jobs(k=3)
+    shared = model_store.current()
+    for i in range(7, 27):
+        jobs.docs[i] = assign_clusters([{'_id': i, 'raw_text': f'react css widget{i}', 'skills': ['react']}])[0]
+
+    threads = [threading.Thread(target=refresh_clusters) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert model_store.current().drift()['postings_since_fit'] == 20
+    assert model_store.current().counts.sum() == len(JOBS) + 20
+    # the model readers held is never modified in place
+    assert shared.counts.sum() == len(JOBS)
+
+
+def test_refresh_relabels_postings_of_relabeled_clusters(store, monkeypatch):
+    _, jobs = store
+    cluster_jobs(k=3)
+    frontend = jobs.docs[5]['cluster_id']
+    # frontend-looking postings whose skills make the cluster an ML cluster
+    for i in range(7, 17):
+        jobs.docs[i] = assign_clusters([{'_id': i, 'role': 'ML', 'raw_text': 'react javascript css',
+                                         'skills': ['pytorch', 'keras']}])[0]
+    bumped = []
+    monkeypatch.setattr('services.role_profiles.bump_role_version', lambda *roles: bumped.extend(roles))
+
+    refresh_clusters()
+    assert {d['role_label'] for d in jobs.find() if d.get('cluster_id') == frontend} == {'AI / ML Engineer'}
+    assert set(bumped) == {'Frontend', 'ML'}
+
+
+def test_postings_ingested_during_a_fit_keep_out_of_its_counts(store, monkeypatch):
+    from services import role_clusterer
+    _, jobs = store
+    write = role_clusterer._write_batches
+
+    def write_then_ingest(coll, ops, batch_size, progress=None):
+        matched = write(coll, ops, batch_size, progress)
+        # assigned by the previous model while the fit was running
+        jobs.docs[99] = {'_id': 99, 'cluster_id': 0, 'role_label': 'Old', 'skills': ['pytorch'], 'cluster_fitted': False}
+        return matched
+    monkeypatch.setattr(role_clusterer, '_write_batches', write_then_ingest)
+
+    clusters = cluster_jobs(k=3)
+    assert sum(c['num_jobs'] for c in clusters.values()) == len(JOBS)
+    assert jobs.docs[99]['cluster_fitted'] is False
+
+    # the next refresh moves it to the new model's cluster and label
+    refresh_clusters()
+    ml = jobs.docs[3]['cluster_id']
+    assert jobs.docs[99]['cluster_id'] == ml
+    assert jobs.docs[99]['role_label'] == jobs.docs[3]['role_label']
+    assert jobs.docs[99]['cluster_fitted'] is True
+
+
+def test_refresh_reassigns_postings_from_an_older_model(store, monkeypatch):
+    model_store, jobs = store
+    cluster_jobs(k=3)
+    # assigned before k shrank: cluster 5 no longer exists
+    jobs.docs[7] = {'_id': 7, 'role': 'Frontend', 'raw_text': 'react typescript css', 'skills': ['react'],
+                    'cluster_id': 5, 'role_label': 'Gone', 'cluster_fitted': False}
+    bumped = []
+    monkeypatch.setattr('services.role_profiles.bump_role_version', lambda *roles: bumped.extend(roles))
+
+    refresh_clusters()
+    assert jobs.docs[7]['cluster_id'] == jobs.docs[5]['cluster_id']
+    assert jobs.docs[7]['role_label'] == model_store.current().labels[jobs.docs[5]['cluster_id']]
+    assert 'Frontend' in bumped
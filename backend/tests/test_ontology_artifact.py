@@ -0,0 +1,65 @@
+import json
+
+from services.ontology_artifact import OntologyStore, build_artifact, compile_ontology, load_artifact
+
+
+def _write_source(path, ontology):
+    path.write_text(json.dumps(ontology), encoding='utf-8')
+
+
+def test_artifact_round_trip_matches_compiled(tmp_path):
+    source = tmp_path / 'onto.json'
+    _write_source(source, {'SQL': ['sql', 'postgresql'], 'REST_API': ['rest', 'rest api']})
+    built = build_artifact(str(source), str(tmp_path / 'onto.bin'))
+    loaded = load_artifact(str(tmp_path / 'onto.bin'))
+
+    assert loaded.version == built.version
+    assert loaded.canonical_ids == {'REST_API': 0, 'SQL': 1}
+    for text in ['postgresql', 'building a rest api', 'cooking']:
+        assert loaded.match(text) == built.match(text)
+
+
+def test_store_hot_swaps_changed_artifact(tmp_path):
+    source = tmp_path / 'onto.json'
+    artifact = str(tmp_path / 'onto.bin')
+    _write_source(source, {'SQL': ['sql']})
+    build_artifact(str(source), artifact)
+
+    store = OntologyStore(artifact_path=artifact, source_path=str(source), reload_interval=0)
+    old = store.current()
+    assert old.match('postgresql database') == 'SQL'
+    assert old.match('docker') is None
+
+    _write_source(source, {'SQL': ['sql'], 'DOCKER': ['docker']})
+    build_artifact(str(source), artifact)
+    new = store.current()
+    assert new.version != old.version
+    assert new.match('docker') == 'DOCKER'
+    # a snapshot taken before the swap is unchanged
+    assert old.match('docker') is None
+
+
+def test_store_falls_back_to_source_without_artifact(tmp_path):
+    source = tmp_path / 'onto.json'
+    _write_source(source, {'SQL': ['sql']})
+    store = OntologyStore(artifact_path=str(tmp_path / 'missing.bin'), source_path=str(source))
+    assert store.current().version == compile_ontology({'SQL': ['sql']}).version
+
+
+def test_store_serves_edited_source_over_stale_artifact(tmp_path):
+    source = tmp_path / 'onto.json'
+    artifact = str(tmp_path / 'onto.bin')
+    _write_source(source, {'SQL': ['sql']})
+    build_artifact(str(source), artifact)
+
+    # edited after the build, at startup and while running
+    _write_source(source, {'SQL': ['sql'], 'DOCKER': ['docker']})
+    store = OntologyStore(artifact_path=artifact, source_path=str(source), reload_interval=0)
+    assert store.current().match('docker') == 'DOCKER'
+
+    _write_source(source, {'SQL': ['sql'], 'DOCKER': ['docker'], 'REACT': ['react']})
+    assert store.current().match('react') == 'REACT'
+
+    # a broken edit keeps the last good ontology
+    source.write_text('{not json', encoding='utf-8')
+    assert store.current().match('react') == 'REACT'
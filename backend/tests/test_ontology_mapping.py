@@ -1,4 +1,13 @@
+import pytest
+
 from services.nlp_pipeline import clean_and_normalize
+from services.norm_cache import NormalizationCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_norm_cache(monkeypatch):
+    # memory-only, so results never come from the shared instance/ file or an earlier test
+    monkeypatch.setattr('services.nlp_pipeline.norm_cache', NormalizationCache(path=''))
 
 
 def test_ontology_mapping_basic():
@@ -11,3 +20,57 @@ def test_ontology_mapping_sql():
     s = ["PostgreSQL", "relational database"]
     normalized = clean_and_normalize(s)
     assert 'SQL' in normalized
+
+
+def test_ontology_matcher_prefers_longest_then_first_synonym():
+    from services.ontology_matcher import OntologyMatcher
+
+    reverse = {'sql': 'SQL', 'postgresql': 'POSTGRES', 'rest': 'REST', 'api': 'API', 'rest api': 'REST_API',
+               'she': 'SHE', 'hers': 'HERS', 'his': 'HIS'}
+    matcher = OntologyMatcher(reverse)
+
+    def scan(s):
+        for syn, canon in sorted(reverse.items(), key=lambda x: -len(x[0])):
+            if syn in s:
+                return canon
+        return None
+
+    for text in ['postgresql admin', 'restful api design', 'rest api', 'ushers', 'his api', 'nothing here', 'api rest']:
+        assert matcher.find(text) == scan(text)
+
+
+def test_batched_normalization_matches_per_string_pipeline():
+    from services.nlp_pipeline import _match_ontology
+    from services.spacy_models import get_nlp
+
+    nlp = get_nlp()
+
+    skills = ["RESTful services", "Machine Learning", "PostgreSQL", "the running of tests", "Docker", "docker"]
+
+    expected = []
+    for s in skills:
+        s0 = s.lower().strip()
+        lemmas = " ".join([tok.lemma_ for tok in nlp(s0) if not tok.is_stop])
+        mapped = _match_ontology(lemmas) or _match_ontology(s0) or lemmas
+        if mapped and mapped not in expected:
+            expected.append(mapped)
+
+    assert clean_and_normalize(skills) == expected
+
+
+def test_multiprocess_lemmatization_matches_single_process():
+    from services.nlp_pipeline import _lemmatize
+
+    strings = ["restful services", "machine learning", "the running of tests"]
+    assert _lemmatize(strings, n_process=2) == _lemmatize(strings)
+
+
+def test_normalize_many_matches_per_list_calls(monkeypatch):
+    from services.nlp_pipeline import clean_and_normalize_many
+
+    lists = [["RESTful services", "Docker", "docker"], [], ["PostgreSQL", "Machine Learning", "Docker"]]
+    batched = clean_and_normalize_many(lists)
+
+    # recompute one list at a time on an empty cache
+    monkeypatch.setattr('services.nlp_pipeline.norm_cache', NormalizationCache(path=''))
+    assert batched == [clean_and_normalize(skills) for skills in lists]
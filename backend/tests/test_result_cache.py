@@ -0,0 +1,42 @@
+from services.result_cache import AnalysisResultCache, analysis_key
+
+
+class FakeColl:
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, q, projection=None):
+        return self.docs.get(q['_id'])
+
+    def update_one(self, q, u, upsert=False):
+        self.docs.setdefault(q['_id'], {'_id': q['_id']}).update(u['$set'])
+
+
+def test_analysis_key_ignores_skill_order_but_not_version():
+    params = {'similarity_weight': 0.6}
+    a = analysis_key(['python', 'sql'], 'Backend', 1, params)
+    assert a == analysis_key(['sql', 'python'], 'Backend', 1, params)
+    assert a != analysis_key(['sql', 'python'], 'Backend', 2, params)
+    assert a != analysis_key(['python', 'sql', 'sql'], 'Backend', 1, params)
+
+
+def test_cache_tiers_and_stats(monkeypatch):
+    analyses = FakeColl()
+    monkeypatch.setattr('services.db.analysis_coll', analyses)
+    monkeypatch.setattr('services.db.analysis_cache_coll', FakeColl())
+
+    cache = AnalysisResultCache(max_entries=1)
+    assert cache.get('k1') is None
+
+    doc = {'_id': 'a1', 'user_id': 'u1', 'results': [{'readiness_pct': 50.0}],
+           'per_skill_confidence': {}, 'role_cluster_used': None}
+    analyses.docs['a1'] = doc
+    cache.put('k1', doc)
+    cache.put('k2', dict(doc, _id='a2'))  # evicts k1 from memory
+
+    assert cache.get('k1')['analysis_id'] == 'a1'  # served from Mongo tier
+    assert cache.get('k1')['results'] == [{'readiness_pct': 50.0}]  # now in memory
+
+    stats = cache.stats()
+    assert (stats['misses'], stats['db_hits'], stats['hits']) == (1, 1, 1)
+    assert stats['evictions'] == 2
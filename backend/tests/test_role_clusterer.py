@@ -1,5 +1,31 @@
-from services.role_clusterer import infer_role_label, cluster_jobs
-from collections import defaultdict
+import pytest
+
+from services import db
+from services.role_clusterer import infer_role_label, cluster_jobs, select_clusters, _sweep_options
+from collections import Counter, defaultdict
+
+
+@pytest.fixture(autouse=True)
+def model_path(tmp_path, monkeypatch):
+    # keep the saved cluster model out of the instance folder
+    monkeypatch.setattr('services.online_clusterer.cluster_model_store.path', str(tmp_path / 'model.pkl'))
+
+
+@pytest.fixture(autouse=True)
+def counts_from_writes(monkeypatch):
+    # stands in for the Mongo aggregation: count skills over the assignments written so far
+    def cluster_skill_counts(cluster_ids, top_n=None, match=None):
+        jobs = {j['_id']: j for j in db.job_coll.find({}, {'skills': 1})}
+        counts = {cid: (0, Counter()) for cid in cluster_ids}
+        for ops in db.job_coll.bulk_calls:
+            for op in ops:
+                cid = op._doc['$set'].get('cluster_id')
+                if cid in counts:
+                    n, counter = counts[cid]
+                    counter.update(jobs[op._filter['_id']].get('skills', []))
+                    counts[cid] = (n + 1, counter)
+        return counts
+    monkeypatch.setattr('services.role_clusterer.cluster_skill_counts', cluster_skill_counts)
 
 
 def test_infer_role_label():
@@ -19,14 +45,19 @@ def test_cluster_jobs_monkeypatched(monkeypatch):
     class FakeColl:
         def __init__(self):
             self.docs = fake_jobs
-        def find(self):
+        def find(self, *args):
             return self.docs
         def update_one(self, q, u, upsert=False):
             # no-op for test
             return None
+        def bulk_write(self, ops, ordered=True):
+            self.bulk_calls = getattr(self, 'bulk_calls', []) + [ops]
+            return None
 
-    monkeypatch.setattr('services.db.job_coll', FakeColl())
+    job_coll = FakeColl()
+    monkeypatch.setattr('services.db.job_coll', job_coll)
     monkeypatch.setattr('services.db.job_clusters', FakeColl())
+    monkeypatch.setattr('services.db.role_versions_coll', FakeColl())
 
     clusters = cluster_jobs(k=3)
     assert isinstance(clusters, dict)
@@ -34,3 +65,93 @@ def test_cluster_jobs_monkeypatched(monkeypatch):
     # ensure labels are present
     labels = [c['role_label'] for c in clusters.values()]
     assert 'Backend Engineer' in labels or 'AI / ML Engineer' in labels or 'Frontend Engineer' in labels
+    # one update per job in a single bulk call, then one bulk of per-cluster label updates
+    assert len(job_coll.bulk_calls) == 2
+    updates = [op._doc['$set'] for op in job_coll.bulk_calls[0]]
+    assert all(set(u) == {'cluster_id', 'cluster_fitted', 'cluster_run'} for u in updates)
+    assert len({u['cluster_run'] for u in updates}) == 1
+    label_ops = job_coll.bulk_calls[1]
+    assert sorted(op._filter['cluster_id'] for op in label_ops) == [0, 1, 2]
+    assert all(op._filter['cluster_run'] == updates[0]['cluster_run'] for op in label_ops)
+    assert {op._doc['$set']['role_label'] for op in label_ops} == set(labels)
+
+
+def test_cluster_writes_are_batched(monkeypatch):
+    words = ['python', 'flask', 'react', 'docker', 'pandas', 'spark', 'kotlin']
+    fake_jobs = [{'_id': i, 'raw_text': f'{w} developer', 'skills': [w]} for i, w in enumerate(words)]
+
+    class FakeColl:
+        def __init__(self):
+            self.bulk_calls = []
+        def find(self, *args):
+            return fake_jobs
+        def update_one(self, q, u, upsert=False):
+            return None
+        def bulk_write(self, ops, ordered=True):
+            assert ordered is False
+            self.bulk_calls.append(ops)
+
+    job_coll = FakeColl()
+    monkeypatch.setattr('services.db.job_coll', job_coll)
+    monkeypatch.setattr('services.db.job_clusters', FakeColl())
+    monkeypatch.setattr('services.db.role_versions_coll', FakeColl())
+
+    progress = []
+    cluster_jobs(k=2, batch_size=3, progress=lambda done, total: progress.append((done, total)))
+    # assignments in batches, then the k label updates
+    assert [len(ops) for ops in job_coll.bulk_calls] == [3, 3, 1, 2]
+    assert progress == [(3, 7), (6, 7), (7, 7)]
+
+
+def test_select_clusters_sweeps_k_in_worker_processes(monkeypatch):
+    # three well-separated topics; k=3 should win on silhouette
+    topics = [['python', 'flask', 'django'], ['react', 'javascript', 'css'], ['pytorch', 'tensorflow', 'keras']]
+    fake_jobs = [{'_id': i, 'raw_text': f'{" ".join(topics[i % 3])} role{i}', 'skills': topics[i % 3]}
+                 for i in range(24)]
+
+    class FakeColl:
+        def __init__(self):
+            self.bulk_calls = []
+        def find(self, *args):
+            return fake_jobs
+        def update_one(self, q, u, upsert=False):
+            return None
+        def bulk_write(self, ops, ordered=True):
+            self.bulk_calls.append(ops)
+
+    clusters_coll = FakeColl()
+    monkeypatch.setattr('services.db.job_coll', FakeColl())
+    monkeypatch.setattr('services.db.job_clusters', clusters_coll)
+    monkeypatch.setattr('services.db.role_versions_coll', FakeColl())
+    # two processes even on a single-core host
+    monkeypatch.setattr('services.role_clusterer.CLUSTER_SWEEP_WORKERS', 2)
+
+    report = select_clusters(k_values=[2, 3, 5, 40], algorithms=('kmeans', 'minibatch'), workers=2, sample_size=20)
+    # k=40 exceeds the corpus and is skipped
+    assert sorted((c['algorithm'], c['k']) for c in report['candidates']) == [
+        ('kmeans', 2), ('kmeans', 3), ('kmeans', 5), ('minibatch', 2), ('minibatch', 3), ('minibatch', 5)]
+    assert report['best']['k'] == 3
+    assert len(report['clusters']) == 3
+
+    # metrics travel with every cluster document; stale higher cluster ids are deleted
+    ops = clusters_coll.bulk_calls[0]
+    selection = ops[0]._doc['$set']['selection']
+    assert selection['k'] == 3 and len(selection['candidates']) == 6
+    assert ops[-1]._filter == {'cluster_id': {'$gte': 3}}
+
+
+def test_sweep_options_are_checked_and_clamped(monkeypatch):
+    monkeypatch.setattr('services.role_clusterer.CLUSTER_SWEEP_WORKERS', 4)
+    monkeypatch.setattr('services.role_clusterer.CLUSTER_SWEEP_SAMPLE', 1000)
+    monkeypatch.setattr('services.role_clusterer.CLUSTER_SWEEP_MAX_CANDIDATES', 8)
+
+    assert _sweep_options([3, 2, 3], ['kmeans'], 500, 10 ** 9) == ([3, 2], ['kmeans'], 4, 1000)
+    assert _sweep_options([2], ['kmeans'], 0, 50)[2] == 1
+    for bad in (dict(k_values=['3']), dict(k_values=[2.5]), dict(k_values=5), dict(k_values=[1, 4]),
+                dict(k_values=list(range(2, 20))), dict(workers='many'), dict(sample_size=1)):
+        options = dict(dict(k_values=[2, 3], algorithms=['kmeans'], workers=2, sample_size=100), **bad)
+        with pytest.raises(ValueError):
+            _sweep_options(**options)
+    # rejected before the corpus is read
+    with pytest.raises(ValueError):
+        select_clusters(k_values=list(range(2, 200)), workers=10 ** 6)
@@ -0,0 +1,63 @@
+from services import role_profiles
+from services.role_profiles import RoleProfileStore
+
+
+class FakeColl:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.finds = 0
+
+    def find(self, query=None, projection=None):
+        self.finds += 1
+        query = query or {}
+        out = []
+        for d in self.docs:
+            ok = True
+            for k, v in query.items():
+                if isinstance(v, dict) and '$in' in v:
+                    ok = ok and d.get(k) in v['$in']
+                else:
+                    ok = ok and d.get(k) == v
+            if ok:
+                out.append(d)
+        return out
+
+    def update_one(self, q, u, upsert=False):
+        for d in self.docs:
+            if d['_id'] == q['_id']:
+                d['version'] = d.get('version', 0) + u['$inc']['version']
+                return
+        self.docs.append({'_id': q['_id'], 'version': u['$inc']['version']})
+
+    def replace_one(self, q, doc, upsert=False):
+        self.docs = [d for d in self.docs if d['_id'] != q['_id']] + [doc]
+
+
+def test_profiles_rebuild_only_after_version_bump(monkeypatch):
+    jobs = FakeColl([
+        {'_id': 1, 'role': 'Backend', 'skills': ['python', 'sql'], 'weights': {'python': 2.0}, 'cluster_id': 1},
+        {'_id': 2, 'role': 'Backend', 'skills': ['docker'], 'weights': {}, 'cluster_id': 1},
+    ])
+    monkeypatch.setattr('services.db.job_coll', jobs)
+    monkeypatch.setattr('services.db.role_versions_coll', FakeColl())
+    monkeypatch.setattr('services.db.role_profiles_coll', FakeColl())
+
+    store = RoleProfileStore()
+    profile = store.get_profile('Backend')
+    assert len(profile['jobs']) == 2
+    assert profile['role_cluster_used'] == 1
+    assert jobs.finds == 1
+
+    # warm cache: no job collection scan
+    store.get_profile('Backend')
+    assert jobs.finds == 1
+
+    # a second worker picks up the persisted profile without scanning jobs
+    assert len(RoleProfileStore().get_profile('Backend')['jobs']) == 2
+    assert jobs.finds == 1
+
+    jobs.docs.append({'_id': 3, 'role': 'Backend', 'skills': ['flask'], 'weights': {}})
+    role_profiles.bump_role_version('Backend')
+    assert len(store.get_profile('Backend')['jobs']) == 3
+    assert jobs.finds == 2
+    assert role_profiles.corpus_version() == 1
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight(mode='thread')
+    calls = []
+    gate = threading.Event()
+
+    def slow():
+        calls.append(1)
+        gate.wait(2)
+        return {'text': 'ok'}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('k', slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while flight.stats()['coalesced'] < 7:
+        time.sleep(0.01)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{'text': 'ok'}] * 8
+    # the key is released once the call finishes
+    assert flight.do('k', lambda: 'again') == 'again'
+
+
+def test_followers_see_the_leaders_error():
+    flight = SingleFlight(mode='thread')
+    gate = threading.Event()
+    errors = []
+
+    def failing():
+        gate.wait(2)
+        raise RuntimeError('api down')
+
+    def call():
+        try:
+            flight.do('k', failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while flight.stats()['coalesced'] < 2:
+        time.sleep(0.01)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert errors == ['api down'] * 3
+
+
+def test_process_mode_waits_for_other_leader_then_rechecks(tmp_path):
+    # two instances stand in for two worker processes sharing the lock directory
+    first = SingleFlight(mode='process', lock_dir=str(tmp_path))
+    second = SingleFlight(mode='process', lock_dir=str(tmp_path))
+    shared_cache = {}
+    started = threading.Event()
+
+    def leader_work():
+        started.set()
+        time.sleep(0.2)
+        shared_cache['k'] = 'from first'
+        return 'from first'
+
+    t = threading.Thread(target=lambda: first.do('k', leader_work, recheck=lambda: shared_cache.get('k')))
+    t.start()
+    started.wait(2)
+    result = second.do('k', lambda: pytest.fail('should reuse the other result'),
+                       recheck=lambda: shared_cache.get('k'))
+    t.join()
+
+    assert result == 'from first'
+    assert second.stats()['cross_process_hits'] == 1
+    assert list(tmp_path.iterdir()) == []
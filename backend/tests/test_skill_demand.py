@@ -0,0 +1,122 @@
+from collections import Counter
+
+from services.skill_demand import skill_frequency_pipelines, skill_demand, cluster_skill_counts
+
+
+def _value(doc, expr):
+    if isinstance(expr, str) and expr.startswith('$'):
+        for part in expr[1:].split('.'):
+            doc = doc.get(part) if isinstance(doc, dict) else None
+        return doc
+    if isinstance(expr, dict) and '$literal' in expr:
+        return expr['$literal']
+    if isinstance(expr, dict) and '$slice' in expr:
+        items, n = expr['$slice']
+        return _value(doc, items)[:n]
+    if isinstance(expr, dict):
+        return {k: _value(doc, v) for k, v in expr.items()}
+    return expr
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        if isinstance(cond, dict) and '$in' in cond:
+            if doc.get(field) not in cond['$in']:
+                return False
+        elif doc.get(field) != cond:
+            return False
+    return True
+
+
+def _run(docs, pipeline):
+    """Evaluate the subset of aggregation stages skill_frequency_pipelines uses."""
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == '$match':
+            docs = [d for d in docs if _matches(d, spec)]
+        elif op == '$facet':
+            docs = [{name: _run(docs, sub) for name, sub in spec.items()}]
+        elif op == '$project':
+            docs = [{k: (d.get(k) if v == 1 else _value(d, v)) for k, v in spec.items() if v != 0} | (
+                {'_id': d['_id']} if '_id' in d and spec.get('_id', 1) else {}) for d in docs]
+        elif op == '$unwind':
+            docs = [dict(d, **{spec[1:]: item}) for d in docs for item in (d.get(spec[1:]) or [])]
+        elif op == '$group':
+            groups = {}
+            for d in docs:
+                key = _value(d, spec['_id'])
+                hashable = tuple(sorted(key.items())) if isinstance(key, dict) else key
+                out = groups.setdefault(hashable, {'_id': key})
+                for field, acc in spec.items():
+                    if field == '_id':
+                        continue
+                    (acc_op, expr), = acc.items()
+                    if acc_op == '$sum':
+                        out[field] = out.get(field, 0) + (_value(d, expr) if isinstance(expr, str) else expr)
+                    else:
+                        out.setdefault(field, []).append(_value(d, expr))
+            docs = list(groups.values())
+        elif op == '$sort':
+            for field, direction in reversed(list(spec.items())):
+                docs.sort(key=lambda d: _value(d, '$' + field), reverse=direction < 0)
+        else:
+            raise AssertionError(f'unexpected stage {op}')
+    return docs
+
+
+class FakeJobs:
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        self.pipelines.append(pipeline)
+        return iter(_run(self.docs, pipeline))
+
+
+JOBS = [
+    {'_id': 1, 'role': 'Backend', 'cluster_id': 0, 'skills': ['python', 'sql', 'docker']},
+    {'_id': 2, 'role': 'Backend', 'cluster_id': 0, 'skills': ['python', 'flask']},
+    {'_id': 3, 'role': 'Data', 'cluster_id': 1, 'skills': ['python', 'pandas', 'sql']},
+    {'_id': 4, 'role': 'Data', 'cluster_id': 1, 'skills': []},
+]
+
+
+def test_pipeline_is_unwind_group_sort_and_cuts_top_n():
+    jobs_stages, skill_stages = skill_frequency_pipelines('role', {'role': 'Data'}, top_n=5)
+    assert jobs_stages[0] == skill_stages[0] == {'$match': {'role': 'Data'}}
+    skill_ops = [list(s)[0] for s in skill_stages[1:]]
+    assert skill_ops == ['$project', '$unwind', '$group', '$sort', '$group', '$project']
+    # every skill: one small document per group and skill, never one per group
+    all_ops = [list(s)[0] for s in skill_frequency_pipelines(top_n=None)[1]]
+    assert all_ops == ['$project', '$unwind', '$group', '$sort', '$project']
+    assert not any('$facet' in s for s in jobs_stages + skill_stages)
+
+
+def test_skill_demand_overall_grouped_and_filtered(monkeypatch):
+    jobs = FakeJobs(JOBS)
+    monkeypatch.setattr('services.db.job_coll', jobs)
+
+    overall = skill_demand(top_n=2)
+    assert overall['jobs'] == 4
+    assert overall['skills'] == [{'skill': 'python', 'count': 3, 'share': 0.75},
+                                 {'skill': 'sql', 'count': 2, 'share': 0.5}]
+
+    by_role = skill_demand(group_by='role', skills=['sql', 'pandas'])
+    # postings without any listed skill still count towards their group
+    assert by_role['Data']['jobs'] == 2
+    assert by_role['Data']['skills'] == [{'skill': 'pandas', 'count': 1, 'share': 0.5},
+                                         {'skill': 'sql', 'count': 1, 'share': 0.5}]
+    assert [s['skill'] for s in by_role['Backend']['skills']] == ['sql']
+
+    assert skill_demand(cluster_id=1)['jobs'] == 2
+    assert skill_demand(role='Nobody') == {'jobs': 0, 'skills': []}
+
+
+def test_cluster_skill_counts_are_full_counters(monkeypatch):
+    monkeypatch.setattr('services.db.job_coll', FakeJobs(JOBS))
+    counts = cluster_skill_counts([0, 1, 2])
+    assert counts[0] == (2, Counter({'python': 2, 'sql': 1, 'docker': 1, 'flask': 1}))
+    assert counts[1][0] == 2
+    assert counts[2] == (0, Counter())
+    assert cluster_skill_counts([0], match={'role': 'Data'})[0] == (0, Counter())
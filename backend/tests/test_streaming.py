@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+from flask import Flask
+
+from services.llm_client import CerebrasClient
+
+
+class FakeCompletions:
+    """Stands in for the SDK's chat.completions; streams one chunk per word."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def create(self, messages, model, max_completion_tokens, temperature, stream, **options):
+        self.calls.append(stream)
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))])
+        return iter([
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            for piece in self.reply.split(' ') if piece
+        ])
+
+
+def _client(reply):
+    client = CerebrasClient(api_key="test", model="test", cache=None)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(reply)))
+    return client
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines.get('event'), json.loads(lines['data'])))
+    return events
+
+
+def test_chat_stream_yields_deltas():
+    client = _client("hello there ")
+    assert list(client.chat_stream("hi")) == ["hello", "there"]
+    assert client.client.chat.completions.calls == [True]
+
+
+def test_endpoints_stream_sse_and_keep_json(monkeypatch):
+    import api.explain as explain
+    import api.interview as interview
+
+    app = Flask(__name__)
+    app.register_blueprint(explain.bp)
+    app.register_blueprint(interview.bp)
+    monkeypatch.setattr(explain, 'llm', _client("a b c"))
+    monkeypatch.setattr(interview, 'llm', _client("next question"))
+    http = app.test_client()
+
+    res = http.post('/explain/chat?stream=1', json={'message': 'hi'})
+    assert res.mimetype == 'text/event-stream'
+    events = _events(res.get_data(as_text=True))
+    assert [e[1]['delta'] for e in events[:-1]] == ['a', 'b', 'c']
+    assert events[-1] == ('done', {'reply': 'abc'})
+
+    res = http.post('/interview/chat', json={'message': 'answer', 'stream': True})
+    assert _events(res.get_data(as_text=True))[-1] == ('done', {'message': 'nextquestion'})
+
+    # old clients still get plain JSON
+    res = http.post('/explain/chat', json={'message': 'hi'})
+    assert res.get_json() == {'reply': 'a b c'}
+
+
+def test_stream_falls_back_when_model_unavailable(monkeypatch):
+    import api.explain as explain
+
+    app = Flask(__name__)
+    app.register_blueprint(explain.bp)
+    offline = CerebrasClient(api_key="test", model="test", cache=None)
+    offline.client = None
+    monkeypatch.setattr(explain, 'llm', offline)
+
+    res = app.test_client().post('/explain/chat', json={'message': 'hi'},
+                                 headers={'Accept': 'text/event-stream'})
+    assert _events(res.get_data(as_text=True))[-1] == ('done', {'reply': 'Server Error.'})
@@ -0,0 +1,173 @@
+import threading
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from services import db
+from services.task_runner import TaskConflict, TaskRunner, task
+
+
+class FakeColl:
+    def __init__(self):
+        self.docs = {}
+
+    def insert_one(self, doc):
+        self.docs[doc['_id']] = dict(doc)
+
+    def update_one(self, q, u, upsert=False):
+        doc = self.docs.get(q['_id'])
+        if doc is not None:
+            doc.update(u['$set'])
+
+    def find_one(self, q, projection=None):
+        return self.docs.get(q['_id'])
+
+    def find(self, q=None, projection=None):
+        return []
+
+
+class FakeLeases:
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    def insert_one(self, doc):
+        with self.lock:
+            if doc['_id'] in self.docs:
+                raise DuplicateKeyError('duplicate lease')
+            self.docs[doc['_id']] = dict(doc)
+
+    def find_one(self, q):
+        return self.docs.get(q['_id'])
+
+    def find_one_and_update(self, q, u):
+        with self.lock:
+            doc = self.docs.get(q['_id'])
+            if doc is None or not doc['expires_at'] < q['expires_at']['$lt']:
+                return None
+            doc.update(u['$set'])
+            return doc
+
+    def update_one(self, q, u):
+        doc = self.docs.get(q['_id'])
+        if doc is not None and doc['task_id'] == q['task_id']:
+            doc.update(u['$set'])
+
+    def delete_one(self, q):
+        with self.lock:
+            if q['_id'] in self.docs and self.docs[q['_id']]['task_id'] == q['task_id']:
+                del self.docs[q['_id']]
+
+
+@pytest.fixture
+def tasks(monkeypatch):
+    coll = FakeColl()
+    monkeypatch.setattr('services.db.tasks_coll', coll)
+    monkeypatch.setattr('services.db.task_leases_coll', FakeLeases())
+    return coll
+
+
+@task('test_add')
+def _add(params, progress):
+    progress(1, 1)
+    return {'sum': params['a'] + params['b']}
+
+
+@task('test_fail')
+def _fail(params, progress):
+    raise ValueError('bad input')
+
+
+gate = threading.Event()
+
+
+@task('test_wait')
+def _wait(params, progress):
+    gate.wait(5)
+    return {}
+
+
+@task('test_exclusive_a', lease='test_lease')
+@task('test_exclusive_b', lease='test_lease')
+def _exclusive(params, progress):
+    gate.wait(5)
+    return {}
+
+
+def test_task_success_and_failure_are_recorded(tasks):
+    runner = TaskRunner(max_workers=2, max_queued=10)
+    ok = runner.submit('test_add', {'a': 2, 'b': 3})
+    bad = runner.submit('test_fail')
+    runner._pool.shutdown(wait=True)
+
+    done = runner.get(ok)
+    assert done['status'] == 'succeeded'
+    assert done['result'] == {'sum': 5}
+    assert done['progress'] == {'done': 1, 'total': 1}
+    assert done['finished_at'] >= done['started_at']
+
+    failed = runner.get(bad)
+    assert failed['status'] == 'failed'
+    assert failed['error'] == 'bad input'
+    assert runner.stats()['succeeded'] == 1 and runner.stats()['failed'] == 1
+    assert runner.stats()['active'] == 0
+
+
+def test_submit_rejects_unknown_task_and_full_queue(tasks):
+    runner = TaskRunner(max_workers=1, max_queued=1)
+    with pytest.raises(KeyError):
+        runner.submit('no_such_task')
+
+    gate.clear()
+    first = runner.submit('test_wait')
+    with pytest.raises(RuntimeError):
+        runner.submit('test_wait')
+    assert runner.stats()['rejected'] == 1
+
+    gate.set()
+    runner._pool.shutdown(wait=True)
+    assert runner.get(first)['status'] == 'succeeded'
+
+
+def test_tasks_sharing_a_lease_never_run_together(tasks):
+    runner = TaskRunner(max_workers=2, max_queued=10)
+    gate.clear()
+    first = runner.submit('test_exclusive_a')
+    leases = db.task_leases_coll
+    for _ in range(100):
+        if 'test_lease' in leases.docs:
+            break
+        threading.Event().wait(0.01)
+    with pytest.raises(TaskConflict):
+        runner.submit('test_exclusive_b')
+
+    gate.set()
+    runner._pool.shutdown(wait=True)
+    assert runner.get(first)['status'] == 'succeeded'
+    # the lease is released, so the next one runs
+    runner = TaskRunner(max_workers=2, max_queued=10)
+    second = runner.submit('test_exclusive_b')
+    runner._pool.shutdown(wait=True)
+    assert runner.get(second)['status'] == 'succeeded'
+    assert db.task_leases_coll.docs == {}
+
+
+def test_lease_is_checked_again_when_the_task_starts(tasks):
+    # both submitted before either ran: the second fails instead of running concurrently
+    runner = TaskRunner(max_workers=2, max_queued=10)
+    gate.clear()
+    ids = [runner.submit('test_exclusive_a'), runner.submit('test_exclusive_b')]
+    threading.Event().wait(0.2)
+    gate.set()
+    runner._pool.shutdown(wait=True)
+    done = sorted((runner.get(i) for i in ids), key=lambda t: t['status'])
+    assert [t['status'] for t in done] == ['failed', 'succeeded']
+    assert 'lease' in done[0]['error']
+
+
+def test_recover_escapes_the_host_name(tasks, monkeypatch):
+    queries = []
+    tasks.find = lambda q=None, projection=None: queries.append(q) or []
+    monkeypatch.setattr('services.task_runner.socket.gethostname', lambda: 'web.1+a')
+    TaskRunner()._recover()
+    assert queries[0]['worker'] == {'$regex': r'^web\.1\+a:'}
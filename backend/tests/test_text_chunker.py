@@ -0,0 +1,17 @@
+import re
+
+from services.text_chunker import split_chunks
+
+
+def test_chunks_respect_size_and_sentence_boundaries():
+    text = ("Course outline\n\nUnit 1. Experience with python and flask is expected. "
+            "Students gain knowledge of sql, docker.\n\n" + "Unit 2. Deep learning with pytorch. " * 20)
+    chunks = split_chunks(text, 120)
+
+    assert len(chunks) > 1
+    assert all(len(c) <= 120 for c in chunks)
+    # nothing is lost, and sentence-bounded patterns match as on the whole text
+    pattern = r"experience with ([a-zA-Z0-9+#\- ]+)|knowledge of ([a-zA-Z0-9+#\- ]+)"
+    assert sorted(m for c in chunks for m in re.findall(pattern, c.lower())) == \
+        sorted(re.findall(pattern, text.lower()))
+    assert "".join(text.split()) == "".join("".join(chunks).split())
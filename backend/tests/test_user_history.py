@@ -0,0 +1,39 @@
+from bson import ObjectId
+from flask import Flask
+
+from api.users import bp
+
+
+class FakeCursor(list):
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        return self
+
+
+class FakeColl:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+
+    def find(self, q, projection=None):
+        return FakeCursor(d for d in self.docs if all(d.get(k) == v for k, v in q.items()))
+
+    def find_one(self, q, projection=None):
+        return next(iter(self.find(q)), None)
+
+
+def test_history_counts_results_of_cached_analyses(monkeypatch):
+    user = ObjectId()
+    original = {'_id': ObjectId(), 'user_id': ObjectId(), 'role': 'Backend',
+                'results': [{'readiness_pct': 50.0}, {'readiness_pct': 70.0}]}
+    # a cache hit stores only a reference to the analysis holding the payload
+    cached = {'_id': ObjectId(), 'user_id': user, 'role': 'Backend',
+              'result_ref': original['_id'], 'result_key': 'k'}
+    monkeypatch.setattr('services.db.analysis_coll', FakeColl([original, cached]))
+    monkeypatch.setattr('services.db.roadmap_coll', FakeColl())
+
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    items = app.test_client().get(f'/users/{user}/history').get_json()
+    assert [i['details'] for i in items] == ['Analyzed 2 job matches']
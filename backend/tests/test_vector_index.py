@@ -0,0 +1,16 @@
+from scipy.sparse import random as sparse_random
+
+from services.vector_index import VectorIndex
+
+
+def test_partitioned_index_agrees_with_brute_force_on_top_hit():
+    X = sparse_random(500, 200, density=0.05, format='csr', random_state=0)
+    brute = VectorIndex(X, mode='brute')
+    # probing every partition makes the partitioned search exact
+    partitioned = VectorIndex(X, mode='partitioned', n_partitions=10, n_probe=10)
+
+    for i in range(0, 500, 50):
+        b = brute.query(X[i], k=5)
+        p = partitioned.query(X[i], k=5)
+        assert b[0][0] == i
+        assert [r for r, _ in b] == [r for r, _ in p]